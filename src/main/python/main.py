@@ -1,9 +1,12 @@
+import multiprocessing
 import sys
 from PySide6.QtWidgets import QApplication
 from package.main_window import MainWindow
 from package import __version__
 
 if __name__ == "__main__":
+    # Pool de hash en processus séparés : indispensable dans l'application gelée
+    multiprocessing.freeze_support()
     app = QApplication(sys.argv)
     app.setApplicationName("Labroll Utility")
     app.setApplicationVersion(__version__)
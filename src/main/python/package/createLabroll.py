@@ -4,25 +4,14 @@ import datetime
 from shutil import copyfile
 from operator import getitem
 
-from hachoir.parser import createParser
-from hachoir.metadata import extractMetadata
+from package.utils.camera_profiles import ProfileMatcher
+from package.utils.clip_metadata import clip_metadata
+from package.utils.params import load_params
 
 
 
 def creation_date(filename):
-    parser = createParser(filename)
-    if not parser:
-        return datetime.datetime.max
-    try:
-        metadata = extractMetadata(parser)
-        if metadata and metadata.has('creation_date'):
-            return metadata.get('creation_date').value
-    except Exception:
-        pass
-    finally:
-        parser.close()
-
-    return datetime.datetime.max
+    return clip_metadata(filename)["creation_date"] or datetime.datetime.max
 
 
 def get_date():
@@ -37,6 +26,7 @@ def get_date():
 def renameFiles(file_list, labroll, destination):
     count = 0
     files_ = {}
+    matcher = ProfileMatcher(load_params().get("camera_profile", "auto"))
     print('rename files : ' + labroll)
 
     for idx, file_path in enumerate(file_list):
@@ -46,11 +36,13 @@ def renameFiles(file_list, labroll, destination):
             files_[count] = {}
             files_[count]['origFile'] = file_path
             files_[count]['creationDate'] = creation_date(file_path)
-            files_[count]['goproClip'] = name[0:4]
+            files_[count]['clipKey'] = matcher.clip_key(file_path)
             count += 1
 
     print(files_)
-    res = sorted(files_.items(), key=lambda x: (getitem(x[1], 'creationDate'), getitem(x[1], 'goproClip')))
+    # Une seule clé par fichier : date, puis (clip, chapitre) du profil caméra, puis nom pour départager
+    res = sorted(files_.items(), key=lambda x: (getitem(x[1], 'creationDate'), getitem(x[1], 'clipKey'),
+                                                os.path.basename(getitem(x[1], 'origFile'))))
     print(res)
 
     try:
@@ -70,7 +62,7 @@ def renameFiles(file_list, labroll, destination):
         index += 1
         new_name = f'{labroll[0:4]}C{index:03d}_{this_date}_{labroll[4:]}'
         log_file.write(
-            f'[#{index:02d}] {os.path.basename(element[1]["origFile"])} {element[1]["goproClip"]} ({element[1]["creationDate"]}) --> {new_name}.mov\n')
+            f'[#{index:02d}] {os.path.basename(element[1]["origFile"])} {element[1]["clipKey"]} ({element[1]["creationDate"]}) --> {new_name}.mov\n')
         destination_path = f'{destination}/{new_name}.mov'
         copyfile(element[1]["origFile"], destination_path)
 
@@ -2,60 +2,100 @@ from PySide6 import QtWidgets, QtCore, QtGui
 import os
 import shutil
 from collections import deque
-import xxhash
 import datetime
 import subprocess
-from hachoir.parser import createParser
-from hachoir.metadata import extractMetadata
+import threading
+import time
 import re
 
 def get_video_datetime(path):
-    # Lecture metadata via hachoir
-    parser = createParser(path)
-    creation_date = datetime.datetime.max
+    # Métadonnées lues une fois puis servies par le cache persistant (clé : chemin, taille, mtime, inode)
+    return metadata_sort_key(path, clip_metadata(path))
 
-    if parser:
-        try:
-            metadata = extractMetadata(parser)
-            if metadata and metadata.has("creation_date"):
-                creation_date = metadata.get("creation_date").value
-        except Exception:
-            pass
-        finally:
-            parser.close()
-
-    # Chapter GoPro (GX01, GX02, etc.)
-    name = os.path.basename(path)
-    m = re.match(r"G[HSPX](\d{2})(\d{4})", name)
-    if m:
-        chapter = int(m.group(1))
-        clip_id = int(m.group(2))
-    else:
-        chapter = 0
-        clip_id = 0
-
-    print(f"[HACHOIR] {path} | creation_date={creation_date} | clip_id={clip_id} | chapter={chapter}")
 
-    # Fallback sécurisé si pas de date lisible
-    safe_date = creation_date if creation_date else datetime.datetime(1970, 1, 1)
+def metadata_sort_key(path, metadata, matcher=None):
+    """(date de création, clip_id, chapter) ; sans métadonnées lisibles, le clip passe en fin de liste.
 
-    return (safe_date, clip_id, chapter)
+    Avec un ProfileMatcher, clip_id et chapter viennent du profil caméra choisi pour le dépôt.
+    """
+    metadata = metadata or {}
+    creation_date = metadata.get("creation_date") or datetime.datetime.max
+    if matcher is not None:
+        clip_id, chapter = matcher.clip_key(path)
+    else:
+        clip_id = metadata.get("clip_id", 0)
+        chapter = metadata.get("chapter", 0)
+    return (creation_date, clip_id, chapter)
 
 from package.utils.params import resource_path, load_params, ensure_params_file, save_params, show
+from package.utils.copy_engine import pipelined_copy, range_parallel_copy, prepare_resume, ChunkJournal, remove_partial_files, recopy_chunks, JOURNAL_SUFFIX, claim_journal, orphan_journals
+from package.utils.devices import DeviceScheduler, mount_point
+from package.utils.hashing import MultiHash, format_digests, element_name, normalize_algorithms
+from package.utils.hash_tree import ChunkHashTree, hash_file_tree, save_trees, load_trees, spot_check, TREE_SUFFIX
+from package.utils.cache_control import drop_file_cache, cached_bytes, footprint_summary
+from package.utils.durability import normalize_durability, sync_path
+from package.utils.fast_copy import FastCopyUnsupported, fast_copy_file, same_filesystem
+from package.utils.hash_pool import HashProcessPool
+from package.utils.batch_rename import (RenameConflict, plan_renames, rename_cycles, apply_renames, undo_renames,
+                                        stranded_renames,
+                                        RENAME_JOURNAL_SUFFIX)
+from package.utils.progress import ProgressCounters
+from package.utils.throughput import EwmaRate, format_eta, estimate_duration, history_rate, record_rate
+from package.utils.job_plan import plan_job
+from package.utils.folder_scan import scan_videos
+from package.utils.metadata_probe import MetadataProbePool
+from package.utils.camera_profiles import ProfileMatcher
+from package.utils.clip_metadata import clip_metadata, begin_batch as begin_metadata_batch, end_batch as end_metadata_batch
 
 
 MAX_CONCURRENT_THREADS = 5
 
-class CopyRenameWorker(QtCore.QObject):
-    finished = QtCore.Signal(str, bool, str)
-    # Correction Overflow Qt: utiliser object pour supporter >2Go
-    progress = QtCore.Signal(object, object)  # bytes_chunk, total_file_size
-
-    def __init__(self, file_path, labroll, destination, camid="", labroll_index=None, original_name=None):
+class CopySignals(QtCore.QObject):
+    finished = QtCore.Signal(str, bool, object, object)  # file_path, success, {algorithme: digest}, verified_destinations
+    # La progression ne passe plus par des signaux : voir ProgressCounters, lu par un QTimer
+    # Copie annulée : fichiers partiels et journaux conservés pour la reprise
+    interrupted = QtCore.Signal(str)  # file_path
+    # Copie terminée, en attente de vérification
+    stats = QtCore.Signal(str, object)  # file_path, {"bytes", "seconds", "preallocate", "sync", "cache_flush"}
+    copied = QtCore.Signal(str, object, object, object)  # file_path, {algorithme: digest}, [(destination_folder, dest_path or None)], ChunkHashTree
+    # Fin du job, quelle qu'en soit l'issue : libère son créneau dans le pool
+    done = QtCore.Signal(str)  # file_path
+
+
+class CopyRenameWorker(QtCore.QRunnable):
+    """Copie (ou renommage) d'un fichier, exécutée dans le pool de copie persistant.
+
+    Les signaux passent par un CopySignals partagé, connecté une seule fois par MainWindow ;
+    les octets copiés sont comptés dans un ProgressCounters partagé.
+    """
+
+    def __init__(self, file_path, labroll, destination, signals, counters=None, camid="", labroll_index=None,
+                 original_name=None,
+                 chunk_size=1024 * 1024, ring_size=8, resumable=True, hash_algorithms=None, cache_window=0,
+                 preallocate_dest=True, durability="file", fast_copy=True, inline_hash=True,
+                 range_parallel="network", range_streams=4, write_latency=0.0, destination_kinds=None):
         super().__init__()
+        self.signals = signals
+        self.counters = counters or ProgressCounters()
         self.file_path = file_path
         self.labroll = labroll
-        self.destination = destination
+        # destination peut être un dossier ou une liste (principal + backups)
+        self.destinations = [destination] if isinstance(destination, str) else list(destination)
+        self.destination = self.destinations[0] if self.destinations else ""
+        self.chunk_size = chunk_size
+        self.ring_size = ring_size
+        self.resumable = resumable
+        self.hash_algorithms = normalize_algorithms(hash_algorithms)
+        self.cache_window = cache_window
+        self.preallocate_dest = preallocate_dest
+        self.durability = normalize_durability(durability)
+        self.fast_copy = fast_copy
+        self.inline_hash = inline_hash
+        self.range_parallel = range_parallel
+        self.range_streams = range_streams
+        # Type de périphérique de chaque destination, établi par le DeviceScheduler dans le thread de l'interface
+        self.destination_kinds = list(destination_kinds or [])
+        self.write_latency = write_latency
         self.camid = camid
         self.labroll_index = labroll_index
         self.original_name = original_name
@@ -64,10 +104,49 @@ class CopyRenameWorker(QtCore.QObject):
     def interrupt(self):
         self._is_interrupted = True
 
+    def use_range_copy(self, total, buffered):
+        if self.range_parallel == "off" or self.range_streams < 2:
+            return False
+        # Trop petit pour que le découpage compense le coût des threads
+        if total < self.chunk_size * self.range_streams * 4:
+            return False
+        return self.range_parallel == "always" or any(
+            i < len(self.destination_kinds) and self.destination_kinds[i] == "network" for i in buffered)
+
+    def kernel_copy(self, index, path, report_source, on_progress, on_dest_progress, should_stop, timings):
+        """Copie d'une destination par clone / copy_file_range, dans un thread à part."""
+        def progress(n):
+            if report_source:
+                on_progress(n)
+            on_dest_progress(index, n)
+
+        try:
+            # Un journal laissé par une copie bufferisée interrompue ne concerne plus ce fichier
+            remove_partial_files([path + JOURNAL_SUFFIX])
+            method = fast_copy_file(self.file_path, path, progress, should_stop)
+            if method is None:
+                return
+            print(f"Copie noyau ({method}) : {path}")
+            if self.durability == "file":
+                started = time.perf_counter()
+                sync_path(path)
+                timings["sync"].append(time.perf_counter() - started)
+        except FastCopyUnsupported:
+            self.kernel_fallback.append(index)
+        except Exception as e:
+            self.kernel_errors[path] = e
+
     def run(self):
+        try:
+            self.process()
+        finally:
+            self.counters.finish(self.file_path)
+            self.signals.done.emit(self.file_path)
+
+    def process(self):
         print(f"Lancement worker pour : {self.file_path}")
         if self._is_interrupted:
-            self.finished.emit(self.file_path, False, "")
+            self.signals.interrupted.emit(self.file_path)
             return
         try:
             index = self.labroll_index if self.labroll_index is not None else 1
@@ -78,59 +157,344 @@ class CopyRenameWorker(QtCore.QObject):
             else:
                 new_name = f"{self.labroll}C{index:03d}_{date_suffix}{ext}"
 
-            if getattr(self, "rename_only", False):
-                new_path = os.path.join(os.path.dirname(self.file_path), new_name)
+            new_paths = [os.path.join(folder, new_name) for folder in self.destinations]
+            buffer_size = self.chunk_size
+            total = os.path.getsize(self.file_path)
+
+            # Voie noyau (clone / copy_file_range) pour les destinations sur le même système de
+            # fichiers que la source, ou pour toutes si le hash à la volée est désactivé ;
+            # les autres passent par la copie bufferisée qui calcule le hash en même temps
+            kernel = [i for i, folder in enumerate(self.destinations)
+                      if self.fast_copy and (not self.inline_hash or same_filesystem(self.file_path, folder))]
+            buffered = [i for i in range(len(new_paths)) if i not in kernel]
+            buffered_paths = [new_paths[i] for i in buffered]
+
+            # Reprise : repartir du dernier chunk confirmé par les journaux des destinations, y compris
+            # ceux d'un lancement précédent de l'application (autre date ou autre labroll dans le nom)
+            if self.resumable:
+                for path in buffered_paths:
+                    try:
+                        old_path = claim_journal(path, self.file_path)
+                    except OSError as e:
+                        print(f"Reprise impossible de la copie partielle vers {path} : {e}")
+                        continue
+                    if old_path:
+                        print(f"Copie partielle {os.path.basename(old_path)} reprise sous {os.path.basename(path)}")
+            journals = [ChunkJournal(path, self.file_path, buffer_size) for path in buffered_paths] if self.resumable and buffered else None
+            # Tous les digests demandés sont calculés sur la même passe de lecture
+            src_hash = MultiHash(self.hash_algorithms)
+            start_offset, src_hash, kept = prepare_resume(journals, src_hash) if journals else (0, src_hash, [])
+            if start_offset:
+                print(f"Reprise de {self.file_path} à {start_offset} octets")
+            for journal, entries in zip(journals or [], kept):
+                journal.start(entries)
+            # Feuilles des chunks déjà copiés : digests des buffers source consignés dans le journal
+            src_tree = ChunkHashTree(buffer_size, [digest for _, _, digest in kept[0]] if kept else [], start_offset)
+            self.counters.start(self.file_path, total, start_offset, buffered)
+
+            def on_progress(n):
+                self.counters.add(self.file_path, n)
+
+            def on_dest_progress(i, n):
+                self.counters.add(self.file_path, n, i)
+
+            timings = {"sync": []}
+            copy_started = time.perf_counter()
+            should_stop = lambda: self._is_interrupted
+            kernel_threads = [threading.Thread(target=self.kernel_copy,
+                                               args=(i, new_paths[i], not buffered and i == kernel[0], on_progress,
+                                                     on_dest_progress, should_stop, timings),
+                                               daemon=True) for i in kernel]
+            self.kernel_errors = {}
+            self.kernel_fallback = []
+            for t in kernel_threads:
+                t.start()
+            # Une seule lecture de la source, écrite vers toutes les destinations ;
+            # le hash de la source est calculé à la volée sur les mêmes buffers
+            checksum, errors = None, {}
+            copy_kwargs = dict(
+                chunk_size=buffer_size,
+                on_progress=on_progress,
+                on_dest_progress=lambda i, n: on_dest_progress(buffered[i], n),
+                # PATCH: interruption propre dans la boucle
+                should_stop=should_stop,
+                start_offset=start_offset,
+                src_hash=src_hash,
+                journals=journals,
+                src_tree=src_tree,
+                preallocate_dest=self.preallocate_dest,
+                # Niveau "file" : sur le disque avant la relecture de vérification
+                sync=self.durability == "file",
+                timings=timings,
+            )
+            try:
+                if buffered and self.use_range_copy(total, buffered):
+                    # Plusieurs pwrite en vol pour masquer la latence d'un partage réseau
+                    print(f"Copie par plages ({self.range_streams} flux) : {self.file_path}")
+                    checksum, errors = range_parallel_copy(self.file_path, buffered_paths, streams=self.range_streams,
+                                                           write_latency=self.write_latency,
+                                                           cache_window=self.cache_window, **copy_kwargs)
+                elif buffered:
+                    checksum, errors = pipelined_copy(self.file_path, buffered_paths, ring_size=self.ring_size,
+                                                      cache_window=self.cache_window, **copy_kwargs)
+            finally:
+                for journal in journals or []:
+                    journal.close()
+                for t in kernel_threads:
+                    t.join()
+            # Destinations refusées par la voie noyau : copie bufferisée classique
+            if self.kernel_fallback and not should_stop():
+                fallback_paths = [new_paths[i] for i in self.kernel_fallback]
+                fallback_tree = ChunkHashTree(buffer_size)
+                fallback_checksum, fallback_errors = pipelined_copy(
+                    self.file_path, fallback_paths, chunk_size=buffer_size, ring_size=self.ring_size,
+                    on_progress=on_progress if not buffered else None,
+                    on_dest_progress=lambda i, n: on_dest_progress(self.kernel_fallback[i], n),
+                    should_stop=should_stop, src_hash=MultiHash(self.hash_algorithms), src_tree=fallback_tree,
+                    cache_window=self.cache_window, preallocate_dest=self.preallocate_dest,
+                    sync=self.durability == "file", timings=timings)
+                errors.update(fallback_errors)
+                if checksum is None and fallback_checksum is not None and len(fallback_errors) < len(fallback_paths):
+                    checksum, src_tree = fallback_checksum, fallback_tree
+            errors.update(self.kernel_errors)
+            # Après la boucle, si interruption, garder fichiers partiels et journaux
+            if self._is_interrupted:
+                # Les copies noyau ne sont pas journalisées : elles repartiront de zéro
+                remove_partial_files(new_paths if not self.resumable else [new_paths[i] for i in kernel])
+                # La reprise ré-annoncera ce qui est déjà sur les destinations depuis les journaux
+                self.counters.discard(self.file_path)
+                self.signals.interrupted.emit(self.file_path)
+                return
+            for path, error in errors.items():
+                print(f"Erreur d'écriture sur {path} : {error}")
+            if len(errors) == len(new_paths):
+                raise ValueError("Copy failed on every destination")
+            if checksum is None:
+                # Aucune copie bufferisée n'a lu la source : passe de hash séparée
+                checksum, src_tree = hash_file_tree(self.file_path, self.hash_algorithms, buffer_size)
+
+            # La relecture de vérification est confiée au pool de vérification (VerifyTask) :
+            # le fichier suivant peut être copié pendant que celui-ci est vérifié
+            self.signals.stats.emit(self.file_path, {"bytes": total - start_offset,
+                                             "seconds": time.perf_counter() - copy_started,
+                                             "preallocate": sum(timings.get("preallocate", [])),
+                                             "sync": sum(timings.get("sync", [])),
+                                             "cache_flush": sum(timings.get("cache_flush", []))})
+            targets = [(folder, None if path in errors else path) for folder, path in zip(self.destinations, new_paths)]
+            self.signals.copied.emit(self.file_path, checksum, targets, src_tree)
+        except Exception as e:
+            print(f"Erreur sur {self.file_path} : {e}")
+            self.signals.finished.emit(self.file_path, False, "", [])
+
+
+class VerifySignals(QtCore.QObject):
+    # file_path, success, {algorithme: digest}, verified_destinations, job_id
+    verified = QtCore.Signal(str, bool, object, object, int)
+
+
+class VerifyTask(QtCore.QRunnable):
+    """Relecture des destinations d'un fichier copié, exécutée dans le pool de vérification."""
+
+    MAX_REPAIRS = 2
+
+    def __init__(self, file_path, checksum, targets, signals, chunk_size=1024 * 1024, tree=None, drop_cache=False,
+                 hasher=None, measure_cache=False, job_id=0):
+        super().__init__()
+        # checksum : {algorithme: digest} de la source, recalculé à l'identique sur chaque destination
+        # tree : arbre des chunks source, pour ne recopier que les plages corrompues
+        # hasher : HashProcessPool partagé ; les destinations sont hachées en parallèle hors du GIL de l'interface
+        self.setAutoDelete(False)
+        self.hasher = hasher or HashProcessPool(0)
+        self.file_path = file_path
+        self.checksum = checksum
+        self.targets = targets
+        self.tree = tree
+        self.drop_cache = drop_cache
+        self.signals = signals
+        self.chunk_size = chunk_size
+        self.started = False
+        # measure_cache : octets de la source et des destinations encore en cache une fois la
+        # vérification terminée, mesurés ici plutôt que dans le thread de l'interface en fin de job
+        self.measure_cache = measure_cache
+        self.cached = None
+        # Job qui a soumis la vérification : un résultat arrivé pendant le job suivant est ignoré
+        self.job_id = job_id
+
+    def run(self):
+        self.started = True
+        verified = []
+        chunk_size = self.tree.chunk_size if self.tree else self.chunk_size
+        try:
+            jobs = []
+            for folder, path in self.targets:
+                if path is None:
+                    continue
+                if self.drop_cache:
+                    # Sinon la relecture serait servie par la RAM et ne prouverait rien sur le disque
+                    drop_file_cache(path)
+                jobs.append((folder, path, self.hasher.submit(path, list(self.checksum), chunk_size,
+                                                              nocache=self.drop_cache)))
+            for folder, path, job in jobs:
+                # Chaque destination est relevée : une erreur sur l'une n'empêche pas de vérifier les autres
                 try:
-                    os.rename(self.file_path, new_path)
-                    QtCore.QThread.msleep(50)
-                    self.finished.emit(self.file_path, True, "")
+                    if self.verify_target(path, job):
+                        verified.append(folder)
+                    else:
+                        print(f"Checksum mismatch after copy : {path}")
                 except Exception as e:
-                    print(f"Erreur lors du renommage : {e}")
-                    self.finished.emit(self.file_path, False, "")
-                return
+                    print(f"Erreur de vérification sur {path} : {e}")
+                if self.drop_cache:
+                    drop_file_cache(path)
+                # Vérifié ou corrompu, le journal de reprise n'a plus de raison d'être
+                try:
+                    os.remove(path + JOURNAL_SUFFIX)
+                except OSError:
+                    pass
+        except Exception as e:
+            print(f"Erreur de vérification sur {self.file_path} : {e}")
+        if self.measure_cache:
+            sizes = [cached_bytes(path) for path in [self.file_path] + [path for _, path in self.targets if path]]
+            if any(size is not None for size in sizes):
+                self.cached = sum(size for size in sizes if size)
+        self.signals.verified.emit(self.file_path, len(verified) == len(self.targets), self.checksum, verified,
+                                   self.job_id)
+
+    def verify_target(self, path, job):
+        chunk_size = self.tree.chunk_size if self.tree else self.chunk_size
+        digests, dest_tree = job.result()
+        if digests == self.checksum:
+            return True
+        if self.tree is None:
+            return False
+        for _ in range(self.MAX_REPAIRS):
+            bad = self.tree.diff(dest_tree)
+            if not bad and dest_tree.size == self.tree.size:
+                return False
+            print(f"Recopie de {len(bad)} chunk(s) sur {path} : {self.tree.ranges(bad)}")
+            if not recopy_chunks(self.file_path, path, self.tree, bad):
+                print(f"Recopie incomplète sur {path}")
+            if self.drop_cache:
+                drop_file_cache(path)
+            # Les feuilles xxh64 ne suffisent pas : la destination réparée n'est vérifiée que si
+            # tous les algorithmes redonnent les empreintes de la source sur le fichier entier
+            digests, dest_tree = self.hasher.submit(path, list(self.checksum), chunk_size,
+                                                    nocache=self.drop_cache).result()
+            if digests == self.checksum:
+                return True
+        return False
+
+
+class BatchRenameSignals(QtCore.QObject):
+    progress = QtCore.Signal(int, int)  # étapes effectuées, total
+    finished = QtCore.Signal(object, str)  # [(source, cible, succès)], message d'erreur
+
+
+class BatchRenameWorker(QtCore.QRunnable):
+    """Mode "Rename only" : tout le plan de renommage appliqué par un seul worker."""
+
+    def __init__(self, pairs, journal_path, signals):
+        super().__init__()
+        self.pairs = pairs
+        self.journal_path = journal_path
+        self.signals = signals
+        self._is_interrupted = False
+
+    def interrupt(self):
+        self._is_interrupted = True
+
+    def run(self):
+        try:
+            plan = plan_renames(self.pairs)
+            cycles = rename_cycles(plan)
+            if cycles:
+                print(f"{len(cycles)} cycle(s) de renommage, résolus par les noms temporaires")
+            results = apply_renames(plan, self.journal_path, on_progress=self.signals.progress.emit,
+                                    should_stop=lambda: self._is_interrupted)
+            stranded = stranded_renames(self.journal_path)
+            # Fichiers qui portaient déjà leur nom cible
+            planned = {src for src, _ in plan}
+            results += [(src, dst, True) for src, dst in self.pairs if os.path.abspath(src) not in planned]
+            message = ""
+            if stranded:
+                message = (f"{len(stranded)} fichier(s) laissé(s) sous un nom temporaire, leur nom d'origine "
+                           f"étant occupé :\n" + "\n".join(tmp for _, tmp in stranded))
+            self.signals.finished.emit(results, message)
+        except RenameConflict as e:
+            self.signals.finished.emit([], str(e))
+        except Exception as e:
+            print(f"Erreur lors du renommage : {e}")
+            self.signals.finished.emit([], str(e))
+
+
+class ScanSignals(QtCore.QObject):
+    batch = QtCore.Signal(object)  # [(path, size, sort_key, probe_latency)]
+    finished = QtCore.Signal(bool)  # interrupted
+
+
+class FolderScanWorker(QtCore.QRunnable):
+    """Parcours des fichiers et dossiers déposés, et lecture des métadonnées de tri, hors du thread de l'interface.
+
+    Les métadonnées sont lues en parallèle par un MetadataProbePool (borné par périphérique
+    source) pendant que le parcours continue. Les clips sont envoyés par lots (batch_size
+    clips ou batch_interval secondes) pour que la liste se remplisse au fil du parcours.
+    Ordre de la liste : dossier par dossier dans l'ordre du parcours, clips triés par
+    métadonnées dans chaque dossier, puis les fichiers déposés seuls, triés ensemble.
+    """
+
+    def __init__(self, roots, ignore_mxf, signals, batch_size=64, batch_interval=0.1, probe_pool=None,
+                 camera_profile="auto"):
+        super().__init__()
+        self.roots = roots
+        self.ignore_mxf = ignore_mxf
+        self.signals = signals
+        self.probe_pool = probe_pool or MetadataProbePool()
+        self.matcher = ProfileMatcher(camera_profile)
+        self.batch_size = batch_size
+        self.batch_interval = batch_interval
+        self._is_interrupted = False
+
+    def interrupt(self):
+        self._is_interrupted = True
+
+    def grouped(self, clips, groups):
+        """Relaie clips en notant le groupe de tri de chacun dans groups, dans l'ordre du parcours.
+
+        Les métadonnées arrivent dans le désordre (lectures parallèles) : le rang du dossier
+        est fixé ici, avant la lecture, pour que la liste garde l'ordre des dossiers.
+        """
+        loose = {os.path.abspath(root) for root in self.roots if not os.path.isdir(root)}
+        folders = {}
+        for path, size, device in clips:
+            if os.path.abspath(path) in loose:
+                groups[path] = (1, 0)
             else:
-                new_path = os.path.join(self.destination, new_name)
-                buffer_size = 1024 * 1024  # 1 MB
-                copied = 0
-                total = os.path.getsize(self.file_path)
-                self.progress.emit(0, total)
-                with open(self.file_path, "rb") as src, open(new_path, "wb") as dst:
-                    # PATCH: interruption propre dans la boucle (test interne ET Qt)
-                    while not self._is_interrupted and not QtCore.QThread.currentThread().isInterruptionRequested():
-                        buf = src.read(buffer_size)
-                        if not buf:
-                            break
-                        dst.write(buf)
-                        copied += len(buf)
-                        self.progress.emit(len(buf), total)
-                # Après la boucle, si interruption (interne ou Qt), supprimer le fichier partiel et sortir immédiatement
-                if self._is_interrupted or QtCore.QThread.currentThread().isInterruptionRequested():
-                    try:
-                        if os.path.exists(new_path):
-                            os.remove(new_path)
-                    except Exception:
-                        pass
-                    self.finished.emit(self.file_path, False, "")
-                    return
+                groups[path] = (0, folders.setdefault(os.path.dirname(path), len(folders)))
+            yield path, size, device
 
-                def file_hash(path):
-                    h = xxhash.xxh64()
-                    with open(path, 'rb') as f:
-                        while True:
-                            chunk = f.read(8192)
-                            if not chunk:
-                                break
-                            h.update(chunk)
-                    return h.hexdigest()
-
-                if file_hash(self.file_path) != file_hash(new_path):
-                    raise ValueError("Checksum mismatch after copy")
-
-                checksum = file_hash(new_path)
-                self.finished.emit(self.file_path, True, checksum)
+    def run(self):
+        begin_metadata_batch()
+        batch, last_emit = [], time.monotonic()
+        try:
+            should_stop = lambda: self._is_interrupted
+            groups = {}
+            clips = self.grouped(scan_videos(self.roots, self.ignore_mxf, should_stop=should_stop), groups)
+            for path, size, device, metadata, latency in self.probe_pool.probe_stream(clips, should_stop):
+                key = groups[path] + metadata_sort_key(path, metadata, self.matcher) + (path,)
+                batch.append((path, size, key, latency))
+                if len(batch) >= self.batch_size or time.monotonic() - last_emit >= self.batch_interval:
+                    self.signals.batch.emit(batch)
+                    batch, last_emit = [], time.monotonic()
+            if batch and not self._is_interrupted:
+                self.signals.batch.emit(batch)
         except Exception as e:
-            print(f"Erreur sur {self.file_path} : {e}")
-            self.finished.emit(self.file_path, False, "")
+            print(f"[SCAN] Erreur pendant le parcours : {e}")
+        finally:
+            summary = end_metadata_batch()
+            if summary:
+                print(f"[METADATA] {summary}")
+            if self.matcher.counts:
+                print(f"[SCAN] Profils caméra : {self.matcher.summary()}")
+            self.signals.finished.emit(self._is_interrupted)
 
 
 class DropListWidget(QtWidgets.QListWidget):
@@ -140,9 +504,56 @@ class DropListWidget(QtWidgets.QListWidget):
         self.setDragEnabled(False)
         self.setSelectionMode(QtWidgets.QAbstractItemView.ExtendedSelection)
         self.setDragDropMode(QtWidgets.QAbstractItemView.InternalMove)
+        # Un seul parcours à la fois ; les dépôts pendant un parcours attendent leur tour
+        self.scan_pool = QtCore.QThreadPool(self)
+        self.scan_pool.setMaxThreadCount(1)
+        self.scan_signals = ScanSignals()
+        self.scan_signals.batch.connect(self.on_scan_batch, QtCore.Qt.QueuedConnection)
+        self.scan_signals.finished.connect(self.on_scan_finished, QtCore.Qt.QueuedConnection)
+        self.scan_worker = None
+        self.scan_cancelled = False
+        self.pending_scan_roots = []
+        self.scan_keys = {}
+        self.scan_base_row = 0
+        self.scan_count = 0
+        # Latence de lecture des métadonnées de chaque clip du dernier dépôt (panneau de debug)
+        self.probe_log = []
+
+    def make_item_widget(self, basename, size_mb, rename_only):
+        # Create a widget for each item with separate styling for filename and size
+        widget = QtWidgets.QWidget()
+        widget.setStyleSheet("background-color: transparent;")
+        widget.setAttribute(QtCore.Qt.WA_StyledBackground, False)
+        layout = QtWidgets.QHBoxLayout(widget)
+        layout.setContentsMargins(8, 2, 8, 2)
+        name_label = QtWidgets.QLabel(basename)
+        name_label.setStyleSheet("color: #fafafa; background-color: transparent;")
+        layout.addWidget(name_label)
+        if not rename_only:
+            size_label = QtWidgets.QLabel(f"{size_mb:.1f} MB")
+            size_label.setStyleSheet("color: #888888; padding-left: 5px; background-color: transparent;")
+            layout.addWidget(size_label)
+        layout.addStretch()
+        widget.setMinimumHeight(28)
+        return widget
+
+    def insert_clip(self, row, path, size):
+        """Insère un clip à row avec son widget (nom, taille) ; size vient du parcours, pas d'un nouveau stat."""
+        rename_only = getattr(self.parent(), "rename_only", False)
+        basename = os.path.basename(path)
+        item = QtWidgets.QListWidgetItem()
+        item.setSizeHint(QtCore.QSize(0, 28))
+        item.setData(QtCore.Qt.UserRole, path)
+        item.setData(QtCore.Qt.UserRole + 1, basename)
+        item.setIcon(self.parent().img_unchecked)
+        self.insertItem(row, item)
+        self.setItemWidget(item, self.make_item_widget(basename, size / (1024 * 1024), rename_only))
+        return item
 
     def keyPressEvent(self, event):
-        if event.key() == QtCore.Qt.Key_Backspace:
+        if event.key() == QtCore.Qt.Key_Escape and self.scan_worker is not None:
+            self.cancel_scan()
+        elif event.key() == QtCore.Qt.Key_Backspace:
             for item in self.selectedItems():
                 self.takeItem(self.row(item))
         elif event.matches(QtGui.QKeySequence.Delete):
@@ -174,26 +585,8 @@ class DropListWidget(QtWidgets.QListWidget):
                 basename = os.path.basename(file_path)
                 rename_only = getattr(self.parent(), "rename_only", False)
                 size_mb = os.path.getsize(file_path) / (1024 * 1024) if not rename_only else 0
-
-                widget = QtWidgets.QWidget()
-                widget.setStyleSheet("background-color: transparent;")
-                widget.setAttribute(QtCore.Qt.WA_StyledBackground, False)
-                layout = QtWidgets.QHBoxLayout(widget)
-                layout.setContentsMargins(8, 2, 8, 2)
-
-                name_label = QtWidgets.QLabel(basename)
-                name_label.setStyleSheet("color: #fafafa; background-color: transparent;")
-                layout.addWidget(name_label)
-
-                if not rename_only:
-                    size_label = QtWidgets.QLabel(f"{size_mb:.1f} MB")
-                    size_label.setStyleSheet("color: #888888; padding-left: 5px; background-color: transparent;")
-                    layout.addWidget(size_label)
-
-                layout.addStretch()
-                widget.setMinimumHeight(28)
                 item.setSizeHint(QtCore.QSize(0, 28))
-                self.setItemWidget(item, widget)
+                self.setItemWidget(item, self.make_item_widget(basename, size_mb, rename_only))
         else:
             super().keyPressEvent(event)
 
@@ -205,92 +598,77 @@ class DropListWidget(QtWidgets.QListWidget):
         event.acceptProposedAction()
 
     def dropEvent(self, event):
-        from PySide6.QtWidgets import QLabel, QWidget, QHBoxLayout
-        import re
-        rename_only = getattr(self.parent(), "rename_only", False)
-        ignore_mxf = load_params().get("ignore_mxf", True)
-
-        def natural_sort_key(s):
-            return [int(text) if text.isdigit() else text.lower() for text in re.split('([0-9]+)', os.path.basename(s))]
-
-        def add_video_files_from_directory(directory):
-            for root, dirs, files in os.walk(directory):
-                # Exclure les dossiers indésirables
-                dirs[:] = [d for d in dirs if not d.startswith('.') and d not in {"__MACOSX", ".trash", "Trash",
-                                                                                  "System Volume Information"}]
-                video_files = []
-                for file in files:
-                    if file.startswith("."):
-                        continue
-                    if file.lower().endswith((".mp4", ".mov", ".mxf")) and (not ignore_mxf or not file.lower().endswith(".mxf")):
-                        full_path = os.path.join(root, file)
-                        if os.path.getsize(full_path) == 0:
-                            continue
-                        video_files.append(full_path)
-                for full_path in sorted(video_files, key=get_video_datetime):
-                    basename = os.path.basename(full_path)
-                    if not rename_only:
-                        size_mb = os.path.getsize(full_path) / (1024 * 1024)
-                    # Create a widget for each item with separate styling for filename and size
-                    widget = QWidget()
-                    widget.setStyleSheet("background-color: transparent;")
-                    widget.setAttribute(QtCore.Qt.WA_StyledBackground, False)
-                    layout = QHBoxLayout(widget)
-                    layout.setContentsMargins(8, 2, 8, 2)
-                    name_label = QLabel(basename)
-                    name_label.setStyleSheet("color: #fafafa; background-color: transparent;")
-                    layout.addWidget(name_label)
-                    if not rename_only:
-                        size_label = QLabel(f"{size_mb:.1f} MB")
-                        size_label.setStyleSheet(
-                            "color: #888888; padding-left: 5px; background-color: transparent;")
-                        layout.addWidget(size_label)
-                    layout.addStretch()
-                    widget.setMinimumHeight(28)
-                    item = QtWidgets.QListWidgetItem()
-                    item.setSizeHint(QtCore.QSize(0, 28))
-                    item.setData(QtCore.Qt.UserRole, full_path)
-                    item.setData(QtCore.Qt.UserRole + 1, basename)
-                    item.setIcon(self.parent().img_unchecked)
-                    self.addItem(item)
-                    self.setItemWidget(item, widget)
-
-        file_paths = []
-        for url in event.mimeData().urls():
-            file_path = url.toLocalFile()
-            if os.path.isdir(file_path):
-                add_video_files_from_directory(file_path)
-            elif file_path.lower().endswith((".mp4", ".mov", ".mxf")) and (not ignore_mxf or not file_path.lower().endswith(".mxf")):
-                if os.path.getsize(file_path) == 0:
-                    continue
-                file_paths.append(file_path)
-        for file_path in sorted(file_paths, key=get_video_datetime):
-            basename = os.path.basename(file_path)
-            if not rename_only:
-                size_mb = os.path.getsize(file_path) / (1024 * 1024)
-            # Create a widget for each item with separate styling for filename and size
-            widget = QWidget()
-            widget.setStyleSheet("background-color: transparent;")
-            widget.setAttribute(QtCore.Qt.WA_StyledBackground, False)
-            layout = QHBoxLayout(widget)
-            layout.setContentsMargins(8, 2, 8, 2)
-            name_label = QLabel(basename)
-            name_label.setStyleSheet("color: #fafafa; background-color: transparent;")
-            layout.addWidget(name_label)
-            if not rename_only:
-                size_label = QLabel(f"{size_mb:.1f} MB")
-                size_label.setStyleSheet("color: #888888; padding-left: 5px; background-color: transparent;")
-                layout.addWidget(size_label)
-            layout.addStretch()
-            widget.setMinimumHeight(28)
-            item = QtWidgets.QListWidgetItem()
-            item.setSizeHint(QtCore.QSize(0, 28))
-            item.setData(QtCore.Qt.UserRole, file_path)
-            item.setData(QtCore.Qt.UserRole + 1, basename)
-            item.setIcon(self.parent().img_unchecked)
-            self.addItem(item)
-            self.setItemWidget(item, widget)
+        # Parcours et lecture des métadonnées en arrière-plan : la fenêtre reste réactive
+        roots = [url.toLocalFile() for url in event.mimeData().urls() if url.toLocalFile()]
+        if self.scan_worker is not None:
+            self.pending_scan_roots.extend(roots)
+        else:
+            self.probe_log = []
+            self.start_scan(roots)
+
+    def start_scan(self, roots):
+        main_window = self.parent()
+        self.scan_base_row = self.count()
+        self.scan_keys = {}
+        self.scan_count = 0
+        self.scan_cancelled = False
+        settings = load_params()
+        probe_pool = MetadataProbePool(int(settings.get("metadata_probe_threads", 8)),
+                                       int(settings.get("metadata_probe_per_device", 4)))
+        self.scan_worker = FolderScanWorker(roots, settings.get("ignore_mxf", False), self.scan_signals,
+                                            probe_pool=probe_pool,
+                                            camera_profile=settings.get("camera_profile", "auto"))
+        # Pas de lancement de job sur une liste incomplète
+        main_window.rename_button.setEnabled(False)
+        main_window.cancel_button.setEnabled(True)
+        main_window.percent_label.setText("Scan…")
+        self.scan_pool.start(self.scan_worker)
+
+    def cancel_scan(self):
+        self.pending_scan_roots = []
+        if self.scan_worker is not None:
+            # Les lots déjà en file d'attente Qt sont ignorés eux aussi
+            self.scan_cancelled = True
+            self.scan_worker.interrupt()
+
+    def sorted_row(self, key):
+        """Rang d'insertion de key parmi les clips de ce parcours (recherche dichotomique)."""
+        lo, hi = self.scan_base_row, self.count()
+        while lo < hi:
+            mid = (lo + hi) // 2
+            other = self.scan_keys.get(self.item(mid).data(QtCore.Qt.UserRole))
+            if other is not None and key < other:
+                hi = mid
+            else:
+                lo = mid + 1
+        return lo
 
+    def on_scan_batch(self, batch):
+        if self.scan_cancelled:
+            return
+        self.setUpdatesEnabled(False)
+        try:
+            for path, size, key, latency in batch:
+                self.insert_clip(self.sorted_row(key), path, size)
+                self.scan_keys[path] = key
+                self.probe_log.append((path, latency))
+        finally:
+            self.setUpdatesEnabled(True)
+        self.scan_count += len(batch)
+        self.parent().percent_label.setText(f"Scan… {self.scan_count} clips")
+
+    def on_scan_finished(self, interrupted):
+        interrupted = interrupted or self.scan_cancelled
+        self.scan_worker = None
+        if self.pending_scan_roots and not interrupted:
+            roots, self.pending_scan_roots = self.pending_scan_roots, []
+            self.start_scan(roots)
+            return
+        main_window = self.parent()
+        main_window.percent_label.setText(f"{self.scan_count} clips{' (scan interrompu)' if interrupted else ''}")
+        if not main_window.active_jobs and not main_window.verify_tasks:
+            main_window.rename_button.setEnabled(True)
+            main_window.cancel_button.setEnabled(False)
 
     def mouseDoubleClickEvent(self, event):
         item = self.itemAt(event.pos())
@@ -330,7 +708,7 @@ class MainWindow(QtWidgets.QWidget):
         self.img_processing = QtGui.QIcon(str(resource_path("assets/images/processing.png")))
 
         ensure_params_file()
-        self.max_threads = load_params().get("max_concurrent_threads", 5)
+        self.max_threads = load_params().get("nb_thread", MAX_CONCURRENT_THREADS)
         # Load rename_only setting
         self.rename_only = load_params().get("rename_only", False)
         # Set labroll input from last_labroll value at startup
@@ -361,6 +739,12 @@ class MainWindow(QtWidgets.QWidget):
         # Disable destination_input if rename_only
         self.destination_input.setEnabled(not self.rename_only)
 
+        # Dossiers de backup : la source est lue une seule fois et écrite partout
+        self.backup_input = QtWidgets.QLineEdit()
+        self.backup_input.setPlaceholderText("Backup folder(s), separated by ;")
+        self.backup_input.setText(";".join(load_params().get("last_backup_destinations", [])))
+        self.backup_input.setEnabled(not self.rename_only)
+
         self.setup_ui()
         # After UI setup, update file weights for rename_only items already loaded
         for i in range(self.drop_list.count()):
@@ -376,12 +760,48 @@ class MainWindow(QtWidgets.QWidget):
                             size_label.setStyleSheet(f"color: rgba(0, 0, 0, 0); {base_style}")
                         else:
                             size_label.setStyleSheet(f"color: #888888; {base_style}")
-        self.threads = []
-        self.active_threads = []
+        # Pool de copie persistant : threads et connexions de signaux créés une fois,
+        # chaque fichier n'est plus qu'un CopyRenameWorker (QRunnable) soumis au pool
+        self.copy_pool = QtCore.QThreadPool(self)
+        self.copy_pool.setExpiryTimeout(-1)
+        self.copy_signals = CopySignals()
+        self.copy_signals.finished.connect(self.on_file_processed, QtCore.Qt.QueuedConnection)
+        self.copy_signals.interrupted.connect(self.on_file_interrupted, QtCore.Qt.QueuedConnection)
+        self.copy_signals.stats.connect(self.on_copy_stats, QtCore.Qt.QueuedConnection)
+        self.copy_signals.copied.connect(self.on_file_copied, QtCore.Qt.QueuedConnection)
+        self.copy_signals.done.connect(self.on_worker_done, QtCore.Qt.QueuedConnection)
+        self.active_jobs = {}
+        self.rename_signals = BatchRenameSignals()
+        self.rename_signals.progress.connect(self.on_batch_rename_progress, QtCore.Qt.QueuedConnection)
+        self.rename_signals.finished.connect(self.on_batch_renamed, QtCore.Qt.QueuedConnection)
         self.queue = deque()
-        self.current_file_size = 0
-        self.current_file_copied = 0
-        self.current_file_start_time = None
+        self.destination_folders = []
+        self.destination_kinds = []
+        self.scheduler = DeviceScheduler()
+        self.job_devices = {}
+        self.paused = False
+        # Octets copiés comptés par les workers, affichés à fréquence fixe par progress_timer
+        self.progress_counters = ProgressCounters()
+        # Pool de vérification : la relecture du fichier N recouvre la copie du fichier N+1
+        self.verify_pool = QtCore.QThreadPool(self)
+        self.verify_pool.setMaxThreadCount(max(1, int(load_params().get("verify_threads", 2))))
+        self.verify_signals = VerifySignals()
+        self.verify_signals.verified.connect(self.on_file_verified, QtCore.Qt.QueuedConnection)
+        self.verify_tasks = {}
+        self.job_id = 0
+        # Vérifications retirées du pool par Cancel, relancées par Restart
+        self.reverify_tasks = {}
+        # Hash de vérification dans des processus séparés ; progression lue à intervalle régulier
+        settings = load_params()
+        processes = int(settings.get("hash_processes", 0)) or os.cpu_count() or 1
+        self.hash_pool = HashProcessPool(processes if settings.get("process_hashing", True) else 0)
+        self.verify_bytes_start = 0
+        self.start_rate_estimation()
+        # Rafraîchissement de la progression (copie et vérification) à ~15 Hz
+        self.progress_timer = QtCore.QTimer(self)
+        self.progress_timer.setInterval(int(1000 / max(1, load_params().get("progress_refresh_hz", 15))))
+        self.progress_timer.timeout.connect(self.refresh_progress)
+        self.copied_count = 0
         css_file = resource_path("assets/style.css")
         with open(css_file, 'r') as f:
             self.setStyleSheet(f.read())
@@ -403,6 +823,14 @@ class MainWindow(QtWidgets.QWidget):
         self.destination_layout.addWidget(self.destination_input)
         self.destination_layout.addWidget(browse_button)
 
+        backup_browse_button = QtWidgets.QPushButton("Add")
+        backup_browse_button.clicked.connect(self.browse_backup_destination)
+        backup_browse_button.setEnabled(not self.rename_only)
+
+        self.backup_layout = QtWidgets.QHBoxLayout()
+        self.backup_layout.addWidget(self.backup_input)
+        self.backup_layout.addWidget(backup_browse_button)
+
         self.rename_button = QtWidgets.QPushButton("Rename")
         self.rename_button.clicked.connect(self.process_labroll)
 
@@ -433,6 +861,11 @@ class MainWindow(QtWidgets.QWidget):
         counter_row.addWidget(self.percent_label)
         counter_row.addWidget(self.status_icon_label)
 
+        # Progression par destination (visible uniquement avec des backups)
+        self.destinations_label = QtWidgets.QLabel()
+        self.destinations_label.setStyleSheet("color: #888888;")
+        self.destinations_label.setVisible(False)
+
         layout = QtWidgets.QVBoxLayout()
         # Replace Labroll label/input with a horizontal row including Cam ID
         labroll_row = QtWidgets.QHBoxLayout()
@@ -442,6 +875,7 @@ class MainWindow(QtWidgets.QWidget):
         labroll_row.addWidget(self.camid_input)
         layout.addLayout(labroll_row)
         layout.addLayout(self.destination_layout)
+        layout.addLayout(self.backup_layout)
         # Replace drop label and list block with row including clear button and icon
         drop_label = QtWidgets.QLabel("Drop video folder or files :")
         clear_icon = QtGui.QIcon(str(resource_path("assets/images/refresh.png")))
@@ -465,6 +899,7 @@ class MainWindow(QtWidgets.QWidget):
         layout.addLayout(action_row)
         layout.addWidget(self.progress_bar)
         layout.addLayout(counter_row)
+        layout.addWidget(self.destinations_label)
 
         settings_button = QtWidgets.QPushButton()
         settings_icon = QtGui.QIcon(str(resource_path("assets/images/params.png")))
@@ -496,6 +931,22 @@ class MainWindow(QtWidgets.QWidget):
         show_params_action.triggered.connect(lambda: show(None))
         file_menu.addAction(show_params_action)
 
+        plan_action = QtGui.QAction("Job plan (dry run)", self)
+        plan_action.triggered.connect(self.show_dry_run)
+        file_menu.addAction(plan_action)
+
+        probe_action = QtGui.QAction("Metadata probe latency (debug)", self)
+        probe_action.triggered.connect(self.show_probe_latency)
+        file_menu.addAction(probe_action)
+
+        spot_check_action = QtGui.QAction("Spot-check from hash tree", self)
+        spot_check_action.triggered.connect(self.spot_check_from_tree)
+        file_menu.addAction(spot_check_action)
+
+        undo_rename_action = QtGui.QAction("Undo last rename", self)
+        undo_rename_action.triggered.connect(self.undo_last_rename)
+        file_menu.addAction(undo_rename_action)
+
         layout = self.layout()
         layout.setMenuBar(menu_bar)
 
@@ -546,6 +997,179 @@ class MainWindow(QtWidgets.QWidget):
             self.destination_input.setText(folder)
             save_params({"last_destination": folder})
 
+    def browse_backup_destination(self):
+        folder = QtWidgets.QFileDialog.getExistingDirectory(self, "Ajouter un dossier de backup")
+        if folder:
+            backups = self.get_backup_folders()
+            if folder not in backups:
+                backups.append(folder)
+            self.backup_input.setText(";".join(backups))
+            save_params({"last_backup_destinations": backups})
+
+    def get_backup_folders(self):
+        return [folder.strip() for folder in self.backup_input.text().split(";") if folder.strip()]
+
+    def job_destination_folders(self):
+        """Destination principale puis backups, sans doublon ; vide si aucune destination saisie."""
+        destination_folder = self.destination_input.text().strip()
+        if not destination_folder:
+            return []
+        destination_folders = [destination_folder]
+        for folder in self.get_backup_folders():
+            if os.path.normpath(folder) not in [os.path.normpath(f) for f in destination_folders]:
+                destination_folders.append(folder)
+        return destination_folders
+
+    def planned_entries(self):
+        """[(source, nouveau nom)] dans l'ordre de la liste, avec attribution des index C###."""
+        entries = []
+        for i in range(self.drop_list.count()):
+            item = self.drop_list.item(i)
+            item.setData(QtCore.Qt.UserRole + 2, i + 1)
+            entries.append((item.data(QtCore.Qt.UserRole), self.renamed_basename(item)))
+        return entries
+
+    def show_dry_run(self):
+        if not self.drop_list.count():
+            QtWidgets.QMessageBox.information(self, "Job plan", "No video file in the list.")
+            return
+        settings = load_params()
+        destinations = [] if settings.get("rename_only", False) else self.job_destination_folders()
+        self.show_job_plan(plan_job(self.planned_entries(), destinations, settings.get("space_headroom_pct", 2),
+                                    settings.get("camera_profile", "auto")))
+
+    def show_job_plan(self, plan, can_start=False):
+        """Plan du job (ordre, noms, tailles, place, durée) ; retourne True si l'utilisateur lance la copie."""
+        dialog = QtWidgets.QDialog(self)
+        dialog.setWindowTitle("Job plan")
+        dialog.resize(720, 480)
+        layout = QtWidgets.QVBoxLayout(dialog)
+
+        table = QtWidgets.QTableWidget(len(plan.files), 4)
+        table.setHorizontalHeaderLabels(["#", "Source", "Nouveau nom", "Taille"])
+        table.verticalHeader().setVisible(False)
+        table.setEditTriggers(QtWidgets.QAbstractItemView.NoEditTriggers)
+        for row, (src, size, new_name) in enumerate(plan.files):
+            size_text = f"{size / 1024 ** 2:.1f} MB" if size is not None else "introuvable"
+            for column, text in enumerate((str(row + 1), os.path.basename(src), new_name, size_text)):
+                table.setItem(row, column, QtWidgets.QTableWidgetItem(text))
+        table.resizeColumnsToContents()
+        table.horizontalHeader().setStretchLastSection(True)
+        layout.addWidget(table)
+
+        lines = [f"{len(plan.files)} fichier(s), {plan.total_bytes / 1024 ** 3:.2f} GB"]
+        for volume in plan.volumes:
+            free = f"{volume['free'] / 1024 ** 3:.1f} GB libres" if volume["free"] is not None else "place libre inconnue"
+            lines.append(f"{', '.join(volume['folders'])} : {volume['needed'] / 1024 ** 3:.1f} GB requis, {free}")
+        if plan.destinations:
+            duration = plan.duration()
+            if duration is None:
+                lines.append("Durée prévue : inconnue (aucun job précédent entre ces volumes)")
+            else:
+                end = datetime.datetime.now() + datetime.timedelta(seconds=duration)
+                lines.append(f"Durée prévue copie + vérification : {format_eta(duration)} (fin vers {end:%H:%M})")
+        if plan.sidecars:
+            kinds = sorted({os.path.splitext(path)[1].upper() for path in plan.sidecars})
+            lines.append(f"Fichiers compagnons non copiés : {len(plan.sidecars)} ({', '.join(kinds)})")
+        summary = QtWidgets.QLabel("\n".join(lines))
+        layout.addWidget(summary)
+        if not plan.ok:
+            problems = QtWidgets.QLabel("\n".join(plan.problems()))
+            problems.setStyleSheet("color: #e05050;")
+            layout.addWidget(problems)
+
+        buttons = QtWidgets.QDialogButtonBox()
+        if can_start and plan.ok:
+            buttons.addButton("Start", QtWidgets.QDialogButtonBox.AcceptRole)
+            buttons.addButton(QtWidgets.QDialogButtonBox.Cancel)
+        else:
+            buttons.addButton(QtWidgets.QDialogButtonBox.Close)
+        buttons.accepted.connect(dialog.accept)
+        buttons.rejected.connect(dialog.reject)
+        layout.addWidget(buttons)
+        return dialog.exec() == QtWidgets.QDialog.Accepted
+
+    def spot_check_from_tree(self):
+        """Contrôle ponctuel d'un labroll déjà livré : quelques chunks par clip relus contre l'arbre exporté."""
+        tree_path, _ = QtWidgets.QFileDialog.getOpenFileName(self, "Sélectionner un arbre de hash", "",
+                                                             f"Arbres de hash (*{TREE_SUFFIX})")
+        if not tree_path:
+            return
+        try:
+            trees = load_trees(tree_path)
+        except (OSError, ValueError, KeyError) as e:
+            QtWidgets.QMessageBox.critical(self, "Spot-check", f"Arbre illisible :\n{e}")
+            return
+        folder = os.path.dirname(tree_path)
+        passed, problems = 0, []
+        QtWidgets.QApplication.setOverrideCursor(QtCore.Qt.WaitCursor)
+        try:
+            for name, tree in trees.items():
+                path = os.path.join(folder, name)
+                try:
+                    bad = spot_check(path, tree)
+                except OSError as e:
+                    problems.append(f"{name} : {e}")
+                    continue
+                if bad:
+                    problems.append(f"{name} : chunk(s) corrompu(s) {tree.ranges(bad)}")
+                else:
+                    passed += 1
+        finally:
+            QtWidgets.QApplication.restoreOverrideCursor()
+        print(f"[SPOT-CHECK] {tree_path} : {passed} / {len(trees)} clip(s) conforme(s)")
+        for problem in problems:
+            print(f"[SPOT-CHECK] {problem}")
+        if problems:
+            QtWidgets.QMessageBox.warning(self, "Spot-check", f"{passed} / {len(trees)} clip(s) conforme(s).\n\n"
+                                          + "\n".join(problems))
+        else:
+            QtWidgets.QMessageBox.information(self, "Spot-check", f"{passed} / {len(trees)} clip(s) conforme(s).")
+
+    def show_probe_latency(self):
+        """Latence de lecture des métadonnées de chaque clip du dernier dépôt, par volume source."""
+        log = list(self.drop_list.probe_log)
+        dialog = QtWidgets.QDialog(self)
+        dialog.setWindowTitle("Metadata probe latency")
+        dialog.resize(720, 480)
+        layout = QtWidgets.QVBoxLayout(dialog)
+
+        mounts = {}
+        by_mount = {}
+        table = QtWidgets.QTableWidget(len(log), 3)
+        table.setHorizontalHeaderLabels(["Fichier", "Volume", "Latence"])
+        table.verticalHeader().setVisible(False)
+        table.setEditTriggers(QtWidgets.QAbstractItemView.NoEditTriggers)
+        for row, (path, latency) in enumerate(log):
+            folder = os.path.dirname(path)
+            if folder not in mounts:
+                mounts[folder] = mount_point(folder)
+            by_mount.setdefault(mounts[folder], []).append(latency)
+            for column, text in enumerate((os.path.basename(path), mounts[folder], f"{latency * 1000:.1f} ms")):
+                table.setItem(row, column, QtWidgets.QTableWidgetItem(text))
+        table.resizeColumnsToContents()
+        table.horizontalHeader().setStretchLastSection(True)
+        layout.addWidget(table)
+
+        def percentiles(latencies):
+            latencies = sorted(latencies)
+            median = latencies[len(latencies) // 2]
+            p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+            return f"médiane {median * 1000:.2f} ms, p95 {p95 * 1000:.2f} ms, max {latencies[-1] * 1000:.1f} ms"
+
+        if log:
+            lines = [f"{len(log)} clip(s) : {percentiles([latency for _, latency in log])}"]
+            for mount, latencies in by_mount.items():
+                lines.append(f"{mount} : {len(latencies)} clip(s), {percentiles(latencies)}")
+        else:
+            lines = ["Aucun dépôt depuis le lancement."]
+        layout.addWidget(QtWidgets.QLabel("\n".join(lines)))
+
+        buttons = QtWidgets.QDialogButtonBox(QtWidgets.QDialogButtonBox.Close)
+        buttons.rejected.connect(dialog.reject)
+        layout.addWidget(buttons)
+        dialog.exec()
+
     def drop_list_clear(self):
         self.drop_list.clear()
         self.drop_list.setStyleSheet("background-color: transparent; margin: 4px; background-color: #303030;")
@@ -554,13 +1178,15 @@ class MainWindow(QtWidgets.QWidget):
         self.counter_label.setText("0 / 0")
         self.percent_label.setText("0.0 %")
         self.status_icon_label.clear()
+        self.destinations_label.setVisible(False)
         self.resume_button.setEnabled(False)
 
     def process_labroll(self):
         # Inserted block: load settings and update labroll input
         settings = load_params()
-        # Copie toujours séquentielle pour garantir l’ordre
-        self.max_threads = 1
+        # L'index C### est attribué à chaque item avant le lancement : les copies peuvent
+        # tourner en parallèle, noms, log et manifestes suivent l'ordre de la liste
+        self.max_threads = max(1, int(settings.get("nb_thread", MAX_CONCURRENT_THREADS)))
         export_mhl = settings.get("export_mhl", True)
         export_json = settings.get("export_json", True)
         rename_only = settings.get("rename_only", False)
@@ -576,23 +1202,32 @@ class MainWindow(QtWidgets.QWidget):
             file_path = item.data(QtCore.Qt.UserRole)
             self.files_to_process.append(file_path)
             item.setData(QtCore.Qt.UserRole + 2, i + 1)  # Stocker l'ordre visuel (1-based index)
-        self.total_bytes = sum(os.path.getsize(path) for path in self.files_to_process if os.path.exists(path))
         self.copied_bytes = 0
+        self.progress_counters.reset()
+        # Nouveau job : les vérifications annulées du précédent ne seront pas relancées ;
+        # seules celles encore en cours restent suivies jusqu'à leur fin, sans compter pour ce job
+        self.job_id += 1
+        self.verify_tasks = {path: task for path, task in self.verify_tasks.items() if task.started}
+        self.reverify_tasks = {}
 
         if self.rename_only:
             self.destination_folder = ""
+            self.destination_folders = []
         else:
-            destination_folder = self.destination_input.text().strip()
-            if not destination_folder:
+            destination_folders = self.job_destination_folders()
+            if not destination_folders:
                 QtWidgets.QMessageBox.warning(self, "Erreur", "Veuillez sélectionner un dossier de destination.")
                 return
+            destination_folder = destination_folders[0]
             try:
-                os.makedirs(destination_folder, exist_ok=True)
+                for folder in destination_folders:
+                    os.makedirs(folder, exist_ok=True)
             except Exception as e:
                 QtWidgets.QMessageBox.critical(self, "Erreur", f"Impossible de créer le dossier :\n{e}")
                 return
             self.destination_folder = destination_folder
-            save_params({"last_destination": destination_folder})
+            self.destination_folders = destination_folders
+            save_params({"last_destination": destination_folder, "last_backup_destinations": destination_folders[1:]})
 
         labroll_name = self.labroll_input.text().strip()
         # Save last labroll name
@@ -607,12 +1242,24 @@ class MainWindow(QtWidgets.QWidget):
             QtWidgets.QMessageBox.warning(self, "Aucun fichier", "No video file in the list.")
             return
 
+        if self.rename_only:
+            self.total_bytes = sum(os.path.getsize(path) for path in self.files_to_process if os.path.exists(path))
+        else:
+            # Pré-vol : chaque source statée une fois, place vérifiée sur chaque volume de destination
+            plan = plan_job(self.planned_entries(), self.destination_folders,
+                            settings.get("space_headroom_pct", 2), settings.get("camera_profile", "auto"))
+            if not plan.ok or settings.get("confirm_job_plan", False):
+                if not self.show_job_plan(plan, can_start=True):
+                    return
+            self.total_bytes = plan.total_bytes
+
         # Réinitialiser les icônes dans la liste
         for i in range(self.drop_list.count()):
             item = self.drop_list.item(i)
             item.setIcon(self.img_unchecked)
 
         self.completed_count = 0
+        self.copied_count = 0
         self.progress_bar.setMaximum(100)
         self.progress_bar.setValue(0)
         self.progress_bar.setVisible(True)
@@ -621,19 +1268,60 @@ class MainWindow(QtWidgets.QWidget):
         self.cancel_button.setEnabled(True)
         self.rename_button.setEnabled(False)
         self.queue = deque(self.files_to_process)
-        self.active_threads = []
+        self.copy_pool.setMaxThreadCount(max(1, self.max_threads))
+        self.paused = False
         self.hash_log = {}
+        self.verified_destinations = {}
+        self.hash_trees = {}
+        self.verify_bytes_start = self.hash_pool.bytes_hashed()
+        self.copy_stats = {"bytes": 0, "seconds": 0.0, "preallocate": 0.0, "sync": 0.0, "job_sync": 0.0,
+                           "cache_flush": 0.0}
+        self.job_cached_bytes = None
+        self.job_started = time.perf_counter()
+        # Regrouper les fichiers par périphérique source / destination pour limiter
+        # les flux simultanés sur un même disque
+        self.scheduler = DeviceScheduler()
+        self.job_devices = {}
+        if not self.rename_only:
+            destination_keys = [self.scheduler.register(folder) for folder in self.destination_folders]
+            self.destination_kinds = [self.scheduler.kind(key) for key in destination_keys]
+            for path in self.files_to_process:
+                self.job_devices[path] = [self.scheduler.register(path, sample_file=path)] + destination_keys
+        self.progress_counters.reset(len(self.destination_folders))
+        self.destinations_label.setVisible(len(self.destination_folders) > 1)
+        self.update_destinations_label()
+        if not self.rename_only:
+            self.start_rate_estimation()
+            # ETA affichée dès le départ si ce lecteur et ces destinations ont déjà servi
+            self.refresh_progress()
+            self.progress_timer.start()
         timestamp = datetime.datetime.now().strftime("%Y-%m-%d_%H%M%S")
-        self.mhl_file_path = os.path.join(self.destination_folder, f"{labroll_name}_{timestamp}.mhl")
+        self.manifest_basename = f"{labroll_name}_{timestamp}"
+        self.mhl_file_path = os.path.join(self.destination_folder, f"{self.manifest_basename}.mhl")
         self.start_next_threads(labroll_name, self.destination_folder)
         self.resume_button.setEnabled(False)
 
     def start_next_threads(self, labroll_name, destination_folder):
         # Prepare camid and assign index for each file
         camid = self.camid_input.text().strip()
-        # Launch threads in the order of files_to_process
-        while self.queue and len(self.active_threads) < self.max_threads:
-            file_path = self.queue.popleft()
+        settings = load_params()
+        if self.paused:
+            return
+        if self.rename_only:
+            self.start_batch_rename(list(self.queue))
+            self.queue.clear()
+            return
+        # Launch threads in the order of files_to_process, en sautant les fichiers dont
+        # un périphérique (source ou destination) a déjà atteint sa limite de flux
+        while self.queue and len(self.active_jobs) < self.max_threads:
+            # Un fichier dont la copie annulée n'a pas encore rendu la main attend son tour
+            file_path = next((path for path in self.queue if path not in self.active_jobs
+                              and self.scheduler.can_start(self.job_devices.get(path, []))), None)
+            if file_path is None:
+                break
+            self.queue.remove(file_path)
+            index = 1  # valeur de secours
+            original_name = os.path.basename(file_path)
             try:
                 for i in range(self.drop_list.count()):
                     item = self.drop_list.item(i)
@@ -643,86 +1331,225 @@ class MainWindow(QtWidgets.QWidget):
                         index = item.data(QtCore.Qt.UserRole + 2)
                         original_name = item.data(QtCore.Qt.UserRole + 1)
                         break
-                else:
-                    index = 1  # valeur de secours
             except ValueError:
                 continue  # skip if file_path not found
-            thread = QtCore.QThread()
-            worker = CopyRenameWorker(file_path, labroll_name, destination_folder, camid=camid, labroll_index=index, original_name=original_name)
-            worker.rename_only = self.rename_only
-            worker.moveToThread(thread)
-
-            thread.started.connect(worker.run)
-            worker.finished.connect(self.on_file_processed, QtCore.Qt.QueuedConnection)
-            worker.finished.connect(thread.quit)
-            worker.finished.connect(worker.deleteLater)
-            thread.finished.connect(thread.deleteLater)
-            thread.finished.connect(lambda t=thread: self.thread_finished(t))
-            # Connect progress signal for copy mode only
-            if not self.rename_only:
-                worker.progress.connect(self.on_copy_progress, QtCore.Qt.QueuedConnection)
-
-            def thread_finished(self, thread):
-                if thread in self.active_threads:
-                    self.active_threads.remove(thread)
-
-                if self.queue:
-                    QtCore.QTimer.singleShot(
-                        0,
-                        lambda: self.start_next_threads(self.labroll_input.text(), self.destination_folder)
-                    )
-
-            thread.start()
-            self.active_threads.append(thread)
-            self.threads.append((thread, worker))
-    def on_copy_progress(self, bytes_chunk, total_file_size):
-        now = QtCore.QTime.currentTime()
-
-        if self.current_file_start_time is None:
-            self.current_file_start_time = QtCore.QTime.currentTime()
-            self.current_file_size = total_file_size
-            self.current_file_copied = 0
-
-        self.current_file_copied += bytes_chunk
-        self.copied_bytes += bytes_chunk
-
-        # Clamp global_percent
-        if self.total_bytes > 0:
-            global_percent = min(
-                100.0,
-                (self.copied_bytes / self.total_bytes) * 100
-            )
-        else:
-            global_percent = 0.0
+            worker = CopyRenameWorker(file_path, labroll_name, self.destination_folders or destination_folder,
+                                      self.copy_signals, self.progress_counters, camid=camid,
+                                      labroll_index=index, original_name=original_name,
+                                      chunk_size=int(settings.get("chunk_size_mb", 1) * 1024 * 1024),
+                                      ring_size=settings.get("ring_size", 8),
+                                      resumable=settings.get("resumable_copies", True),
+                                      hash_algorithms=settings.get("hash_algorithms"),
+                                      cache_window=self.cache_window(),
+                                      preallocate_dest=settings.get("preallocate", True),
+                                      durability=settings.get("durability", "file"),
+                                      fast_copy=settings.get("fast_copy", True),
+                                      inline_hash=settings.get("inline_hash", True),
+                                      range_parallel=settings.get("range_parallel", "network"),
+                                      range_streams=int(settings.get("range_streams", 4)),
+                                      write_latency=settings.get("debug_write_latency_ms", 0) / 1000,
+                                      destination_kinds=self.destination_kinds)
+            worker.devices = self.job_devices.get(file_path, [])
+            self.scheduler.acquire(worker.devices)
+            self.active_jobs[file_path] = worker
+            self.copy_pool.start(worker)
+    def stop_progress_if_idle(self):
+        """Plus de copie ni de vérification en cours (fin de job ou annulation) : dernier affichage."""
+        if self.active_jobs or self.verify_tasks or (self.queue and not self.paused):
+            return
+        self.progress_timer.stop()
+        self.refresh_progress()
+        self.last_refresh = None
+
+    def start_rate_estimation(self):
+        """Débits lissés copie / vérification, amorcés par l'historique des mêmes volumes."""
+        source = self.files_to_process[0] if getattr(self, "files_to_process", None) else None
+        known = source is not None and self.destination_folders
+        self.copy_rate = EwmaRate(initial=history_rate(source, self.destination_folders, "copy") if known else None)
+        self.verify_rate = EwmaRate(initial=history_rate(source, self.destination_folders, "verify") if known else None)
+        # Temps pendant lequel chaque phase a réellement tourné, pour le débit moyen du job
+        self.phase_busy = {"copy": 0.0, "verify": 0.0}
+        self.last_refresh = None
+
+    def estimated_remaining(self, copied, verified):
+        """Secondes restantes : la plus lente des deux phases, qui se recouvrent."""
+        return estimate_duration(max(0, self.total_bytes - copied),
+                                 max(0, self.total_bytes * len(self.destination_folders) - verified),
+                                 self.copy_rate.rate, self.verify_rate.rate)
+
+    def record_job_rates(self):
+        """Débits moyens du job mémorisés pour le couple source / destinations ; résumé pour le log."""
+        source = self.files_to_process[0]
+        snapshot = self.progress_counters.snapshot()
+        measured = {"copy": snapshot["source"] - snapshot["resumed"],
+                    "verify": self.hash_pool.bytes_hashed() - self.verify_bytes_start}
+        parts = []
+        for phase, label in (("copy", "copie"), ("verify", "vérification")):
+            busy = self.phase_busy[phase]
+            # En dessous d'une seconde, la mesure dit plus sur le rafraîchissement que sur le disque
+            if busy < 1.0 or measured[phase] <= 0:
+                continue
+            rate = measured[phase] / busy
+            record_rate(source, self.destination_folders, phase, rate)
+            parts.append(f"{label} {rate / 1024 ** 2:.0f} MB/s")
+        return f"Débit : {' | '.join(parts)}" if parts else ""
 
+    def refresh_progress(self):
+        """Lecture périodique des compteurs : coût d'affichage fixe, quel que soit le débit."""
+        if self.rename_only:
+            return
+        snapshot = self.progress_counters.snapshot()
+        self.copied_bytes = snapshot["source"]
+        verified = self.hash_pool.bytes_hashed() - self.verify_bytes_start
+        now = time.monotonic()
+        dt = now - self.last_refresh if self.last_refresh is not None else 0.0
+        self.last_refresh = now
+        # Phase inactive : pas d'échantillon, sinon le débit lissé retomberait vers zéro
+        for phase, rate, active, value in (("copy", self.copy_rate, self.active_jobs, self.copied_bytes - snapshot["resumed"]),
+                                           ("verify", self.verify_rate, self.verify_tasks, verified)):
+            if active:
+                rate.update(value, now)
+                self.phase_busy[phase] += dt
+            else:
+                rate.pause()
+        if self.progress_bar.maximum() == 0 or self.progress_bar.isHidden():
+            # Phase de finalisation (progression indéterminée) : ne pas réécrire le libellé
+            return
+        global_percent = min(100.0, self.copied_bytes / self.total_bytes * 100) if self.total_bytes else 0.0
         copied_gb = self.copied_bytes / (1024 ** 3)
         total_gb = self.total_bytes / (1024 ** 3)
-
+        text = f"{global_percent:.1f} % ({copied_gb:.2f} / {total_gb:.2f} GB)"
+        if self.active_jobs and self.copy_rate.rate:
+            text += f" | copy {self.copy_rate.rate / 1024 ** 2:.0f} MB/s"
+        if self.verify_tasks and self.verify_rate.rate:
+            text += f" | verify {self.verify_rate.rate / 1024 ** 2:.0f} MB/s"
+        if self.active_jobs or self.verify_tasks or (self.queue and not self.paused):
+            text += f" | ETA {format_eta(self.estimated_remaining(self.copied_bytes, verified))}"
         self.progress_bar.setValue(int(global_percent))
-        self.percent_label.setText(
-            f"{global_percent:.1f} % ({copied_gb:.2f} / {total_gb:.2f} GB)"
-        )
-
-    def thread_finished(self, thread):
-        if thread in self.active_threads:
-            self.active_threads.remove(thread)
+        self.percent_label.setText(text)
+        # Fichiers en cours : pourcentage individuel en infobulle de la barre
+        self.progress_bar.setToolTip("\n".join(
+            f"{os.path.basename(path)} : {done / size * 100 if size else 100:.0f} %"
+            for path, (done, size) in snapshot["files"].items()))
+        self.update_destinations_label(snapshot["destinations"])
+        self.update_counter_label()
+
+    def update_destinations_label(self, destination_copied=None):
+        if len(self.destination_folders) < 2:
+            return
+        destination_copied = destination_copied or self.progress_counters.snapshot()["destinations"]
+        parts = []
+        for i, folder in enumerate(self.destination_folders):
+            name = os.path.basename(os.path.normpath(folder)) or folder
+            copied = destination_copied[i] if i < len(destination_copied) else 0
+            parts.append(f"{name} : {copied / (1024 ** 3):.2f} GB")
+        self.destinations_label.setText(" | ".join(parts))
+
+    def start_batch_rename(self, paths):
+        if not paths:
+            return
+        items = {}
+        for i in range(self.drop_list.count()):
+            item = self.drop_list.item(i)
+            items[item.data(QtCore.Qt.UserRole)] = item
+        pairs = [(path, os.path.join(os.path.dirname(path), self.renamed_basename(items[path])))
+                 for path in paths if path in items]
+        timestamp = datetime.datetime.now().strftime("%Y-%m-%d_%H%M%S")
+        journal_path = os.path.join(os.path.dirname(paths[0]),
+                                    f"{self.labroll_input.text()}_{timestamp}{RENAME_JOURNAL_SUFFIX}")
+        # Journal d'annulation : Fichier > Undo last rename
+        save_params({"last_rename_journal": journal_path})
+        worker = BatchRenameWorker(pairs, journal_path, self.rename_signals)
+        self.active_jobs["__rename__"] = worker
+        self.copy_pool.start(worker)
+
+    def on_batch_rename_progress(self, steps, total):
+        percent = 100 * steps / total if total else 100
+        self.progress_bar.setValue(int(percent))
+        self.percent_label.setText(f"{percent:.1f} %")
+
+    def on_batch_renamed(self, results, error):
+        self.active_jobs.pop("__rename__", None)
+        if error:
+            QtWidgets.QMessageBox.warning(self, "Renommage impossible", error)
+        if not results:
+            # Plan refusé ou renommage annulé : rien n'a changé sur le disque
+            self.cancel_button.setEnabled(False)
+            self.rename_button.setEnabled(True)
+            self.resume_button.setEnabled(self.paused)
+            return
+        # Mise à jour groupée de la liste ; le dernier fichier passe par on_file_processed
+        # pour déclencher la finalisation habituelle (log, notifications)
+        status = {src: success for src, _, success in results}
+        for i in range(self.drop_list.count()):
+            item = self.drop_list.item(i)
+            path = item.data(QtCore.Qt.UserRole)
+            if path not in status or path == results[-1][0] or item.data(QtCore.Qt.UserRole + 4):
+                continue
+            widget = self.drop_list.itemWidget(item)
+            if widget and widget.layout() and widget.layout().count() >= 1:
+                name_label = widget.layout().itemAt(0).widget()
+                if isinstance(name_label, QtWidgets.QLabel):
+                    name_label.setText(self.renamed_basename(item))
+            item.setIcon(self.img_checked if status[path] else self.img_error)
+            item.setData(QtCore.Qt.UserRole + 4, True)
+            self.completed_count += 1
+        self.on_file_processed(results[-1][0], results[-1][2], "", [])
+
+    def undo_last_rename(self):
+        journal_path = load_params().get("last_rename_journal", "")
+        if not journal_path or not os.path.exists(journal_path):
+            QtWidgets.QMessageBox.information(self, "Undo", "Aucun renommage à annuler.")
+            return
+        reply = QtWidgets.QMessageBox.question(self, "Undo", f"Rétablir les noms d'origine consignés dans\n{journal_path} ?",
+                                               QtWidgets.QMessageBox.Yes | QtWidgets.QMessageBox.No)
+        if reply != QtWidgets.QMessageBox.Yes:
+            return
+        try:
+            restored = undo_renames(journal_path)
+        except OSError as e:
+            QtWidgets.QMessageBox.critical(self, "Undo", f"Annulation interrompue :\n{e}")
+            return
+        # Les items gardent le chemin d'origine : il redevient valide
+        for i in range(self.drop_list.count()):
+            item = self.drop_list.item(i)
+            if item.data(QtCore.Qt.UserRole + 4) and os.path.exists(item.data(QtCore.Qt.UserRole)):
+                widget = self.drop_list.itemWidget(item)
+                if widget and widget.layout() and widget.layout().count() >= 1:
+                    name_label = widget.layout().itemAt(0).widget()
+                    if isinstance(name_label, QtWidgets.QLabel):
+                        name_label.setText(item.data(QtCore.Qt.UserRole + 1))
+                item.setIcon(self.img_unchecked)
+                item.setData(QtCore.Qt.UserRole + 4, None)
+        QtWidgets.QMessageBox.information(self, "Undo", f"{restored} fichier(s) restauré(s).")
+
+    def on_worker_done(self, file_path):
+        worker = self.active_jobs.pop(file_path, None)
+        if worker is not None:
+            self.scheduler.release(worker.devices)
+        self.stop_progress_if_idle()
         if self.queue:  # uniquement si la queue n’a pas été vidée
             self.start_next_threads(self.labroll_input.text(), self.destination_folder)
     def cancel_all(self):
+        # Parcours de dossiers en cours : les clips déjà listés restent, le reste est abandonné
+        self.drop_list.cancel_scan()
+        if not self.active_jobs and not self.verify_tasks and (not self.queue or self.paused):
+            return
         reply = QtWidgets.QMessageBox.question(self, "Confirmation", "Êtes-vous sûr de vouloir annuler la copie en cours ?",
                                                QtWidgets.QMessageBox.Yes | QtWidgets.QMessageBox.No)
         if reply == QtWidgets.QMessageBox.Yes:
-            # PATCH: interruption immédiate sans thread.quit/wait, seulement interrupt + requestInterruption
-            for thread, worker in list(self.threads):
-                try:
-                    if thread is not None and thread.isRunning():
-                        worker.interrupt()
-                        thread.requestInterruption()
-                except RuntimeError:
-                    continue
-            # Après l'annulation, ne pas bloquer, juste nettoyer
-            self.threads = []
-            self.active_threads = []
+            # Interruption immédiate : chaque worker actif s'arrête au prochain chunk et rend
+            # son créneau (et ses périphériques) par le signal done
+            for worker in list(self.active_jobs.values()):
+                worker.interrupt()
+            # Après l'annulation, ne plus lancer de copie jusqu'au Restart ; les vérifications
+            # en attente sont retirées du pool (celles en cours vont à leur terme)
+            self.paused = True
+            self.verify_pool.clear()
+            for file_path, task in list(self.verify_tasks.items()):
+                if not task.started:
+                    self.reverify_tasks[file_path] = self.verify_tasks.pop(file_path)
+            self.stop_progress_if_idle()
             # The following block for deleting unprocessed files is intentionally removed to allow resuming without loss.
             # Only keep files in the queue that are not already marked as checked (successfully processed)
             remaining = []
@@ -735,36 +1562,160 @@ class MainWindow(QtWidgets.QWidget):
             self.cancel_button.setEnabled(False)
             self.rename_button.setEnabled(True)
             self.resume_button.setEnabled(True)
-            # PATCH: Forcer un rafraîchissement UI non bloquant après interruption
-            QtCore.QCoreApplication.processEvents(QtCore.QEventLoop.AllEvents, 100)
+
+    def on_copy_stats(self, file_path, stats):
+        for key, value in stats.items():
+            self.copy_stats[key] += value
+
+    def renamed_basename(self, item):
+        labroll_index = item.data(QtCore.Qt.UserRole + 2)
+        ext = os.path.splitext(item.data(QtCore.Qt.UserRole))[1]
+        date_suffix = datetime.datetime.now().strftime("%Y%m%d")
+        camid = self.camid_input.text().strip()
+        return f"{self.labroll_input.text()}C{labroll_index:03d}_{date_suffix}{'_' + camid if camid else ''}{ext}"
+
+    def sync_job_files(self):
+        """Niveau "job" : un fsync groupé de toutes les destinations avant les manifestes."""
+        started = time.perf_counter()
+        for file_path, folders in self.verified_destinations.items():
+            for i in range(self.drop_list.count()):
+                item = self.drop_list.item(i)
+                if item.data(QtCore.Qt.UserRole) != file_path:
+                    continue
+                name = self.renamed_basename(item)
+                for folder in folders:
+                    try:
+                        sync_path(os.path.join(folder, name))
+                    except OSError as e:
+                        print(f"fsync impossible sur {os.path.join(folder, name)} : {e}")
+                break
+        for folder in self.destination_folders:
+            try:
+                sync_path(folder)
+            except OSError:
+                pass
+        self.copy_stats["job_sync"] += time.perf_counter() - started
+
+    def durability_summary(self):
+        level = normalize_durability(load_params().get("durability", "file"))
+        stats = self.copy_stats
+        sync_time = stats["sync"] if level == "file" else stats["job_sync"]
+        summary = f"Durabilité : {level} | préallocation {stats['preallocate']:.2f} s | fsync {sync_time:.2f} s"
+        if stats["seconds"] > 0:
+            speed = stats["bytes"] / stats["seconds"] / 1024 ** 2
+            summary += f" | copie {speed:.0f} MB/s par flux"
+            if level == "file" and stats["seconds"] > stats["sync"]:
+                summary += f" ({stats['bytes'] / (stats['seconds'] - stats['sync']) / 1024 ** 2:.0f} MB/s hors fsync)"
+        if stats["cache_flush"]:
+            # Page cache géré : attente d'écriture des fenêtres avant leur libération
+            summary += f" | écriture des fenêtres de cache {stats['cache_flush']:.2f} s"
+        elapsed = time.perf_counter() - self.job_started
+        if level == "job" and elapsed > 0:
+            summary += f" | fsync final {100 * stats['job_sync'] / elapsed:.1f} % de la durée du job"
+        return summary
+
+    def on_file_copied(self, file_path, checksum, targets, tree):
+        self.copied_count += 1
+        self.set_item_state(file_path, "copied")
+        self.update_counter_label()
+        self.hash_trees[file_path] = tree
+        self.submit_verification(file_path, checksum, targets, tree)
+
+    def cache_window(self):
+        # Mode cache géré : 0 = copie bufferisée classique
+        settings = load_params()
+        if not settings.get("managed_page_cache", False):
+            return 0
+        return int(settings.get("cache_window_mb", 64) * 1024 * 1024)
+
+    def submit_verification(self, file_path, checksum, targets, tree=None):
+        managed = bool(self.cache_window())
+        task = VerifyTask(file_path, checksum, targets, self.verify_signals,
+                          chunk_size=int(load_params().get("chunk_size_mb", 1) * 1024 * 1024), tree=tree,
+                          drop_cache=managed, hasher=self.hash_pool, measure_cache=managed, job_id=self.job_id)
+        self.verify_tasks[file_path] = task
+        self.verify_pool.start(task)
+
+    def on_file_verified(self, file_path, success, checksum, verified_destinations, job_id):
+        if job_id != self.job_id:
+            # Vérification d'un job annulé terminée pendant le job courant : seule la tâche est
+            # retirée, ni compteurs ni manifestes (le même clip peut avoir une tâche du job courant)
+            task = self.verify_tasks.get(file_path)
+            if task is not None and task.job_id == job_id:
+                del self.verify_tasks[file_path]
+            self.stop_progress_if_idle()
+            return
+        task = self.verify_tasks.pop(file_path, None)
+        if task is not None and task.cached is not None:
+            self.job_cached_bytes = (self.job_cached_bytes or 0) + task.cached
+        # Tâche démarrée juste avant l'annulation : rien à revérifier
+        self.reverify_tasks.pop(file_path, None)
+        self.stop_progress_if_idle()
+        self.set_item_state(file_path, "verified" if success else "failed")
+        self.on_file_processed(file_path, success, checksum, verified_destinations)
+
+    def set_item_state(self, file_path, state):
+        # État distinct par item : "copied" (en attente de vérification) puis "verified" / "failed"
+        for i in range(self.drop_list.count()):
+            item = self.drop_list.item(i)
+            if item.data(QtCore.Qt.UserRole) == file_path:
+                item.setData(QtCore.Qt.UserRole + 5, state)
+                item.setToolTip(state)
+                break
+
+    def update_counter_label(self):
+        total = len(self.files_to_process)
+        if self.rename_only or self.copied_count <= self.completed_count:
+            self.counter_label.setText(f"{self.completed_count} / {total}")
+        else:
+            self.counter_label.setText(f"{self.completed_count} / {total} (copied {self.copied_count})")
+        if self.verify_tasks:
+            verified_gb = (self.hash_pool.bytes_hashed() - self.verify_bytes_start) / 1024 ** 3
+            self.counter_label.setText(f"{self.counter_label.text()} | verify {verified_gb:.1f} GB")
+
+    def on_file_interrupted(self, file_path):
+        # Le worker a déjà retiré sa contribution des compteurs
+        for i in range(self.drop_list.count()):
+            item = self.drop_list.item(i)
+            if item.data(QtCore.Qt.UserRole) == file_path:
+                item.setIcon(self.img_unchecked)
+                break
 
     def resume_copy(self):
         self.resume_button.setEnabled(False)
         self.rename_button.setEnabled(False)
         self.cancel_button.setEnabled(True)
 
+        # Relancer tout ce qui n'est pas vérifié : les copies interrompues repartent
+        # de leur journal (<fichier>.lrjournal), les échecs sont retentés
+        # Les fichiers déjà copiés dont la vérification a été retirée du pool sont
+        # simplement revérifiés, sans nouvelle copie
+        reverify, self.reverify_tasks = self.reverify_tasks, {}
+        for file_path, task in reverify.items():
+            self.submit_verification(file_path, task.checksum, task.targets, task.tree)
+
         remaining = []
         for i in range(self.drop_list.count()):
             item = self.drop_list.item(i)
-            file_path = item.data(QtCore.Qt.UserRole)
-            dest_name = f"{self.labroll_input.text()}_{os.path.basename(file_path)}"
-            dest_path = os.path.join(self.destination_folder, dest_name)
-
-            if not os.path.exists(dest_path):
-                remaining.append(file_path)
-            else:
-                # Vérifier si le fichier a été traité correctement (icone checked)
-                for j in range(self.drop_list.count()):
-                    check_item = self.drop_list.item(j)
-                    if check_item.data(QtCore.Qt.UserRole) == file_path:
-                        if check_item.icon().cacheKey() != self.img_checked.cacheKey():
-                            remaining.append(file_path)
-                        break
+            if item.icon().cacheKey() == self.img_checked.cacheKey():
+                continue
+            if item.data(QtCore.Qt.UserRole) in self.verify_tasks:
+                continue
+            if item.data(QtCore.Qt.UserRole + 5) == "failed":
+                self.copied_count -= 1
+            if item.data(QtCore.Qt.UserRole + 4):
+                # Échec déjà compté : il sera recompté à la fin de la nouvelle tentative
+                item.setData(QtCore.Qt.UserRole + 4, None)
+                self.completed_count -= 1
+            item.setIcon(self.img_unchecked)
+            remaining.append(item.data(QtCore.Qt.UserRole))
 
+        self.paused = False
         self.queue = deque(remaining)
+        self.progress_timer.start()
         self.start_next_threads(self.labroll_input.text(), self.destination_folder)
 
-    def on_file_processed(self, file_path, success, checksum):
+    def on_file_processed(self, file_path, success, checksum, verified_destinations=None):
         import json
         import getpass
         import socket
@@ -776,11 +1727,6 @@ class MainWindow(QtWidgets.QWidget):
             if it.data(QtCore.Qt.UserRole) == file_path and it.data(QtCore.Qt.UserRole + 4):
                 return
 
-        # Réinitialiser les compteurs de progression du fichier courant
-        self.current_file_start_time = None
-        self.current_file_copied = 0
-        self.current_file_size = 0
-
         # (SUPPRIMÉ) Phase de finalisation visuelle pour éviter l’impression de freeze
         # (Ce bloc a été supprimé pour laisser place à la progression indéterminée)
 
@@ -790,7 +1736,9 @@ class MainWindow(QtWidgets.QWidget):
         if self.rename_only:
             copied_size = os.path.getsize(file_path) if os.path.exists(file_path) else 0
             self.copied_bytes += copied_size
-        # For copy mode, copied_bytes is updated in on_copy_progress, do not increment here
+        else:
+            # Copie : octets comptés par les workers dans progress_counters
+            self.copied_bytes = self.progress_counters.snapshot()["source"]
         # Update progress bar value as percentage (0-100)
         if self.rename_only:
             percent = (self.completed_count / len(self.files_to_process)) * 100
@@ -798,7 +1746,7 @@ class MainWindow(QtWidgets.QWidget):
         else:
             percent = (self.copied_bytes / self.total_bytes) * 100 if self.total_bytes else 0
             self.progress_bar.setValue(min(round(percent), 100))
-        self.counter_label.setText(f"{self.completed_count} / {len(self.files_to_process)}")
+        self.update_counter_label()
         # Update percent label to include GB values (always show for both copy and rename)
         copied_gb = self.copied_bytes / (1024 ** 3)
         total_gb = self.total_bytes / (1024 ** 3)
@@ -807,8 +1755,8 @@ class MainWindow(QtWidgets.QWidget):
         else:
             self.percent_label.setText(f"{percent:.1f} % ({copied_gb:.1f} / {total_gb:.1f} GB)")
 
-        # Force UI update after each file processed
-        QtCore.QCoreApplication.processEvents()
+        # Pas de processEvents ici : avec des copies parallèles, il ferait ré-entrer
+        # on_file_processed avant la fin du traitement de ce fichier
 
         import os
         for i in range(self.drop_list.count()):
@@ -838,14 +1786,22 @@ class MainWindow(QtWidgets.QWidget):
                 break
 
         # Insert new logic for hash_log with renamed file as key
-        if success and checksum:
-            import os
-            # Compose the new (renamed) filename as key
-            new_basename = os.path.basename(file_path) if self.rename_only else os.path.basename(os.path.join(self.destination_folder, f"{self.labroll_input.text()}C{self.completed_count:03d}_{datetime.datetime.now().strftime('%Y%m%d')}{'_' + self.camid_input.text().strip() if self.camid_input.text().strip() else ''}{os.path.splitext(file_path)[1]}"))
+        if checksum:
+            # Le nom renommé dépend de l'index stocké sur l'item, pas de l'ordre de fin des copies
+            labroll_index = self.completed_count
+            for i in range(self.drop_list.count()):
+                item = self.drop_list.item(i)
+                if item.data(QtCore.Qt.UserRole) == file_path:
+                    labroll_index = item.data(QtCore.Qt.UserRole + 2) or labroll_index
+                    break
+            date_suffix = datetime.datetime.now().strftime('%Y%m%d')
+            camid = self.camid_input.text().strip()
+            new_basename = f"{self.labroll_input.text()}C{labroll_index:03d}_{date_suffix}{'_' + camid if camid else ''}{os.path.splitext(file_path)[1]}"
             self.hash_log[new_basename] = checksum
         # For backward compatibility, keep the old mapping as well
-        if success and checksum:
+        if checksum:
             self.hash_log[file_path] = checksum
+            self.verified_destinations[file_path] = list(verified_destinations or [])
 
         # --- PATCH 1: Forcer la progression à 100 % à la toute fin ---
         # (Déplacé, voir plus bas pour la nouvelle logique de progression indéterminée)
@@ -860,6 +1816,15 @@ class MainWindow(QtWidgets.QWidget):
             QtCore.QCoreApplication.processEvents()
 
         if self.completed_count == len(self.files_to_process):
+            self.progress_timer.stop()
+            rate_summary = self.record_job_rates() if not self.rename_only else ""
+            if not self.rename_only and normalize_durability(load_params().get("durability", "file")) == "job":
+                self.sync_job_files()
+            if not self.rename_only:
+                # Copies partielles d'un job abandonné (clips absents de celui-ci) : plus rien ne les reprendra
+                for journal_path in orphan_journals(self.destination_folders, self.files_to_process):
+                    print(f"Copie partielle abandonnée supprimée : {journal_path[:-len(JOURNAL_SUFFIX)]}")
+                    remove_partial_files([journal_path[:-len(JOURNAL_SUFFIX)], journal_path])
             # Export log if enabled
             if load_params().get("export_log", True):
                 try:
@@ -889,9 +1854,22 @@ class MainWindow(QtWidgets.QWidget):
                             else:
                                 new_name = f"{self.labroll_input.text()}C{labroll_index:03d}_{date_suffix}{ext}"
 
-                            hash_summary = self.hash_log.get(new_name, "") or self.hash_log.get(path, "")
+                            hash_summary = format_digests(self.hash_log.get(new_name) or self.hash_log.get(path))
                             index += 1
-                            log_file.write(f'[#{index:02d}] {orig_name} --> {new_name} | hash: {hash_summary}\n')
+                            # Timecode de début (MXF) : servi par le cache de métadonnées rempli au dépôt
+                            start_timecode = clip_metadata(path).get("start_timecode") if os.path.exists(path) else None
+                            timecode = f' | TC {start_timecode}' if start_timecode else ''
+                            log_file.write(f'[#{index:02d}] {orig_name} --> {new_name}{timecode} | hash: {hash_summary}\n')
+                        if not self.rename_only:
+                            footprint = footprint_summary(self.job_cached_bytes)
+                            print(f"[CACHE] {footprint}")
+                            log_file.write(f'\nPage cache : {"managed" if self.cache_window() else "default"} | {footprint}\n')
+                            durability = self.durability_summary()
+                            print(f"[DURABILITY] {durability}")
+                            log_file.write(f'{durability}\n')
+                            if rate_summary:
+                                print(f"[THROUGHPUT] {rate_summary}")
+                                log_file.write(f'{rate_summary}\n')
                         log_file.write(f'\n### END OF OPERATION at {datetime.datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%SZ")}')
                 except Exception as e:
                     print(f"Erreur lors de l'écriture du log : {e}")
@@ -909,7 +1887,6 @@ class MainWindow(QtWidgets.QWidget):
             self.progress_bar.setRange(0, 100)
             self.progress_bar.setValue(100)
             self.percent_label.setText("100 % | Terminé")
-            QtCore.QCoreApplication.processEvents()
             self.progress_bar.setVisible(False)
 
             # Set status icon on the same row as counter/percent
@@ -923,56 +1900,10 @@ class MainWindow(QtWidgets.QWidget):
                 start_time = self.start_time
                 finish_time = datetime.datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%SZ")
 
-                # Only write MHL if export_mhl is enabled
-                if export_mhl:
-                    with open(self.mhl_file_path, 'w') as mhl_file:
-                        mhl_file.write('<?xml version="1.0" encoding="UTF-8"?>\n')
-                        mhl_file.write('<hashlist version="1.1">\n\n')
-                        mhl_file.write('  <creatorinfo>\n')
-                        mhl_file.write(f'    <name>{getpass.getuser()}</name>\n')
-                        mhl_file.write(f'    <username>{getpass.getuser()}</username>\n')
-                        mhl_file.write(f'    <hostname>{socket.gethostname()}</hostname>\n')
-                        mhl_file.write('    <tool>labrollUtility</tool>\n')
-                        mhl_file.write(f'    <startdate>{start_time}</startdate>\n')
-                        mhl_file.write(f'    <finishdate>{finish_time}</finishdate>\n')
-                        mhl_file.write('  </creatorinfo>\n\n')
-
-                        for filename, checksum in self.hash_log.items():
-                            if os.path.sep in filename:  # skip original full paths
-                                continue
-                            full_path = os.path.join(self.destination_folder, filename)
-                            try:
-                                size = os.path.getsize(full_path)
-                                mtime = datetime.datetime.utcfromtimestamp(os.path.getmtime(full_path)).strftime("%Y-%m-%dT%H:%M:%SZ")
-                            except Exception:
-                                size = 0
-                                mtime = ""
-                            mhl_file.write('  <hash>\n')
-                            mhl_file.write(f'    <file>{filename}</file>\n')
-                            mhl_file.write(f'    <size>{size}</size>\n')
-                            mhl_file.write(f'    <lastmodificationdate>{mtime}</lastmodificationdate>\n')
-                            mhl_file.write(f'    <xxhash64be>{checksum}</xxhash64be>\n')
-                            mhl_file.write(f'    <hashdate>{finish_time}</hashdate>\n')
-                            mhl_file.write('  </hash>\n\n')
-
-                        mhl_file.write('</hashlist>\n')
-
-                json_data = {
-                    "creatorinfo": {
-                        "name": getpass.getuser(),
-                        "username": getpass.getuser(),
-                        "hostname": socket.gethostname(),
-                        "tool": "labrollUtility",
-                        "startdate": self.start_time,
-                        "finishdate": finish_time
-                    },
-                    "hashes": []
-                }
-
+                # Noms renommés et hash dans l'ordre de la liste
+                entries = []
                 for i in range(self.drop_list.count()):
                     item = self.drop_list.item(i)
-                    new_name = ""
-                    hash_value = ""
                     original_name = item.data(QtCore.Qt.UserRole + 1)
                     labroll_index = item.data(QtCore.Qt.UserRole + 2)
                     ext = os.path.splitext(original_name)[1]
@@ -984,30 +1915,94 @@ class MainWindow(QtWidgets.QWidget):
                     else:
                         new_name = f"{self.labroll_input.text()}C{labroll_index:03d}_{date_suffix}{ext}"
 
-                    hash_value = self.hash_log.get(new_name, "") or self.hash_log.get(item.data(QtCore.Qt.UserRole), "")
-
-                    full_path = os.path.join(self.destination_folder, new_name)
-                    try:
-                        size = os.path.getsize(full_path)
-                        mtime = datetime.datetime.utcfromtimestamp(os.path.getmtime(full_path)).strftime("%Y-%m-%dT%H:%M:%SZ")
-                    except Exception:
-                        size = 0
-                        mtime = ""
-
-                    json_data["hashes"].append({
-                        "file": new_name,
-                        "original": original_name,
-                        "size": size,
-                        "lastmodificationdate": mtime,
-                        "xxhash64be": hash_value,
-                        "hashdate": finish_time
-                    })
-
-                # Only write JSON if export_json is enabled
-                if export_json:
-                    json_path = self.mhl_file_path.replace(".mhl", ".json")
-                    with open(json_path, "w") as json_file:
-                        json.dump(json_data, json_file, indent=2)
+                    source_path = item.data(QtCore.Qt.UserRole)
+                    hash_value = self.hash_log.get(new_name) or self.hash_log.get(source_path) or {}
+                    entries.append((source_path, original_name, new_name, hash_value))
+
+                # Un MHL / JSON par destination, avec uniquement les fichiers vérifiés sur celle-ci
+                for destination_folder in self.destination_folders:
+                    verified = lambda path: destination_folder in self.verified_destinations.get(path, [])
+
+                    # Only write MHL if export_mhl is enabled
+                    if export_mhl:
+                        mhl_path = os.path.join(destination_folder, f"{self.manifest_basename}.mhl")
+                        with open(mhl_path, 'w') as mhl_file:
+                            mhl_file.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+                            mhl_file.write('<hashlist version="1.1">\n\n')
+                            mhl_file.write('  <creatorinfo>\n')
+                            mhl_file.write(f'    <name>{getpass.getuser()}</name>\n')
+                            mhl_file.write(f'    <username>{getpass.getuser()}</username>\n')
+                            mhl_file.write(f'    <hostname>{socket.gethostname()}</hostname>\n')
+                            mhl_file.write('    <tool>labrollUtility</tool>\n')
+                            mhl_file.write(f'    <startdate>{start_time}</startdate>\n')
+                            mhl_file.write(f'    <finishdate>{finish_time}</finishdate>\n')
+                            mhl_file.write('  </creatorinfo>\n\n')
+
+                            for source_path, original_name, filename, checksum in entries:
+                                if not checksum or not verified(source_path):
+                                    continue
+                                full_path = os.path.join(destination_folder, filename)
+                                try:
+                                    size = os.path.getsize(full_path)
+                                    mtime = datetime.datetime.utcfromtimestamp(os.path.getmtime(full_path)).strftime("%Y-%m-%dT%H:%M:%SZ")
+                                except Exception:
+                                    size = 0
+                                    mtime = ""
+                                mhl_file.write('  <hash>\n')
+                                mhl_file.write(f'    <file>{filename}</file>\n')
+                                mhl_file.write(f'    <size>{size}</size>\n')
+                                mhl_file.write(f'    <lastmodificationdate>{mtime}</lastmodificationdate>\n')
+                                for algorithm, digest in checksum.items():
+                                    tag = element_name(algorithm)
+                                    mhl_file.write(f'    <{tag}>{digest}</{tag}>\n')
+                                mhl_file.write(f'    <hashdate>{finish_time}</hashdate>\n')
+                                mhl_file.write('  </hash>\n\n')
+
+                            mhl_file.write('</hashlist>\n')
+
+                    json_data = {
+                        "creatorinfo": {
+                            "name": getpass.getuser(),
+                            "username": getpass.getuser(),
+                            "hostname": socket.gethostname(),
+                            "tool": "labrollUtility",
+                            "startdate": self.start_time,
+                            "finishdate": finish_time
+                        },
+                        "hashes": []
+                    }
+
+                    for source_path, original_name, new_name, hash_value in entries:
+                        full_path = os.path.join(destination_folder, new_name)
+                        try:
+                            size = os.path.getsize(full_path)
+                            mtime = datetime.datetime.utcfromtimestamp(os.path.getmtime(full_path)).strftime("%Y-%m-%dT%H:%M:%SZ")
+                        except Exception:
+                            size = 0
+                            mtime = ""
+
+                        hash_entry = {
+                            "file": new_name,
+                            "original": original_name,
+                            "size": size,
+                            "lastmodificationdate": mtime,
+                        }
+                        for algorithm in normalize_algorithms(list(hash_value)):
+                            hash_entry[element_name(algorithm)] = hash_value.get(algorithm, "") if verified(source_path) else ""
+                        hash_entry["hashdate"] = finish_time
+                        json_data["hashes"].append(hash_entry)
+
+                    # Only write JSON if export_json is enabled
+                    if export_json:
+                        json_path = os.path.join(destination_folder, f"{self.manifest_basename}.json")
+                        with open(json_path, "w") as json_file:
+                            json.dump(json_data, json_file, indent=2)
+                        # Arbre des chunks par fichier, pour des contrôles ponctuels ultérieurs
+                        if load_params().get("export_hash_tree", False):
+                            trees = {new_name: self.hash_trees[source_path]
+                                     for source_path, _, new_name, _ in entries
+                                     if verified(source_path) and source_path in self.hash_trees}
+                            save_trees(os.path.join(destination_folder, f"{self.manifest_basename}{TREE_SUFFIX}"), trees)
             # --- END PATCHED BLOCK ---
 
             # Send Slack and/or Discord messages if enabled
@@ -1045,14 +2040,12 @@ class MainWindow(QtWidgets.QWidget):
                 save_params({"last_labroll": new_labroll})
 
     def closeEvent(self, event):
-        # Use a safer loop to avoid accessing deleted threads
-        for thread, worker in list(self.threads):
-            try:
-                if thread and thread.isRunning():
-                    thread.quit()
-                    thread.wait()
-            except RuntimeError:
-                continue
+        self.verify_pool.clear()
+        self.verify_pool.waitForDone()
+        self.hash_pool.shutdown()
+        for worker in list(self.active_jobs.values()):
+            worker.interrupt()
+        self.copy_pool.waitForDone()
         event.accept()
 
     def reverse_from_json(self):
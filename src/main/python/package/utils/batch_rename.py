@@ -0,0 +1,203 @@
+import json
+import os
+import time
+import uuid
+
+RENAME_JOURNAL_SUFFIX = ".rename.jsonl"
+
+
+class RenameConflict(ValueError):
+    """Le plan de renommage ne peut pas être appliqué sans écraser un fichier."""
+
+    def __init__(self, conflicts):
+        self.conflicts = conflicts  # [(source, cible, raison)]
+        super().__init__("\n".join(f"{os.path.basename(src)} -> {os.path.basename(dst)} : {reason}"
+                                   for src, dst, reason in conflicts))
+
+
+def _same_file(a, b):
+    try:
+        return os.path.samefile(a, b)
+    except OSError:
+        return False
+
+
+def _rename_free(src, dst):
+    """Renomme src en dst seulement si dst est libre ; False (rien n'est touché) sinon.
+
+    os.rename écrase silencieusement une cible existante sous POSIX : un clip déjà déplacé
+    sur ce nom serait perdu. Un changement de casse seule (même fichier) reste permis.
+    """
+    if os.path.lexists(dst) and not _same_file(src, dst):
+        return False
+    os.rename(src, dst)
+    return True
+
+
+def plan_renames(pairs):
+    """Valide [(source, cible)] et retourne le plan sans les renommages sans effet.
+
+    Refuse deux sources vers une même cible et une cible existante qui n'est pas elle-même
+    renommée par le plan ; un changement de casse seule (même fichier) est accepté.
+    """
+    plan = [(os.path.abspath(src), os.path.abspath(dst)) for src, dst in pairs
+            if os.path.abspath(src) != os.path.abspath(dst)]
+    sources = {os.path.normcase(src) for src, _ in plan}
+    targets = {}
+    conflicts = []
+    for src, dst in plan:
+        key = os.path.normcase(dst)
+        if key in targets:
+            conflicts.append((src, dst, f"même nom cible que {os.path.basename(targets[key])}"))
+        targets[key] = src
+        if not os.path.exists(src):
+            conflicts.append((src, dst, "source introuvable"))
+        elif os.path.exists(dst) and key not in sources and not _same_file(src, dst):
+            conflicts.append((src, dst, "le fichier cible existe déjà"))
+    if conflicts:
+        raise RenameConflict(conflicts)
+    return plan
+
+
+def rename_cycles(plan):
+    """Cycles du plan (A -> B -> A...) : impossibles à appliquer fichier par fichier."""
+    mapping = {os.path.normcase(src): os.path.normcase(dst) for src, dst in plan}
+    cycles, visited = [], set()
+    for start in mapping:
+        path, chain = start, []
+        while path in mapping and path not in visited:
+            visited.add(path)
+            chain.append(path)
+            path = mapping[path]
+        if path in chain:
+            cycles.append(chain[chain.index(path):])
+    return cycles
+
+
+def apply_renames(plan, journal_path, on_progress=None, should_stop=None, progress_interval=0.1):
+    """Applique le plan en deux phases, chaque opération étant consignée dans journal_path.
+
+    Phase 1 : toutes les sources prennent un nom temporaire, ce qui libère les noms cibles
+    (cycles et chaînes compris) ; phase 2 : noms temporaires -> cibles. Une interruption
+    pendant la phase 1 remet les fichiers déjà déplacés à leur nom d'origine.
+    Aucun renommage n'écrase un fichier : une cible encore occupée par une source restée en
+    place (échec en phase 1) n'est pas tentée, et un fichier qui ne peut retrouver ni sa cible
+    ni son nom d'origine reste sous son nom temporaire, consigné "stranded" (voir stranded_renames).
+    on_progress(étapes, total) est appelé au plus tous les progress_interval secondes.
+    Retourne [(source, cible, succès)].
+    """
+    token = uuid.uuid4().hex[:8]
+    entries = [{"src": src, "dst": dst,
+                "tmp": os.path.join(os.path.dirname(src), f".{os.path.basename(src)}.{token}.lrtmp")}
+               for src, dst in plan]
+    total = 2 * len(entries)
+    state = {"step": 0, "reported": 0.0}
+    results = []
+
+    def advance():
+        state["step"] += 1
+        now = time.monotonic()
+        if on_progress and (now - state["reported"] >= progress_interval or state["step"] == total):
+            state["reported"] = now
+            on_progress(state["step"], total)
+
+    with open(journal_path, "a") as journal:
+        def log(op, entry):
+            journal.write(json.dumps(dict(entry, op=op)) + "\n")
+            journal.flush()
+
+        moved = []
+        for entry in entries:
+            if should_stop and should_stop():
+                for done in reversed(moved):
+                    if _rename_free(done["tmp"], done["src"]):
+                        log("rollback", done)
+                    else:
+                        print(f"Nom d'origine occupé, fichier laissé sous {done['tmp']}")
+                        log("stranded", done)
+                return []
+            try:
+                os.rename(entry["src"], entry["tmp"])
+                log("tmp", entry)
+                moved.append(entry)
+            except OSError as e:
+                print(f"Erreur lors du renommage de {entry['src']} : {e}")
+                results.append((entry["src"], entry["dst"], False))
+                # Pas de phase 2 pour ce fichier : ses deux étapes sont comptées ici
+                state["step"] += 1
+            advance()
+
+        # Sources restées en place : leur nom n'est pas libre pour l'entrée qui le vise
+        blocked = {os.path.normcase(src) for src, _, _ in results}
+        for entry in moved:
+            try:
+                if os.path.normcase(entry["dst"]) in blocked:
+                    print(f"Renommage de {entry['src']} abandonné : {entry['dst']} n'a pas été libéré")
+                elif _rename_free(entry["tmp"], entry["dst"]):
+                    log("done", entry)
+                    results.append((entry["src"], entry["dst"], True))
+                    advance()
+                    continue
+                else:
+                    print(f"Renommage de {entry['src']} abandonné : {entry['dst']} est occupé")
+            except OSError as e:
+                print(f"Erreur lors du renommage de {entry['src']} : {e}")
+            try:
+                restored = _rename_free(entry["tmp"], entry["src"])
+            except OSError as e:
+                print(f"Erreur lors du retour de {entry['tmp']} à son nom d'origine : {e}")
+                restored = False
+            if restored:
+                log("rollback", entry)
+            else:
+                # Nom d'origine repris entre-temps par un autre fichier du plan : on ne l'écrase pas
+                print(f"Nom d'origine occupé, fichier laissé sous {entry['tmp']}")
+                log("stranded", entry)
+            results.append((entry["src"], entry["dst"], False))
+            advance()
+    return results
+
+
+def _last_entries(journal_path):
+    # Dernière opération consignée pour chaque source ; une ligne tronquée termine le journal
+    last = {}
+    with open(journal_path) as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                break
+            last[entry["src"]] = entry
+    return last
+
+
+def stranded_renames(journal_path):
+    """[(source, nom temporaire)] des fichiers restés sous leur nom temporaire dans journal_path."""
+    return [(entry["src"], entry["tmp"]) for entry in _last_entries(journal_path).values()
+            if entry["op"] == "stranded" and os.path.exists(entry["tmp"])]
+
+
+def undo_renames(journal_path):
+    """Rétablit les noms d'origine consignés dans journal_path ; retourne le nombre de fichiers restaurés."""
+    # Même schéma en deux phases qu'à l'aller, pour défaire aussi les cycles
+    pending = []
+    for entry in _last_entries(journal_path).values():
+        if entry["op"] == "done" and os.path.exists(entry["dst"]):
+            os.rename(entry["dst"], entry["tmp"])
+            pending.append(entry)
+        elif entry["op"] in ("tmp", "stranded") and os.path.exists(entry["tmp"]):
+            pending.append(entry)
+    restored = 0
+    with open(journal_path, "a") as journal:
+        for entry in pending:
+            if _rename_free(entry["tmp"], entry["src"]):
+                journal.write(json.dumps(dict(entry, op="undo")) + "\n")
+                restored += 1
+            else:
+                print(f"Nom d'origine occupé, fichier laissé sous {entry['tmp']}")
+                journal.write(json.dumps(dict(entry, op="stranded")) + "\n")
+    return restored
+
+
+__all__ = ["RenameConflict", "plan_renames", "rename_cycles", "apply_renames", "undo_renames", "stranded_renames",
+           "RENAME_JOURNAL_SUFFIX"]
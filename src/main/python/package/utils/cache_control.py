@@ -0,0 +1,176 @@
+import ctypes
+import ctypes.util
+import mmap
+import os
+import resource
+import sys
+
+# fcntl(F_NOCACHE) : équivalent macOS de posix_fadvise, qui n'y existe pas
+F_NOCACHE = 48
+# sync_file_range (Linux) : attendre les écritures en cours, lancer l'écriture, attendre sa fin
+SYNC_FILE_RANGE_WAIT_BEFORE = 1
+SYNC_FILE_RANGE_WRITE = 2
+SYNC_FILE_RANGE_WAIT_AFTER = 4
+PROT_READ = 1
+MAP_SHARED = 1
+# mincore par fenêtres de 1 Go : vecteur de résidence borné même pour un clip de 100 Go
+MINCORE_WINDOW = 1024 ** 3
+# Bit 0 de chaque octet du vecteur mincore = page résidente (macOS y ajoute d'autres bits)
+_RESIDENT = bytes(b & 1 for b in range(256))
+
+_libc = None
+
+
+def _get_libc():
+    global _libc
+    if _libc is None:
+        _libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+    return _libc
+
+
+def advise_sequential(fd):
+    """Source lue une seule fois, du début à la fin : lecture anticipée agressive."""
+    try:
+        if hasattr(os, "posix_fadvise"):
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_SEQUENTIAL)
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+        elif sys.platform == "darwin":
+            import fcntl
+            fcntl.fcntl(fd, F_NOCACHE, 1)
+    except OSError:
+        pass
+
+
+def bypass_cache(fd):
+    """Écritures sans rétention dans le cache (macOS) ; sous Linux voir drop_range."""
+    if sys.platform == "darwin":
+        try:
+            import fcntl
+            fcntl.fcntl(fd, F_NOCACHE, 1)
+        except OSError:
+            pass
+
+
+def _sync_file_range(fd, offset, length, flags):
+    """sync_file_range limité à la plage, sans métadonnées ; False si indisponible (hors Linux)."""
+    if not sys.platform.startswith("linux"):
+        return False
+    try:
+        sync_file_range = _get_libc().sync_file_range
+    except (OSError, AttributeError):
+        return False
+    sync_file_range.argtypes = (ctypes.c_int, ctypes.c_int64, ctypes.c_int64, ctypes.c_uint)
+    return sync_file_range(fd, offset, length, flags) == 0
+
+
+def start_writeback(fd, offset, length):
+    """Lance l'écriture d'une plage sans l'attendre : elle se fait pendant la fenêtre suivante."""
+    _sync_file_range(fd, offset, length, SYNC_FILE_RANGE_WRITE)
+
+
+def drop_range(fd, offset, length, flush=False):
+    """Libère les pages d'une plage déjà consommée ; flush=True attend d'abord leur écriture.
+
+    Sous Linux l'attente porte sur la plage seule (sync_file_range) : si start_writeback l'a
+    lancée une fenêtre plus tôt, elle est en général déjà terminée.
+    """
+    if not hasattr(os, "posix_fadvise"):
+        return
+    try:
+        if flush and not _sync_file_range(fd, offset, length, SYNC_FILE_RANGE_WAIT_BEFORE | SYNC_FILE_RANGE_WRITE
+                                                                  | SYNC_FILE_RANGE_WAIT_AFTER):
+            os.fdatasync(fd)
+        os.posix_fadvise(fd, offset, length, os.POSIX_FADV_DONTNEED)
+    except OSError:
+        pass
+
+
+def drop_file_cache(path):
+    """Évince path du cache pour que la relecture de vérification touche vraiment le disque.
+
+    Sous macOS, sans posix_fadvise, seul le fsync est fait : la relecture passe alors par un
+    descripteur en F_NOCACHE (bypass_cache), comme les écritures en mode cache géré.
+    """
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+        if hasattr(os, "posix_fadvise"):
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def cached_bytes(path):
+    """Octets de path présents dans le cache de pages (mincore), None si indisponible.
+
+    Mapping partagé en lecture seule via mmap / munmap de la libc : rien n'est réservé en
+    mémoire (un mapping privé inscriptible échoue en ENOMEM au-delà de RAM + swap).
+    """
+    try:
+        libc = _get_libc()
+        libc.mmap.restype = ctypes.c_void_p
+        libc.mmap.argtypes = (ctypes.c_void_p, ctypes.c_size_t, ctypes.c_int, ctypes.c_int, ctypes.c_int,
+                              ctypes.c_int64)
+        libc.munmap.argtypes = (ctypes.c_void_p, ctypes.c_size_t)
+        libc.mincore.argtypes = (ctypes.c_void_p, ctypes.c_size_t, ctypes.c_void_p)
+        fd = os.open(path, os.O_RDONLY)
+    except (OSError, AttributeError):
+        return None
+    try:
+        size = os.fstat(fd).st_size
+        resident = 0
+        for offset in range(0, size, MINCORE_WINDOW):
+            length = min(MINCORE_WINDOW, size - offset)
+            address = libc.mmap(None, length, PROT_READ, MAP_SHARED, fd, offset)
+            if address in (None, ctypes.c_void_p(-1).value):
+                return None
+            try:
+                vec = ctypes.create_string_buffer((length + mmap.PAGESIZE - 1) // mmap.PAGESIZE)
+                if libc.mincore(address, length, vec) != 0:
+                    return None
+                resident += vec.raw.translate(_RESIDENT).count(1)
+            finally:
+                libc.munmap(address, length)
+        return resident * mmap.PAGESIZE
+    except OSError:
+        return None
+    finally:
+        os.close(fd)
+
+
+def rss_bytes():
+    """(RSS courant, RSS maximal) du processus."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss est en octets sur macOS, en Ko sous Linux
+    peak = peak if sys.platform == "darwin" else peak * 1024
+    current = None
+    try:
+        with open("/proc/self/statm") as f:
+            current = int(f.read().split()[1]) * mmap.PAGESIZE
+    except (OSError, ValueError, IndexError):
+        pass
+    return current, peak
+
+
+def footprint_summary(cached=None):
+    """Résumé mémoire de fin de job : RSS du processus et cache laissé par les fichiers du job.
+
+    cached (octets, mesurés par cached_bytes hors du thread de l'interface) : None si inconnu.
+    """
+    current, peak = rss_bytes()
+    parts = []
+    if current is not None:
+        parts.append(f"RSS {current / 1024 ** 2:.0f} MB")
+    parts.append(f"RSS max {peak / 1024 ** 2:.0f} MB")
+    if cached is not None:
+        parts.append(f"cache laissé par les fichiers du job {cached / 1024 ** 2:.0f} MB")
+    return " | ".join(parts)
+
+
+__all__ = ["advise_sequential", "bypass_cache", "start_writeback", "drop_range", "drop_file_cache", "cached_bytes",
+           "rss_bytes", "footprint_summary"]
@@ -0,0 +1,119 @@
+import collections
+import os
+import re
+
+
+def _int(match, group):
+    value = match.groupdict().get(group)
+    return int(value) if value else 0
+
+
+class CameraProfile:
+    """Schéma de nommage d'une caméra : motif précompilé, clé (clip_id, chapter) et fichiers compagnons.
+
+    pattern est appliqué au nom sans extension (fullmatch, casse ignorée) ; key reçoit le
+    match et retourne (clip_id, chapter). sidecars sont des modèles de noms formatés avec
+    stem et les groupes du motif.
+    """
+
+    def __init__(self, name, label, pattern, key=None, sidecars=()):
+        self.name = name
+        self.label = label
+        self.pattern = re.compile(pattern, re.IGNORECASE)
+        self.key = key or (lambda m: (_int(m, "clip"), _int(m, "chapter")))
+        self.sidecars = sidecars
+
+    def match(self, stem):
+        return self.pattern.fullmatch(stem)
+
+    def sidecar_names(self, stem, match):
+        return [template.format(stem=stem, **match.groupdict()) for template in self.sidecars]
+
+    def __repr__(self):
+        return f"CameraProfile({self.name!r})"
+
+
+PROFILES = [
+    # GX010001 (chapitre 01, clip 0001) ; anciens modèles : GOPR0001 puis GP010001 pour les chapitres suivants
+    CameraProfile("gopro", "GoPro", r"(?:G[HSPX]|GP)(?P<chapter>\d{2})(?P<clip>\d{4})|GOPR(?P<first>\d{4})",
+                  key=lambda m: (_int(m, "first"), 0) if m.group("first") else (_int(m, "clip"), _int(m, "chapter")),
+                  sidecars=("{stem}.THM",)),
+    # DJI_0001, ou DJI_20240101123000_0001_D sur les modèles récents
+    CameraProfile("dji", "DJI", r"DJI_(?:\d{14}_)?(?P<clip>\d{4})(?:_[A-Z])?",
+                  sidecars=("{stem}.SRT", "{stem}.LRF")),
+    # VID_20240101_123000_00_001 : objectif 00 / 10 en chapitre, numéro de clip à la fin
+    CameraProfile("insta360", "Insta360", r"(?:PRO_)?VID_\d{8}_\d{6}_(?P<chapter>\d{2})_(?P<clip>\d{3})"),
+    # A001_C002_0101AB(_001) : R3D segmentés, le .RMD porte le nom du clip sans segment
+    CameraProfile("red", "RED", r"(?P<clip_name>[A-Z](?P<reel>\d{3})_C(?P<clip>\d{3})_[0-9A-Z]+?)(?:_(?P<chapter>\d{3}))?",
+                  key=lambda m: (_int(m, "reel") * 1000 + _int(m, "clip"), _int(m, "chapter")),
+                  sidecars=("{clip_name}.RMD",)),
+    # A001C002_240101_R1AB : bobine 001, clip 002 (ARRI, et Sony Venice sur le même schéma)
+    CameraProfile("arri", "ARRI / Venice", r"[A-Z](?P<reel>\d{3})C(?P<clip>\d{3})(?:_.*)?",
+                  key=lambda m: (_int(m, "reel") * 1000 + _int(m, "clip"), 0)),
+    # C0001 + C0001M01.XML
+    CameraProfile("sony", "Sony", r"C(?P<clip>\d{4})", sidecars=("{stem}M01.XML",)),
+]
+PROFILE_NAMES = [profile.name for profile in PROFILES]
+
+
+class ProfileMatcher:
+    """Profil et clé de tri de chaque fichier, en un passage de motifs par fichier.
+
+    selected = "auto" : tous les profils sont essayés, en commençant par le dernier reconnu
+    (sur une carte, les clips viennent en général tous de la même caméra). Sinon seul le
+    profil choisi est appliqué ; un nom non reconnu donne (None, 0, 0) et le clip est trié sur sa date.
+    """
+
+    def __init__(self, selected="auto"):
+        if selected == "auto":
+            self.profiles = list(PROFILES)
+        else:
+            self.profiles = [profile for profile in PROFILES if profile.name == selected]
+            if not self.profiles:
+                print(f"[PROFILE] Profil caméra inconnu : {selected}, détection automatique")
+                self.profiles = list(PROFILES)
+        self.counts = collections.Counter()
+
+    def _find(self, stem):
+        for i, profile in enumerate(self.profiles):
+            m = profile.match(stem)
+            if m:
+                if i:
+                    # Le profil reconnu passe en tête pour les fichiers suivants
+                    self.profiles.insert(0, self.profiles.pop(i))
+                return profile, m
+        return None, None
+
+    def match(self, path):
+        """(profil ou None, clip_id, chapter) de path."""
+        profile, m = self._find(os.path.splitext(os.path.basename(path))[0])
+        self.counts[profile.name if profile else None] += 1
+        return (profile, *profile.key(m)) if profile else (None, 0, 0)
+
+    def clip_key(self, path):
+        return self.match(path)[1:]
+
+    def sidecars(self, path):
+        """Fichiers compagnons de path (miniatures, télémétrie, XML) présents à côté du clip."""
+        stem = os.path.splitext(os.path.basename(path))[0]
+        profile, m = self._find(stem)
+        if profile is None:
+            return []
+        folder = os.path.dirname(path)
+        candidates = [os.path.join(folder, name) for name in profile.sidecar_names(stem, m)]
+        return [candidate for candidate in candidates if os.path.exists(candidate)]
+
+    def summary(self):
+        return ", ".join(f"{name or 'inconnu'} {count}" for name, count in self.counts.most_common())
+
+
+def clip_key(path):
+    """(clip_id, chapter) de path d'après son nom, tous profils confondus ; (0, 0) si non reconnu."""
+    for profile in PROFILES:
+        m = profile.match(os.path.splitext(os.path.basename(path))[0])
+        if m:
+            return profile.key(m)
+    return 0, 0
+
+
+__all__ = ["CameraProfile", "PROFILES", "PROFILE_NAMES", "ProfileMatcher", "clip_key"]
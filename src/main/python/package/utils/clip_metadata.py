@@ -0,0 +1,100 @@
+import datetime
+import os
+import sqlite3
+
+from hachoir.metadata import extractMetadata
+from hachoir.parser import createParser
+
+from package.utils.camera_profiles import clip_key
+from package.utils.metadata_cache import metadata_cache
+from package.utils.mp4_header import Mp4ParseError, read_mp4_metadata
+from package.utils.mxf_header import MxfParseError, read_mxf_metadata
+
+def read_hachoir_metadata(path):
+    """Lecture générique via hachoir : date de création, durée (s) et fps."""
+    metadata = {}
+    parser = createParser(path)
+    if parser:
+        try:
+            extracted = extractMetadata(parser)
+            if extracted:
+                if extracted.has("creation_date"):
+                    creation_date = extracted.get("creation_date")
+                    # Certains conteneurs ne donnent qu'une date : ramenée à minuit pour rester comparable
+                    if not isinstance(creation_date, datetime.datetime):
+                        creation_date = datetime.datetime.combine(creation_date, datetime.time())
+                    metadata["creation_date"] = creation_date
+                if extracted.has("duration"):
+                    metadata["duration"] = extracted.get("duration").total_seconds()
+                if extracted.has("frame_rate"):
+                    metadata["fps"] = float(extracted.get("frame_rate"))
+        except Exception:
+            pass
+        finally:
+            parser.close()
+    return metadata
+
+
+def read_clip_metadata(path):
+    """Date de création, durée, fps, ids du schéma de nommage caméra et caméra GoPro de path.
+
+    Lecteurs natifs : boîtes MP4 / MOV (quelques lectures ciblées), partition d'en-tête MXF
+    (timecode de début et UID du material package en plus) ; hachoir en secours.
+    """
+    clip_id, chapter = clip_key(path)
+    metadata = {"creation_date": None, "clip_id": clip_id, "chapter": chapter, "duration": None, "fps": None,
+                "camera_model": None, "camera_serial": None, "start_timecode": None, "material_package_uid": None}
+    try:
+        if path.lower().endswith(".mxf"):
+            metadata.update(read_mxf_metadata(path))
+        else:
+            metadata.update(read_mp4_metadata(path))
+    except (Mp4ParseError, MxfParseError) as e:
+        print(f"[METADATA] {os.path.basename(path)} : {e}, lecture hachoir")
+        metadata.update(read_hachoir_metadata(path))
+    except OSError as e:
+        print(f"[METADATA] {path} illisible : {e}")
+    return metadata
+
+
+def clip_metadata(path, use_cache=True):
+    """Métadonnées de path, lues dans le cache persistant ou à défaut dans le fichier."""
+    cache = None
+    if use_cache:
+        try:
+            cache = metadata_cache()
+            cached = cache.get(path)
+            if cached is not None:
+                return cached
+        except sqlite3.Error as e:
+            print(f"[METADATA] cache indisponible : {e}")
+            cache = None
+    metadata = read_clip_metadata(path)
+    if cache is not None:
+        try:
+            cache.put(path, metadata)
+        except sqlite3.Error as e:
+            print(f"[METADATA] écriture du cache impossible : {e}")
+    return metadata
+
+
+def begin_batch():
+    """Début d'un dépôt de fichiers : le taux de succès du cache est compté pour ce lot."""
+    try:
+        metadata_cache().reset_stats()
+    except sqlite3.Error:
+        pass
+
+
+def end_batch():
+    """Fin du lot : écrit le cache (LRU compris) et retourne son taux de succès, "" si indisponible."""
+    try:
+        cache = metadata_cache()
+        cache.flush()
+        return cache.summary()
+    except sqlite3.Error as e:
+        print(f"[METADATA] cache indisponible : {e}")
+        return ""
+
+
+__all__ = ["read_hachoir_metadata", "read_clip_metadata", "clip_metadata", "begin_batch", "end_batch"]
@@ -0,0 +1,573 @@
+import json
+import os
+import queue
+import threading
+import time
+
+import xxhash
+
+from package.utils.cache_control import advise_sequential, bypass_cache, drop_range, start_writeback
+from package.utils.durability import preallocate, sync_fd
+
+JOURNAL_SUFFIX = ".lrjournal"
+
+
+class ChunkRing:
+    """Anneau de buffers préalloués partagés entre le lecteur et les consommateurs.
+
+    Un slot n'est rendu au lecteur que lorsque tous les consommateurs (hasher et
+    writers) l'ont relâché : le consommateur le plus lent ne peut donc pas prendre
+    plus de ring_size chunks de retard.
+    """
+
+    def __init__(self, ring_size, chunk_size, consumers):
+        self.chunk_size = chunk_size
+        self.buffers = [bytearray(chunk_size) for _ in range(max(1, ring_size))]
+        self.views = [memoryview(buf) for buf in self.buffers]
+        self.free = queue.Queue()
+        for slot in range(len(self.buffers)):
+            self.free.put(slot)
+        self.queues = [queue.Queue() for _ in range(consumers)]
+        self._pending = [0] * len(self.buffers)
+        self._lock = threading.Lock()
+
+    def publish(self, slot, length):
+        with self._lock:
+            self._pending[slot] = len(self.queues)
+        for q in self.queues:
+            q.put((slot, length))
+
+    def close(self):
+        for q in self.queues:
+            q.put(None)
+
+    def release(self, slot):
+        with self._lock:
+            self._pending[slot] -= 1
+            done = self._pending[slot] == 0
+        if done:
+            self.free.put(slot)
+
+    def consume(self, consumer_index):
+        """Itère sur (slot, memoryview) jusqu'à la fin du flux ; le slot est relâché après usage."""
+        q = self.queues[consumer_index]
+        while True:
+            entry = q.get()
+            if entry is None:
+                return
+            slot, length = entry
+            try:
+                yield self.views[slot][:length]
+            finally:
+                self.release(slot)
+
+
+class ChunkJournal:
+    """Journal sidecar (<destination>.lrjournal) des chunks écrits sur une destination.
+
+    Première ligne : en-tête JSON identifiant la source et la taille de chunk ; puis une
+    ligne "offset longueur xxh64" par chunk écrit. À la reprise, le préfixe de la
+    destination est relu et comparé au journal : seul ce qui est confirmé est conservé.
+    """
+
+    def __init__(self, dest_path, source_path, chunk_size):
+        self.dest_path = dest_path
+        self.path = dest_path + JOURNAL_SUFFIX
+        stat = os.stat(source_path)
+        self.header = {"source": os.path.abspath(source_path), "size": stat.st_size,
+                       "mtime": stat.st_mtime_ns, "chunk_size": chunk_size}
+        self._file = None
+        self._lock = threading.Lock()
+
+    def load(self):
+        """Chunks contigus depuis l'offset 0 [(offset, longueur, digest)], vide si le journal ne correspond pas."""
+        entries = []
+        try:
+            with open(self.path) as f:
+                if json.loads(f.readline()) != self.header:
+                    return []
+                for line in f:
+                    parts = line.split()
+                    if len(parts) != 3:
+                        break
+                    offset, length, digest = int(parts[0]), int(parts[1]), int(parts[2], 16)
+                    if offset != len(entries) * self.header["chunk_size"]:
+                        break
+                    entries.append((offset, length, digest))
+        except (OSError, ValueError):
+            return []
+        return entries
+
+    def start(self, entries=()):
+        """Réécrit le journal avec les chunks conservés puis l'ouvre en ajout."""
+        self._file = open(self.path, "w")
+        self._file.write(json.dumps(self.header) + "\n")
+        for offset, length, digest in entries:
+            self._file.write(f"{offset} {length} {digest:016x}\n")
+        self._file.flush()
+
+    def record(self, offset, length, digest):
+        with self._lock:
+            if self._file:
+                self._file.write(f"{offset} {length} {digest:016x}\n")
+                self._file.flush()
+
+    def close(self):
+        with self._lock:
+            if self._file:
+                self._file.close()
+                self._file = None
+
+    def remove(self):
+        self.close()
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+
+def read_journal_header(journal_path):
+    """En-tête JSON d'un journal .lrjournal, None s'il est illisible."""
+    try:
+        with open(journal_path) as f:
+            header = json.loads(f.readline())
+    except (OSError, ValueError):
+        return None
+    return header if isinstance(header, dict) else None
+
+
+def _journals_in(folder):
+    try:
+        with os.scandir(folder) as it:
+            return [entry.path for entry in it if entry.name.endswith(JOURNAL_SUFFIX) and entry.is_file()]
+    except OSError:
+        return []
+
+
+def claim_journal(dest_path, source_path):
+    """Reprend sous dest_path la copie partielle de source_path laissée sous un autre nom.
+
+    Le nom de destination dépend de la date et du labroll, qui changent d'un lancement de
+    l'application à l'autre : le journal est retrouvé par sa source (chemin, taille, mtime)
+    dans le dossier de dest_path, puis fichier partiel et journal prennent le nouveau nom.
+    Retourne l'ancien chemin de destination, ou None si rien n'a été repris.
+    """
+    if os.path.exists(dest_path + JOURNAL_SUFFIX) or os.path.exists(dest_path):
+        return None
+    stat = os.stat(source_path)
+    identity = (os.path.abspath(source_path), stat.st_size, stat.st_mtime_ns)
+    for journal_path in _journals_in(os.path.dirname(dest_path)):
+        header = read_journal_header(journal_path)
+        if header is None or (header.get("source"), header.get("size"), header.get("mtime")) != identity:
+            continue
+        old_path = journal_path[:-len(JOURNAL_SUFFIX)]
+        if not os.path.exists(old_path):
+            continue
+        os.rename(old_path, dest_path)
+        os.rename(journal_path, dest_path + JOURNAL_SUFFIX)
+        return old_path
+    return None
+
+
+def orphan_journals(folders, sources):
+    """Journaux des dossiers dont la source ne fait pas partie de sources (aucun job ne les reprendra)."""
+    claimed = {os.path.abspath(path) for path in sources}
+    orphans = []
+    for folder in folders:
+        for journal_path in _journals_in(folder):
+            header = read_journal_header(journal_path)
+            if header is None or header.get("source") not in claimed:
+                orphans.append(journal_path)
+    return orphans
+
+
+def verified_prefix(dest_path, entries, limit, running_hash=None):
+    """Longueur du préfixe de dest_path dont les chunks correspondent au journal (bornée à limit)."""
+    valid = 0
+    try:
+        with open(dest_path, "rb") as f:
+            for offset, length, digest in entries:
+                if offset + length > limit:
+                    break
+                data = f.read(length)
+                if len(data) != length or xxhash.xxh64_intdigest(data) != digest:
+                    break
+                if running_hash is not None:
+                    running_hash.update(data)
+                valid = offset + length
+    except OSError:
+        return 0
+    return valid
+
+
+def prepare_resume(journals, running_hash=None):
+    """Offset de reprise commun à toutes les destinations et état du hash de la source à cet offset.
+
+    xxhash n'exposant pas son état interne, il est reconstruit en rejouant le préfixe de la
+    destination principale, dont chaque chunk est d'abord contrôlé contre le journal (qui
+    porte les digests des buffers source) : la reprise ne relit jamais la carte.
+    running_hash (par défaut un xxh64) reçoit ce préfixe.
+    """
+    if running_hash is None:
+        running_hash = xxhash.xxh64()
+    entries = [journal.load() for journal in journals]
+    if not journals or not all(entries):
+        return 0, running_hash, [[] for _ in journals]
+    limit = min(sum(length for _, length, _ in e) for e in entries)
+    # Destinations secondaires d'abord, la principale en dernier pour rejouer le hash une seule fois
+    for journal, journal_entries in list(zip(journals, entries))[1:]:
+        limit = min(limit, verified_prefix(journal.dest_path, journal_entries, limit))
+    limit = verified_prefix(journals[0].dest_path, entries[0], limit, running_hash)
+    kept = [[entry for entry in e if entry[0] + entry[1] <= limit] for e in entries]
+    return limit, running_hash, kept
+
+
+def _flush_window(fd, offset, length, timings=None):
+    # Fenêtre précédente : son écriture a été lancée une fenêtre plus tôt, l'attente est courte
+    started = time.perf_counter()
+    drop_range(fd, offset, length, flush=True)
+    if timings is not None:
+        timings["cache_flush"].append(time.perf_counter() - started)
+
+
+def pipelined_copy(src_path, dest_paths, chunk_size=1024 * 1024, ring_size=8, on_progress=None,
+                   on_dest_progress=None, should_stop=None, start_offset=0, src_hash=None, journals=None,
+                   src_tree=None, cache_window=0, preallocate_dest=False, sync=False, timings=None):
+    """Copie src_path vers toutes les destinations avec des étages lecteur / writers / hasher.
+
+    Le lecteur remplit l'anneau via readinto, chaque destination a son writer et le
+    hasher calcule le xxh64 de la source sur les mêmes memoryviews : lectures carte et
+    écritures disque se recouvrent. Une destination en erreur est abandonnée sans
+    bloquer les autres. Avec start_offset / src_hash (voir prepare_resume), la copie reprend
+    au milieu du fichier ; chaque chunk écrit est consigné dans le journal de sa destination.
+    src_hash peut être tout objet update()/hexdigest() (xxh64 par défaut, ou MultiHash) ;
+    src_tree (ChunkHashTree) reçoit le digest de chaque chunk lu. Avec cache_window (octets),
+    les pages de la source et des destinations sont libérées du cache tous les cache_window
+    octets (destinations écrites sur disque d'abord) au lieu d'évincer tout le cache système.
+    preallocate_dest réserve la taille de la source sur chaque destination avant d'écrire ;
+    sync force chaque destination sur le disque avant de rendre la main. Les durées de ces
+    étapes sont ajoutées à timings["preallocate"] / timings["sync"] / timings["cache_flush"]
+    (attente d'écriture des fenêtres de cache) si fourni.
+    Retourne (hexdigest() de la source ou None si interrompu, {destination: erreur}).
+    """
+    ring = ChunkRing(ring_size, chunk_size, consumers=len(dest_paths) + 1)
+    errors = {}
+    read_error = []
+    interrupted = threading.Event()
+    if src_hash is None:
+        src_hash = xxhash.xxh64()
+    journals = journals or [None] * len(dest_paths)
+    total = os.path.getsize(src_path)
+    if timings is not None:
+        timings.setdefault("preallocate", [])
+        timings.setdefault("sync", [])
+        timings.setdefault("cache_flush", [])
+
+    def flush_window(fd, offset, length):
+        _flush_window(fd, offset, length, timings)
+
+    def reader():
+        try:
+            with open(src_path, "rb", buffering=0) as src:
+                src.seek(start_offset)
+                position = dropped = start_offset
+                if cache_window:
+                    advise_sequential(src.fileno())
+                while True:
+                    if (should_stop and should_stop()) or len(errors) == len(dest_paths):
+                        interrupted.set()
+                        break
+                    slot = ring.free.get()
+                    n = src.readinto(ring.buffers[slot])
+                    if not n:
+                        ring.free.put(slot)
+                        break
+                    ring.publish(slot, n)
+                    position += n
+                    # Les données lues sont déjà dans l'anneau : leurs pages ne resserviront pas
+                    if cache_window and position - dropped >= cache_window:
+                        drop_range(src.fileno(), dropped, position - dropped)
+                        dropped = position
+                if cache_window:
+                    drop_range(src.fileno(), dropped, position - dropped)
+        except Exception as e:
+            read_error.append(e)
+            interrupted.set()
+        finally:
+            ring.close()
+
+    def hasher():
+        for view in ring.consume(0):
+            src_hash.update(view)
+            if src_tree is not None:
+                src_tree.add(view)
+            if on_progress:
+                on_progress(len(view))
+
+    def writer(index, path):
+        chunks = ring.consume(index + 1)
+        journal = journals[index]
+        offset = start_offset
+        try:
+            with open(path, "r+b" if start_offset else "wb") as dst:
+                if start_offset:
+                    dst.truncate(start_offset)
+                    dst.seek(start_offset)
+                dropped = written = start_offset
+                if preallocate_dest:
+                    started = time.perf_counter()
+                    preallocate(dst.fileno(), start_offset, total - start_offset)
+                    if timings is not None:
+                        timings["preallocate"].append(time.perf_counter() - started)
+                if cache_window:
+                    bypass_cache(dst.fileno())
+                for view in chunks:
+                    dst.write(view)
+                    if journal:
+                        journal.record(offset, len(view), xxhash.xxh64_intdigest(view))
+                    offset += len(view)
+                    if cache_window and offset - written >= cache_window:
+                        # Écriture de cette fenêtre lancée en arrière-plan, la précédente est libérée
+                        dst.flush()
+                        start_writeback(dst.fileno(), written, offset - written)
+                        if written > dropped:
+                            flush_window(dst.fileno(), dropped, written - dropped)
+                        dropped, written = written, offset
+                    if on_dest_progress:
+                        on_dest_progress(index, len(view))
+                if cache_window:
+                    dst.flush()
+                    flush_window(dst.fileno(), dropped, offset - dropped)
+                if sync and not interrupted.is_set():
+                    started = time.perf_counter()
+                    dst.flush()
+                    sync_fd(dst.fileno())
+                    if timings is not None:
+                        timings["sync"].append(time.perf_counter() - started)
+        except Exception as e:
+            errors[path] = e
+            # Continuer à relâcher les slots pour ne pas bloquer le lecteur
+            for _ in chunks:
+                pass
+
+    threads = [threading.Thread(target=reader, daemon=True), threading.Thread(target=hasher, daemon=True)]
+    threads += [threading.Thread(target=writer, args=(i, path), daemon=True) for i, path in enumerate(dest_paths)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    if read_error:
+        raise read_error[0]
+    if interrupted.is_set():
+        return None, errors
+    return src_hash.hexdigest(), errors
+
+
+def range_parallel_copy(src_path, dest_paths, chunk_size=1024 * 1024, streams=4, on_progress=None,
+                        on_dest_progress=None, should_stop=None, start_offset=0, src_hash=None, journals=None,
+                        src_tree=None, cache_window=0, preallocate_dest=False, sync=False, timings=None,
+                        write_latency=0.0):
+    """Copie par plages : streams threads lisent (pread) et écrivent (pwrite) des chunks différents.
+
+    Pour les destinations réseau où un flux séquentiel unique est limité par la latence.
+    Les chunks terminés passent dans un tampon de réordonnancement pour que le hash de la
+    source, l'arbre des chunks et les journaux restent calculés dans l'ordre du fichier ;
+    les threads ne prennent pas plus de 2 * streams chunks d'avance sur le hasher.
+    write_latency (secondes) est ajouté avant chaque pwrite, pour simuler un partage distant.
+    cache_window : comme pour pipelined_copy, les fenêtres sont libérées par le hasher une fois
+    tous leurs chunks écrits. Même contrat de retour que pipelined_copy.
+    """
+    total = os.path.getsize(src_path)
+    count = -(-total // chunk_size)
+    first = start_offset // chunk_size
+    window = 2 * max(1, streams)
+    if src_hash is None:
+        src_hash = xxhash.xxh64()
+    journals = journals or [None] * len(dest_paths)
+    if timings is not None:
+        timings.setdefault("preallocate", [])
+        timings.setdefault("sync", [])
+        timings.setdefault("cache_flush", [])
+    errors = {}
+    failure = []
+    interrupted = threading.Event()
+    cond = threading.Condition()
+    ready = {}
+    state = {"next": first, "hashed": first}
+
+    fds = []
+    for path in dest_paths:
+        try:
+            fd = os.open(path, os.O_WRONLY | os.O_CREAT, 0o666)
+            os.ftruncate(fd, start_offset)
+            if preallocate_dest:
+                started = time.perf_counter()
+                preallocate(fd, start_offset, total - start_offset)
+                if timings is not None:
+                    timings["preallocate"].append(time.perf_counter() - started)
+            if cache_window:
+                bypass_cache(fd)
+        except OSError as e:
+            errors[path] = e
+            fd = None
+        fds.append(fd)
+    src_fd = os.open(src_path, os.O_RDONLY)
+    if cache_window:
+        advise_sequential(src_fd)
+    # Fenêtres de cache : [dropped, written) en cours d'écriture, [start_offset, dropped) libéré
+    window_state = {"dropped": start_offset, "written": start_offset}
+
+    def release_window(position, last=False):
+        dropped, written = window_state["dropped"], window_state["written"]
+        if not last and position - written < cache_window:
+            return
+        # Tous les chunks avant position sont écrits sur chaque destination : libérables dans l'ordre
+        drop_range(src_fd, written, position - written)
+        for path, fd in zip(dest_paths, fds):
+            if path in errors:
+                continue
+            if last:
+                _flush_window(fd, dropped, position - dropped, timings)
+                continue
+            start_writeback(fd, written, position - written)
+            if written > dropped:
+                _flush_window(fd, dropped, written - dropped, timings)
+        window_state["dropped"], window_state["written"] = (position, position) if last else (written, position)
+
+    def stop():
+        interrupted.set()
+        with cond:
+            cond.notify_all()
+
+    def copier():
+        try:
+            while True:
+                with cond:
+                    # Mémoire bornée : attendre que le hasher rattrape son retard
+                    while state["next"] - state["hashed"] >= window and not interrupted.is_set():
+                        cond.wait()
+                    if interrupted.is_set() or state["next"] >= count:
+                        return
+                    index = state["next"]
+                    state["next"] += 1
+                if (should_stop and should_stop()) or len(errors) == len(dest_paths):
+                    stop()
+                    return
+                offset = index * chunk_size
+                data = os.pread(src_fd, min(chunk_size, total - offset), offset)
+                for i, (path, fd) in enumerate(zip(dest_paths, fds)):
+                    if path in errors:
+                        continue
+                    try:
+                        if write_latency:
+                            time.sleep(write_latency)
+                        view = memoryview(data)
+                        position = offset
+                        while view:
+                            n = os.pwrite(fd, view, position)
+                            view = view[n:]
+                            position += n
+                    except OSError as e:
+                        errors[path] = e
+                        continue
+                    if on_dest_progress:
+                        on_dest_progress(i, len(data))
+                with cond:
+                    ready[index] = data
+                    cond.notify_all()
+        except Exception as e:
+            failure.append(e)
+            stop()
+
+    def hasher():
+        while state["hashed"] < count:
+            with cond:
+                while state["hashed"] not in ready and not interrupted.is_set():
+                    cond.wait()
+                data = ready.pop(state["hashed"], None)
+            if data is None:
+                return
+            src_hash.update(data)
+            digest = xxhash.xxh64_intdigest(data)
+            if src_tree is not None:
+                src_tree.add_digest(digest, len(data))
+            # Chunk écrit sur toutes les destinations encore valides : consigné dans l'ordre
+            for path, journal in zip(dest_paths, journals):
+                if journal and path not in errors:
+                    journal.record(state["hashed"] * chunk_size, len(data), digest)
+            if on_progress:
+                on_progress(len(data))
+            with cond:
+                state["hashed"] += 1
+                cond.notify_all()
+            if cache_window:
+                release_window(min(state["hashed"] * chunk_size, total), last=state["hashed"] == count)
+
+    threads = [threading.Thread(target=copier, daemon=True) for _ in range(max(1, streams))]
+    threads.append(threading.Thread(target=hasher, daemon=True))
+    try:
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        if sync and not interrupted.is_set():
+            for path, fd in zip(dest_paths, fds):
+                if path in errors:
+                    continue
+                started = time.perf_counter()
+                sync_fd(fd)
+                if timings is not None:
+                    timings["sync"].append(time.perf_counter() - started)
+    finally:
+        os.close(src_fd)
+        for fd in fds:
+            if fd is not None:
+                os.close(fd)
+
+    if failure:
+        raise failure[0]
+    if interrupted.is_set():
+        return None, errors
+    return src_hash.hexdigest(), errors
+
+
+def recopy_chunks(src_path, dest_path, tree, chunks):
+    """Réécrit sur dest_path les chunks désignés, lus depuis la source et contrôlés contre tree.
+
+    Chaque chunk source relu doit redonner la feuille enregistrée pendant la copie, et
+    chaque chunk réécrit est relu sur la destination. Retourne False si l'un des deux diffère.
+    """
+    with open(src_path, "rb") as src, open(dest_path, "r+b") as dst:
+        dst.truncate(tree.size)
+        for offset, length in tree.ranges(chunks):
+            src.seek(offset)
+            dst.seek(offset)
+            for chunk_offset in range(offset, offset + length, tree.chunk_size):
+                data = src.read(min(tree.chunk_size, offset + length - chunk_offset))
+                if xxhash.xxh64_intdigest(data) != tree.leaves[chunk_offset // tree.chunk_size]:
+                    return False
+                dst.write(data)
+        dst.flush()
+        os.fsync(dst.fileno())
+        for offset, length in tree.ranges(chunks):
+            dst.seek(offset)
+            for chunk_offset in range(offset, offset + length, tree.chunk_size):
+                data = dst.read(min(tree.chunk_size, offset + length - chunk_offset))
+                if xxhash.xxh64_intdigest(data) != tree.leaves[chunk_offset // tree.chunk_size]:
+                    return False
+    return True
+
+
+def remove_partial_files(paths):
+    for path in paths:
+        try:
+            if os.path.exists(path):
+                os.remove(path)
+        except Exception:
+            pass
+
+
+__all__ = ["ChunkRing", "ChunkJournal", "read_journal_header", "claim_journal", "orphan_journals", "verified_prefix",
+           "prepare_resume", "pipelined_copy", "range_parallel_copy", "recopy_chunks", "remove_partial_files",
+           "JOURNAL_SUFFIX"]
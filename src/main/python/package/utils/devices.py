@@ -0,0 +1,281 @@
+import ctypes
+import ctypes.util
+import os
+import random
+import re
+import subprocess
+import sys
+import time
+
+from package.utils.params import load_params, save_params
+
+# Nombre de flux simultanés par type de périphérique (surchargeable via "device_streams")
+DEFAULT_STREAMS = {"hdd": 1, "ssd": 2, "nvme": 4, "network": 2, "unknown": 2}
+# Types de systèmes de fichiers réseau (/proc/mounts sous Linux, f_fstypename sous macOS)
+NETWORK_FILESYSTEMS = {"nfs", "nfs4", "cifs", "smb3", "smbfs", "afpfs", "webdav", "9p", "ceph", "glusterfs",
+                       "lustre", "afs", "fuse.sshfs", "fuse.glusterfs", "fuse.rclone", "fuse.s3fs", "osxfuse.sshfs"}
+
+
+def existing_path(path):
+    """Remonte jusqu'au premier parent existant (la destination peut ne pas encore exister)."""
+    path = os.path.abspath(path)
+    while not os.path.exists(path):
+        parent = os.path.dirname(path)
+        if parent == path:
+            break
+        path = parent
+    return path
+
+
+def mount_point(path):
+    path = existing_path(path)
+    while not os.path.ismount(path):
+        parent = os.path.dirname(path)
+        if parent == path:
+            break
+        path = parent
+    return path
+
+
+def device_id(path):
+    try:
+        return os.stat(existing_path(path)).st_dev
+    except OSError:
+        return mount_point(path)
+
+
+def _unescape_mount(field):
+    # /proc/mounts échappe espaces, tabulations et retours en octal (\040...)
+    return re.sub(r"\\([0-7]{3})", lambda m: chr(int(m.group(1), 8)), field)
+
+
+def _mount_entry_linux(path, mounts_file="/proc/mounts"):
+    # (périphérique source, type) du montage qui porte path
+    mount = mount_point(path)
+    entry = None
+    try:
+        with open(mounts_file) as f:
+            for line in f:
+                fields = line.split()
+                # Le dernier montage sur ce point est celui qui est visible
+                if len(fields) >= 3 and _unescape_mount(fields[1]) == mount:
+                    entry = (_unescape_mount(fields[0]), fields[2])
+    except OSError:
+        return None
+    return entry
+
+
+def _fstype_linux(path, mounts_file="/proc/mounts"):
+    entry = _mount_entry_linux(path, mounts_file)
+    return entry[1] if entry else None
+
+
+class _StatfsDarwin(ctypes.Structure):
+    # struct statfs 64 bits (_DARWIN_FEATURE_64_BIT_INODE)
+    _fields_ = [("f_bsize", ctypes.c_uint32), ("f_iosize", ctypes.c_int32),
+                ("f_blocks", ctypes.c_uint64), ("f_bfree", ctypes.c_uint64), ("f_bavail", ctypes.c_uint64),
+                ("f_files", ctypes.c_uint64), ("f_ffree", ctypes.c_uint64), ("f_fsid", ctypes.c_int32 * 2),
+                ("f_owner", ctypes.c_uint32), ("f_type", ctypes.c_uint32), ("f_flags", ctypes.c_uint32),
+                ("f_fssubtype", ctypes.c_uint32), ("f_fstypename", ctypes.c_char * 16),
+                ("f_mntonname", ctypes.c_char * 1024), ("f_mntfromname", ctypes.c_char * 1024),
+                ("f_reserved", ctypes.c_uint32 * 8)]
+
+
+def _fstype_macos(path):
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        try:
+            statfs = libc["statfs$INODE64"]  # x86_64 ; sur arm64 statfs est déjà la version 64 bits
+        except AttributeError:
+            statfs = libc.statfs
+        buf = _StatfsDarwin()
+        if statfs(os.fsencode(existing_path(path)), ctypes.byref(buf)) != 0:
+            return None
+        return buf.f_fstypename.decode("ascii", "replace")
+    except (OSError, AttributeError):
+        return None
+
+
+def filesystem_type(path):
+    """Type du système de fichiers qui porte path ("apfs", "ext4", "smbfs", "nfs"...), None si inconnu."""
+    if sys.platform == "darwin":
+        return _fstype_macos(path)
+    if sys.platform.startswith("linux"):
+        return _fstype_linux(path)
+    return None
+
+
+def _diskutil_info(mount):
+    try:
+        out = subprocess.run(["diskutil", "info", mount], capture_output=True, text=True, timeout=5).stdout
+    except Exception:
+        return None
+    return dict(re.findall(r"^\s*([^:\n]+):\s*(.*?)\s*$", out, re.MULTILINE))
+
+
+def _probe_macos(mount):
+    info = _diskutil_info(mount)
+    if info is None:
+        return None
+    protocol = info.get("Protocol", "")
+    if info.get("File System Personality", "").lower().startswith(("smbfs", "nfs", "afp", "webdav")):
+        return "network"
+    if protocol in ("PCI-Express", "Apple Fabric", "NVMe"):
+        return "nvme"
+    solid = info.get("Solid State", "")
+    if solid == "Yes":
+        return "ssd"
+    if solid == "No":
+        return "hdd"
+    return None
+
+
+def _probe_linux(path):
+    try:
+        dev = os.stat(existing_path(path)).st_dev
+    except OSError:
+        return None
+    sys_path = f"/sys/dev/block/{os.major(dev)}:{os.minor(dev)}"
+    if not os.path.exists(sys_path):
+        # Pas de périphérique bloc (NFS, SMB, tmpfs...) : la sonde de latence tranchera
+        return None
+    real = os.path.realpath(sys_path)
+    if "/nvme" in real:
+        return "nvme"
+    # Pour une partition, la file d'attente est portée par le disque parent
+    for candidate in (real, os.path.dirname(real)):
+        rotational = os.path.join(candidate, "queue", "rotational")
+        if os.path.exists(rotational):
+            with open(rotational) as f:
+                return "hdd" if f.read().strip() == "1" else "ssd"
+    return None
+
+
+def _volume_uuid_linux(path, by_uuid="/dev/disk/by-uuid"):
+    entry = _mount_entry_linux(path)
+    if not entry or not entry[0].startswith("/dev/"):
+        return None
+    device = os.path.realpath(entry[0])
+    try:
+        for name in os.listdir(by_uuid):
+            if os.path.realpath(os.path.join(by_uuid, name)) == device:
+                return name
+    except OSError:
+        pass
+    return None
+
+
+def volume_identity(path):
+    """Identité stable du volume de path, pour mémoriser son type d'un montage à l'autre.
+
+    Type de système de fichiers + UUID du volume (diskutil sous macOS, /dev/disk/by-uuid sous
+    Linux) ; à défaut, périphérique (st_dev) et point de montage. Le point de montage seul ne
+    suffit pas : /Volumes/Untitled ou /media/<user>/disk sont réutilisés par chaque carte.
+    """
+    mount = mount_point(path)
+    fstype = filesystem_type(path) or "unknown"
+    uuid = None
+    if sys.platform == "darwin":
+        info = _diskutil_info(mount) or {}
+        uuid = info.get("Volume UUID") or info.get("Disk / Partition UUID")
+    elif sys.platform.startswith("linux"):
+        uuid = _volume_uuid_linux(path)
+    if uuid:
+        return f"{fstype}:{uuid}"
+    return f"{fstype}:{device_id(path)}:{mount}"
+
+
+def _probe_latency(sample_file, reads=16, block_size=4096):
+    """Lectures aléatoires de 4 Ko : ~ms sur disque rotatif, ~dizaines de µs sur NVMe."""
+    try:
+        size = os.path.getsize(sample_file)
+        if size < block_size * reads * 4:
+            return None
+        latencies = []
+        with open(sample_file, "rb", buffering=0) as f:
+            for _ in range(reads):
+                f.seek(random.randrange(0, size - block_size) & ~(block_size - 1))
+                start = time.perf_counter()
+                f.read(block_size)
+                latencies.append(time.perf_counter() - start)
+    except OSError:
+        return None
+    latency_ms = sorted(latencies)[len(latencies) // 2] * 1000
+    if latency_ms > 2.0:
+        return "hdd"
+    if latency_ms > 0.2:
+        return "ssd"
+    return "nvme"
+
+
+def probe_device(path, sample_file=None):
+    # Partage réseau : ni diskutil ni /sys/dev/block ne le décrivent, le type de montage suffit
+    fstype = filesystem_type(path)
+    if fstype and fstype.lower() in NETWORK_FILESYSTEMS:
+        return "network"
+    kind = None
+    if sys.platform == "darwin":
+        kind = _probe_macos(mount_point(path))
+    elif sys.platform.startswith("linux"):
+        kind = _probe_linux(path)
+    if kind is None and sample_file:
+        kind = _probe_latency(sample_file)
+    return kind or "unknown"
+
+
+def device_kind(path, sample_file=None):
+    """Type du périphérique de path, sondé au premier usage puis mémorisé par identité de volume."""
+    identity = volume_identity(path)
+    profiles = load_params().get("device_profiles", {})
+    profile = profiles.get(identity, {})
+    if "kind" in profile:
+        return profile["kind"]
+    kind = probe_device(path, sample_file)
+    print(f"[DEVICE] {mount_point(path)} ({identity}) -> {kind}")
+    # Un périphérique non identifié sera re-sondé au prochain usage (avec un fichier témoin)
+    if kind != "unknown":
+        profile["kind"] = kind
+        profiles[identity] = profile
+        save_params({"device_profiles": profiles})
+    return kind
+
+
+class DeviceScheduler:
+    """Limite le nombre de copies simultanées par périphérique physique (source et destinations).
+
+    Un scheduler est créé pour chaque job : les périphériques sont ré-identifiés à chaque fois.
+    """
+
+    def __init__(self):
+        self.streams = dict(DEFAULT_STREAMS, **load_params().get("device_streams", {}))
+        self.limits = {}
+        self.kinds = {}
+        self.active = {}
+
+    def register(self, path, sample_file=None):
+        """Retourne la clé de périphérique de path en mémorisant sa limite de flux."""
+        key = device_id(path)
+        if key not in self.limits:
+            kind = device_kind(path, sample_file)
+            self.kinds[key] = kind
+            self.limits[key] = max(1, int(self.streams.get(kind, DEFAULT_STREAMS["unknown"])))
+        return key
+
+    def kind(self, key):
+        return self.kinds.get(key, "unknown")
+
+    def can_start(self, keys):
+        return all(self.active.get(key, 0) < self.limits.get(key, 1) for key in set(keys))
+
+    def acquire(self, keys):
+        for key in set(keys):
+            self.active[key] = self.active.get(key, 0) + 1
+
+    def release(self, keys):
+        for key in set(keys):
+            if self.active.get(key, 0) > 0:
+                self.active[key] -= 1
+
+
+__all__ = ["existing_path", "mount_point", "device_id", "filesystem_type", "volume_identity", "probe_device", "device_kind",
+           "DeviceScheduler", "NETWORK_FILESYSTEMS"]
@@ -0,0 +1,89 @@
+import ctypes
+import ctypes.util
+import os
+import struct
+import sys
+
+# Niveaux de durabilité : aucun fsync, fsync de chaque fichier avant sa vérification,
+# ou fsync groupé de tous les fichiers du job avant l'écriture des manifestes
+DURABILITY_LEVELS = ("none", "file", "job")
+
+# fcntl macOS
+F_PREALLOCATE = 42
+F_FULLFSYNC = 51
+F_ALLOCATECONTIG = 0x2
+F_ALLOCATEALL = 0x4
+F_PEOFPOSMODE = 3
+
+# fallocate(2) Linux : réserver les blocs sans changer la taille visible du fichier
+FALLOC_FL_KEEP_SIZE = 0x1
+
+_libc = None
+
+
+def _get_libc():
+    global _libc
+    if _libc is None:
+        _libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+    return _libc
+
+
+def normalize_durability(level):
+    return level if level in DURABILITY_LEVELS else "file"
+
+
+def preallocate(fd, offset, length):
+    """Réserve length octets à partir de offset, d'un seul tenant si possible.
+
+    La taille du fichier n'est pas modifiée : un fichier partiel garde la taille des
+    données réellement écrites (la reprise par journal s'appuie dessus). Retourne False
+    si le système de fichiers ne le permet pas ; la copie continue alors normalement.
+    """
+    if length <= 0:
+        return True
+    try:
+        if sys.platform == "darwin":
+            import fcntl
+            for flags in (F_ALLOCATECONTIG | F_ALLOCATEALL, F_ALLOCATEALL):
+                # fstore_t : fst_flags, fst_posmode, fst_offset, fst_length, fst_bytesalloc
+                fstore = struct.pack("IiqqQ", flags, F_PEOFPOSMODE, 0, length, 0)
+                try:
+                    fcntl.fcntl(fd, F_PREALLOCATE, fstore)
+                    return True
+                except OSError:
+                    continue
+            return False
+        if sys.platform.startswith("linux"):
+            # Pas os.posix_fallocate : la glibc l'émule en écrivant tout le fichier là où
+            # fallocate n'est pas supporté (exFAT, certains montages réseau)
+            fallocate = _get_libc().fallocate
+            fallocate.argtypes = [ctypes.c_int, ctypes.c_int, ctypes.c_int64, ctypes.c_int64]
+            return fallocate(fd, FALLOC_FL_KEEP_SIZE, offset, length) == 0
+    except (OSError, AttributeError):
+        pass
+    return False
+
+
+def sync_fd(fd):
+    """Écriture effective sur le support : F_FULLFSYNC sur macOS (fsync n'y vide pas le cache du disque)."""
+    if sys.platform == "darwin":
+        try:
+            import fcntl
+            fcntl.fcntl(fd, F_FULLFSYNC)
+            return
+        except OSError:
+            pass
+    os.fsync(fd)
+
+
+def sync_path(path):
+    """fsync d'un fichier ou d'un dossier (pour les entrées de répertoire)."""
+    flags = os.O_RDONLY | (os.O_DIRECTORY if os.path.isdir(path) and hasattr(os, "O_DIRECTORY") else 0)
+    fd = os.open(path, flags)
+    try:
+        sync_fd(fd)
+    finally:
+        os.close(fd)
+
+
+__all__ = ["DURABILITY_LEVELS", "normalize_durability", "preallocate", "sync_fd", "sync_path"]
@@ -0,0 +1,99 @@
+import ctypes
+import ctypes.util
+import errno
+import os
+import sys
+
+from package.utils.devices import device_id
+
+# ioctl Linux : clone (reflink) de tout le fichier source (btrfs, XFS, bcachefs...)
+FICLONE = 0x40049409
+
+# Erreurs signifiant "primitive non disponible ici", par opposition à une vraie erreur d'E/S
+UNSUPPORTED_ERRNOS = {errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP, errno.ENOTTY,
+                      getattr(errno, "ENOTSUP", errno.EOPNOTSUPP), errno.EBADF}
+
+KERNEL_CHUNK = 64 * 1024 * 1024
+
+
+class FastCopyUnsupported(OSError):
+    """Aucune primitive noyau utilisable pour ce couple source / destination."""
+
+
+def same_filesystem(src_path, dest_folder):
+    return device_id(src_path) == device_id(dest_folder)
+
+
+def clone_file(src_path, dest_path):
+    """Clone copy-on-write (clonefile sur APFS, FICLONE sous Linux) ; False si non supporté."""
+    if sys.platform == "darwin":
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        except OSError:
+            return False
+        # clonefile exige que la destination n'existe pas
+        if os.path.exists(dest_path):
+            os.remove(dest_path)
+        return libc.clonefile(os.fsencode(src_path), os.fsencode(dest_path), 0) == 0
+    if sys.platform.startswith("linux"):
+        import fcntl
+        with open(src_path, "rb") as src, open(dest_path, "wb") as dst:
+            try:
+                fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+                return True
+            except OSError as e:
+                if e.errno in UNSUPPORTED_ERRNOS:
+                    return False
+                raise
+    return False
+
+
+def kernel_copy(src_path, dest_path, on_progress=None, should_stop=None, chunk_size=KERNEL_CHUNK):
+    """Copie dans le noyau (copy_file_range, sinon sendfile), sans passer les données par Python.
+
+    Retourne le nom de la primitive utilisée, None si interrompu ; lève FastCopyUnsupported
+    si aucune n'est disponible avant le premier octet copié.
+    """
+    methods = [name for name in ("copy_file_range", "sendfile") if hasattr(os, name)]
+    # sendfile vers un fichier n'existe que sous Linux (ailleurs la cible doit être un socket)
+    if not sys.platform.startswith("linux"):
+        methods = [name for name in methods if name != "sendfile"]
+    total = os.path.getsize(src_path)
+    offset = 0
+    with open(src_path, "rb") as src, open(dest_path, "wb") as dst:
+        while methods:
+            method = methods[0]
+            try:
+                while offset < total:
+                    if should_stop and should_stop():
+                        return None
+                    count = min(chunk_size, total - offset)
+                    if method == "copy_file_range":
+                        n = os.copy_file_range(src.fileno(), dst.fileno(), count, offset, offset)
+                    else:
+                        os.lseek(dst.fileno(), offset, os.SEEK_SET)
+                        n = os.sendfile(dst.fileno(), src.fileno(), offset, count)
+                    if n == 0:
+                        break
+                    offset += n
+                    if on_progress:
+                        on_progress(n)
+                return method
+            except OSError as e:
+                if e.errno not in UNSUPPORTED_ERRNOS:
+                    raise
+                # Primitive refusée (ex. EXDEV entre deux systèmes de fichiers) : suivante
+                methods.pop(0)
+    raise FastCopyUnsupported(errno.EOPNOTSUPP, "No kernel copy primitive available", dest_path)
+
+
+def fast_copy_file(src_path, dest_path, on_progress=None, should_stop=None):
+    """Clone si possible, sinon copie noyau. Retourne la méthode utilisée (None si interrompu)."""
+    if clone_file(src_path, dest_path):
+        if on_progress:
+            on_progress(os.path.getsize(src_path))
+        return "clone"
+    return kernel_copy(src_path, dest_path, on_progress, should_stop)
+
+
+__all__ = ["FastCopyUnsupported", "same_filesystem", "clone_file", "kernel_copy", "fast_copy_file"]
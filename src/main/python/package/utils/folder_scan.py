@@ -0,0 +1,60 @@
+import os
+
+VIDEO_EXTENSIONS = (".mp4", ".mov", ".mxf")
+# Dossiers système ou corbeilles laissés par macOS / Windows sur les cartes
+SKIPPED_DIRS = {"__MACOSX", ".trash", "Trash", "System Volume Information"}
+
+
+def is_video(name, ignore_mxf=False):
+    lower = name.lower()
+    return lower.endswith(VIDEO_EXTENSIONS) and not (ignore_mxf and lower.endswith(".mxf"))
+
+
+def scan_videos(roots, ignore_mxf=False, should_stop=None):
+    """(chemin, taille, périphérique) de chaque clip non vide sous roots (dossiers ou fichiers), dans l'ordre du parcours.
+
+    os.scandir fournit le type de chaque entrée sans stat ; taille et st_dev viennent du
+    stat de l'entrée, fait une seule fois par fichier.
+    """
+    for root in roots:
+        if should_stop and should_stop():
+            return
+        if not os.path.isdir(root):
+            if is_video(os.path.basename(root), ignore_mxf):
+                try:
+                    st = os.stat(root)
+                except OSError:
+                    continue
+                if st.st_size:
+                    yield root, st.st_size, st.st_dev
+            continue
+        stack = [root]
+        while stack:
+            folder = stack.pop()
+            try:
+                with os.scandir(folder) as it:
+                    entries = sorted(it, key=lambda entry: entry.name)
+            except OSError as e:
+                print(f"[SCAN] {folder} illisible : {e}")
+                continue
+            subfolders = []
+            for entry in entries:
+                if should_stop and should_stop():
+                    return
+                if entry.name.startswith("."):
+                    continue
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        if entry.name not in SKIPPED_DIRS:
+                            subfolders.append(entry.path)
+                    elif is_video(entry.name, ignore_mxf):
+                        st = entry.stat()
+                        if st.st_size:
+                            yield entry.path, st.st_size, st.st_dev
+                except OSError:
+                    continue
+            # Parcours en profondeur, sous-dossiers dans l'ordre alphabétique
+            stack.extend(reversed(subfolders))
+
+
+__all__ = ["VIDEO_EXTENSIONS", "is_video", "scan_videos"]
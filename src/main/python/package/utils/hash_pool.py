@@ -0,0 +1,113 @@
+import multiprocessing
+import queue
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from package.utils.hash_tree import hash_file_tree
+
+# Compteurs d'octets hachés en mémoire partagée, un emplacement par calcul en cours
+PROGRESS_SLOTS = 64
+
+_progress = None
+
+
+def _init_worker(progress):
+    global _progress
+    _progress = progress
+
+
+def _hash_job(path, algorithms, chunk_size, slot, nocache=False):
+    def on_progress(n):
+        # Un seul écrivain par emplacement : pas besoin de verrou
+        _progress[slot] += n
+
+    return hash_file_tree(path, algorithms, chunk_size, on_progress, nocache)
+
+
+class HashJob:
+    def __init__(self, pool, future, slot=None):
+        self.pool = pool
+        self.future = future
+        self.slot = slot
+        # Emplacement rendu dès la fin du calcul (succès, erreur ou annulation), que
+        # result() soit appelé ou non
+        future.add_done_callback(lambda _: pool._release(slot))
+
+    def result(self):
+        return self.future.result()
+
+
+class HashProcessPool:
+    """Hash des fichiers dans des processus séparés, hors du GIL du processus de l'interface.
+
+    La progression remonte par un tableau d'entiers partagé que l'interface lit quand elle
+    veut, sans signal ni file de messages. Avec processes=0, ou si le pool ne peut pas démarrer,
+    le hash est calculé dans le thread appelant.
+    """
+
+    def __init__(self, processes=0):
+        self.executor = None
+        self._lock = threading.Lock()
+        self._done = 0
+        self._free = queue.Queue()
+        for slot in range(PROGRESS_SLOTS):
+            self._free.put(slot)
+        if processes > 0:
+            try:
+                # spawn : un fork du processus Qt et de ses threads n'est pas sûr
+                context = multiprocessing.get_context("spawn")
+                self.progress = context.Array("q", PROGRESS_SLOTS, lock=False)
+                self.executor = ProcessPoolExecutor(max_workers=processes, mp_context=context,
+                                                    initializer=_init_worker, initargs=(self.progress,))
+            except (OSError, ValueError) as e:
+                print(f"Pool de hash indisponible, hash dans les threads : {e}")
+                self.executor = None
+        if self.executor is None:
+            self.progress = [0] * PROGRESS_SLOTS
+
+    def submit(self, path, algorithms, chunk_size, nocache=False):
+        """Lance le hash de path ; HashJob.result() retourne (digests, ChunkHashTree).
+
+        nocache : voir hash_file_tree.
+        """
+        slot = self._free.get()
+        self.progress[slot] = 0
+        if self.executor is not None:
+            try:
+                return HashJob(self, self.executor.submit(_hash_job, path, algorithms, chunk_size, slot, nocache),
+                               slot)
+            except (BrokenProcessPool, RuntimeError) as e:
+                print(f"Pool de hash interrompu, hash dans le thread : {e}")
+        future = Future()
+        try:
+            future.set_result(hash_file_tree(path, algorithms, chunk_size,
+                                             lambda n: self.progress.__setitem__(slot, self.progress[slot] + n),
+                                             nocache))
+        except Exception as e:
+            future.set_exception(e)
+        return HashJob(self, future, slot)
+
+    def hash_file_tree(self, path, algorithms, chunk_size):
+        return self.submit(path, algorithms, chunk_size).result()
+
+    def _release(self, slot):
+        if slot is None:
+            return
+        with self._lock:
+            self._done += self.progress[slot]
+            self.progress[slot] = 0
+        self._free.put(slot)
+
+    def bytes_hashed(self):
+        """Octets hachés depuis la création du pool, calculs en cours compris."""
+        with self._lock:
+            return self._done + sum(self.progress[:])
+
+    def shutdown(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+
+
+__all__ = ["HashProcessPool", "HashJob", "PROGRESS_SLOTS"]
@@ -0,0 +1,113 @@
+import json
+import os
+import random
+
+import xxhash
+
+from package.utils.cache_control import bypass_cache
+from package.utils.hashing import MultiHash
+
+TREE_SUFFIX = ".tree.json"
+
+
+class ChunkHashTree:
+    """Arbre de Merkle des chunks d'un fichier : une feuille xxh64 par chunk de chunk_size.
+
+    Deux arbres construits avec la même taille de chunk se comparent feuille à feuille :
+    une divergence désigne directement les plages à recopier.
+    """
+
+    def __init__(self, chunk_size, leaves=None, size=0):
+        self.chunk_size = chunk_size
+        self.leaves = list(leaves or [])
+        self.size = size
+
+    def add(self, data):
+        self.add_digest(xxhash.xxh64_intdigest(data), len(data))
+
+    def add_digest(self, digest, length):
+        self.leaves.append(digest)
+        self.size += length
+
+    def root(self):
+        level = [leaf.to_bytes(8, "big") for leaf in self.leaves]
+        if not level:
+            return xxhash.xxh64(b"").hexdigest()
+        while len(level) > 1:
+            # Un nœud orphelin remonte tel quel au niveau supérieur
+            level = [xxhash.xxh64(b"".join(level[i:i + 2])).digest() if i + 1 < len(level) else level[i]
+                     for i in range(0, len(level), 2)]
+        return level[0].hex()
+
+    def diff(self, other):
+        """Index des chunks qui diffèrent (ou manquent) dans other."""
+        return [i for i, leaf in enumerate(self.leaves) if i >= len(other.leaves) or other.leaves[i] != leaf]
+
+    def ranges(self, chunks):
+        """Plages contiguës [(offset, longueur)] couvrant les chunks donnés."""
+        ranges = []
+        for index in sorted(chunks):
+            offset = index * self.chunk_size
+            length = min(self.chunk_size, self.size - offset)
+            if ranges and ranges[-1][0] + ranges[-1][1] == offset:
+                ranges[-1] = (ranges[-1][0], ranges[-1][1] + length)
+            else:
+                ranges.append((offset, length))
+        return ranges
+
+    def to_dict(self):
+        return {"algorithm": "xxh64", "chunk_size": self.chunk_size, "size": self.size,
+                "root": self.root(), "leaves": [f"{leaf:016x}" for leaf in self.leaves]}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["chunk_size"], [int(leaf, 16) for leaf in data["leaves"]], data["size"])
+
+
+def hash_file_tree(path, algorithms=None, chunk_size=1024 * 1024, on_progress=None, nocache=False):
+    """Digests complets et arbre des chunks de path, calculés sur une seule lecture.
+
+    nocache : lecture sans passer par le cache (F_NOCACHE, macOS), pour une relecture de
+    vérification qui touche le support.
+    """
+    h = MultiHash(algorithms)
+    tree = ChunkHashTree(chunk_size)
+    with open(path, "rb") as f:
+        if nocache:
+            bypass_cache(f.fileno())
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            h.update(chunk)
+            tree.add(chunk)
+            if on_progress:
+                on_progress(len(chunk))
+    return h.hexdigest(), tree
+
+
+def spot_check(path, tree, samples=8):
+    """Relit quelques chunks tirés au hasard ; retourne les index qui ne correspondent plus à l'arbre."""
+    if os.path.getsize(path) != tree.size:
+        return list(range(len(tree.leaves)))
+    bad = []
+    with open(path, "rb") as f:
+        for index in sorted(random.sample(range(len(tree.leaves)), min(samples, len(tree.leaves)))):
+            f.seek(index * tree.chunk_size)
+            if xxhash.xxh64_intdigest(f.read(tree.chunk_size)) != tree.leaves[index]:
+                bad.append(index)
+    return bad
+
+
+def save_trees(path, trees):
+    """Écrit {fichier: arbre} à côté du manifeste JSON."""
+    with open(path, "w") as f:
+        json.dump({name: tree.to_dict() for name, tree in trees.items()}, f)
+
+
+def load_trees(path):
+    with open(path) as f:
+        return {name: ChunkHashTree.from_dict(data) for name, data in json.load(f).items()}
+
+
+__all__ = ["ChunkHashTree", "hash_file_tree", "spot_check", "save_trees", "load_trees", "TREE_SUFFIX"]
@@ -0,0 +1,82 @@
+import hashlib
+import os
+import time
+
+import xxhash
+
+# Algorithme -> (constructeur, élément MHL / clé JSON)
+ALGORITHMS = {
+    "xxh64": (xxhash.xxh64, "xxhash64be"),
+    "xxh3_64": (xxhash.xxh3_64, "xxh3"),
+    "xxh128": (xxhash.xxh128, "xxh128"),
+    "md5": (hashlib.md5, "md5"),
+    "sha1": (hashlib.sha1, "sha1"),
+}
+
+DEFAULT_ALGORITHMS = ["xxh64"]
+
+
+def normalize_algorithms(algorithms):
+    """Algorithmes connus, dans l'ordre de ALGORITHMS ; xxh64 si la sélection est vide."""
+    selected = [name for name in ALGORITHMS if name in (algorithms or [])]
+    return selected or list(DEFAULT_ALGORITHMS)
+
+
+def element_name(algorithm):
+    return ALGORITHMS[algorithm][1]
+
+
+class MultiHash:
+    """Calcule plusieurs digests sur la même passe de données."""
+
+    def __init__(self, algorithms=None):
+        self.algorithms = normalize_algorithms(algorithms)
+        self._hashers = [ALGORITHMS[name][0]() for name in self.algorithms]
+
+    def update(self, data):
+        for hasher in self._hashers:
+            hasher.update(data)
+
+    def hexdigest(self):
+        """{algorithme: digest hexadécimal}"""
+        return {name: hasher.hexdigest() for name, hasher in zip(self.algorithms, self._hashers)}
+
+
+def hash_file(path, algorithms=None, chunk_size=1024 * 1024):
+    h = MultiHash(algorithms)
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def format_digests(digests):
+    """Résumé lisible pour le log : la valeur seule si un seul algorithme."""
+    if not digests:
+        return ""
+    if len(digests) == 1:
+        return next(iter(digests.values()))
+    return " ".join(f"{name}={value}" for name, value in digests.items())
+
+
+def benchmark(algorithms=None, size_mb=256, chunk_size=1024 * 1024):
+    """Débit de chaque algorithme sur cette machine, en Mo/s (données en mémoire)."""
+    buf = os.urandom(chunk_size)
+    view = memoryview(buf)
+    results = {}
+    for name in (algorithms or list(ALGORITHMS)):
+        hasher = ALGORITHMS[name][0]()
+        start = time.perf_counter()
+        for _ in range(max(1, size_mb * 1024 * 1024 // chunk_size)):
+            hasher.update(view)
+        hasher.hexdigest()
+        elapsed = time.perf_counter() - start
+        results[name] = size_mb / elapsed if elapsed > 0 else float("inf")
+    return results
+
+
+__all__ = ["ALGORITHMS", "DEFAULT_ALGORITHMS", "normalize_algorithms", "element_name", "MultiHash",
+           "hash_file", "format_digests", "benchmark"]
@@ -0,0 +1,102 @@
+import os
+
+from package.utils.camera_profiles import ProfileMatcher
+from package.utils.devices import device_id, existing_path
+from package.utils.throughput import estimate_duration, history_rate
+
+# Manifestes, log, journaux de reprise : quelques Mo par destination
+MANIFEST_MARGIN = 16 * 1024 * 1024
+
+
+def _round_up(size, block):
+    return -(-size // block) * block if block else size
+
+
+def free_space(folder):
+    """(octets disponibles, taille de bloc) du volume de folder, via statvfs."""
+    st = os.statvfs(existing_path(folder))
+    return st.f_bavail * st.f_frsize, st.f_frsize
+
+
+class JobPlan:
+    """Plan d'un job de copie établi avant le premier octet : tailles, place disponible, durée prévue."""
+
+    def __init__(self, files, destinations, volumes, copy_rate=None, verify_rate=None, sidecars=()):
+        self.files = files  # [(source, taille ou None si introuvable, nouveau nom)]
+        self.sidecars = list(sidecars)  # fichiers compagnons des clips (THM, SRT, XML...), non copiés
+        self.destinations = destinations
+        self.volumes = volumes  # [{"folders", "needed", "free"}], un par volume de destination
+        self.copy_rate = copy_rate
+        self.verify_rate = verify_rate
+        self.total_bytes = sum(size for _, size, _ in files if size)
+
+    @property
+    def missing(self):
+        return [src for src, size, _ in self.files if size is None]
+
+    @property
+    def short_volumes(self):
+        return [volume for volume in self.volumes if volume["free"] is not None and volume["needed"] > volume["free"]]
+
+    @property
+    def ok(self):
+        return not self.missing and not self.short_volumes
+
+    def duration(self):
+        """Secondes prévues pour la copie et la vérification, None sans historique pour ces volumes."""
+        return estimate_duration(self.total_bytes, self.total_bytes * len(self.destinations),
+                                 self.copy_rate, self.verify_rate)
+
+    def problems(self):
+        problems = [f"Source introuvable : {src}" for src in self.missing]
+        for volume in self.short_volumes:
+            problems.append(f"Espace insuffisant sur {', '.join(volume['folders'])} : "
+                            f"{volume['needed'] / 1024 ** 3:.1f} GB requis, {volume['free'] / 1024 ** 3:.1f} GB libres")
+        return problems
+
+
+def plan_job(entries, destinations, headroom_pct=2.0, camera_profile="auto"):
+    """Plan du job pour [(source, nouveau nom)] copiés vers chaque dossier de destinations.
+
+    Chaque source est statée une seule fois. La place requise est comptée en blocs entiers
+    du volume (la préallocation réserve le fichier complet dès le premier chunk), moins ce
+    qu'une copie interrompue a déjà écrit, plus headroom_pct % et une marge pour les
+    manifestes ; des destinations sur un même volume sont cumulées.
+    """
+    files = []
+    sidecars = []
+    matcher = ProfileMatcher(camera_profile)
+    for src, new_name in entries:
+        try:
+            size = os.stat(src).st_size
+        except OSError:
+            size = None
+        else:
+            sidecars.extend(matcher.sidecars(src))
+        files.append((src, size, new_name))
+
+    volumes = {}
+    for folder in destinations:
+        key = device_id(folder)
+        try:
+            free, block = free_space(folder)
+        except OSError:
+            free, block = None, 0
+        volume = volumes.setdefault(key, {"folders": [], "needed": 0, "free": free})
+        volume["folders"].append(folder)
+        needed = MANIFEST_MARGIN
+        for _, size, new_name in files:
+            if not size:
+                continue
+            target = os.path.join(folder, new_name)
+            present = os.path.getsize(target) if os.path.exists(target) else 0
+            needed += max(0, _round_up(size, block) - _round_up(present, block))
+        volume["needed"] += int(needed * (1 + headroom_pct / 100))
+
+    source = next((src for src, size, _ in files if size is not None), None)
+    copy_rate = history_rate(source, destinations, "copy") if source and destinations else None
+    verify_rate = history_rate(source, destinations, "verify") if source and destinations else None
+    return JobPlan(files, list(destinations), list(volumes.values()), copy_rate, verify_rate, sidecars)
+
+
+__all__ = ["JobPlan", "plan_job", "free_space", "MANIFEST_MARGIN"]
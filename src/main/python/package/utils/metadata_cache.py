@@ -0,0 +1,128 @@
+import atexit
+import datetime
+import os
+import sqlite3
+import threading
+import time
+
+from package.utils.params import get_params_path, load_params
+
+CACHE_FILENAME = "metadata_cache.sqlite"
+FIELDS = ("creation_date", "clip_id", "chapter", "duration", "fps", "camera_model", "camera_serial",
+          "start_timecode", "material_package_uid")
+# À incrémenter quand FIELDS ou leur calcul change : un cache d'un autre format est simplement recréé
+SCHEMA_VERSION = 4
+
+
+def file_identity(path):
+    """(chemin absolu, taille, mtime en ns, inode) : une entrée n'est valable que si tout concorde."""
+    st = os.stat(path)
+    return os.path.abspath(path), st.st_size, st.st_mtime_ns, st.st_ino
+
+
+class MetadataCache:
+    """Cache SQLite des métadonnées de clips, partagé entre les dépôts et les sessions.
+
+    Clé : chemin + taille + mtime + inode ; un fichier remplacé ou modifié est relu.
+    Les entrées les moins récemment utilisées sont évincées au-delà de max_entries.
+    """
+
+    def __init__(self, path=None, max_entries=20000):
+        self.path = path or os.path.join(os.path.dirname(get_params_path()), CACHE_FILENAME)
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._touched = {}
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        if self._db.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+            self._db.execute("DROP TABLE IF EXISTS clips")
+            self._db.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        self._db.execute("""CREATE TABLE IF NOT EXISTS clips (
+            path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, inode INTEGER,
+            creation_date TEXT, clip_id INTEGER, chapter INTEGER, duration REAL, fps REAL,
+            camera_model TEXT, camera_serial TEXT, start_timecode TEXT, material_package_uid TEXT,
+            last_used REAL)""")
+        self._db.execute("CREATE INDEX IF NOT EXISTS clips_last_used ON clips (last_used)")
+        self._db.commit()
+
+    def get(self, path):
+        """Métadonnées en cache pour path, None si absentes ou périmées."""
+        try:
+            key, size, mtime_ns, inode = file_identity(path)
+        except OSError:
+            return None
+        with self._lock:
+            row = self._db.execute(
+                f"SELECT {', '.join(FIELDS)} FROM clips WHERE path = ? AND size = ? AND mtime_ns = ? AND inode = ?",
+                (key, size, mtime_ns, inode)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            # Date d'usage écrite au prochain flush, pas une écriture par lecture
+            self._touched[key] = time.time()
+        metadata = dict(zip(FIELDS, row))
+        if metadata["creation_date"]:
+            metadata["creation_date"] = datetime.datetime.fromisoformat(metadata["creation_date"])
+        return metadata
+
+    def put(self, path, metadata):
+        try:
+            key, size, mtime_ns, inode = file_identity(path)
+        except OSError:
+            return
+        creation_date = metadata.get("creation_date")
+        values = dict(metadata, creation_date=creation_date.isoformat() if creation_date else None)
+        with self._lock:
+            self._touched.pop(key, None)
+            self._db.execute(
+                f"INSERT OR REPLACE INTO clips (path, size, mtime_ns, inode, {', '.join(FIELDS)}, last_used) "
+                f"VALUES (?, ?, ?, ?, {', '.join('?' * len(FIELDS))}, ?)",
+                (key, size, mtime_ns, inode, *(values.get(field) for field in FIELDS), time.time()))
+
+    def flush(self):
+        """Écrit les dates d'usage, évince l'excédent (LRU) et valide la transaction."""
+        with self._lock:
+            if self._touched:
+                self._db.executemany("UPDATE clips SET last_used = ? WHERE path = ?",
+                                     [(used, key) for key, used in self._touched.items()])
+                self._touched = {}
+            count = self._db.execute("SELECT COUNT(*) FROM clips").fetchone()[0]
+            if count > self.max_entries:
+                self._db.execute("DELETE FROM clips WHERE path IN "
+                                 "(SELECT path FROM clips ORDER BY last_used ASC LIMIT ?)",
+                                 (count - self.max_entries,))
+            self._db.commit()
+
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def summary(self):
+        return f"cache métadonnées : {self.hits} / {self.hits + self.misses} ({100 * self.hit_rate():.0f} %)"
+
+    def reset_stats(self):
+        self.hits = self.misses = 0
+
+    def close(self):
+        self.flush()
+        with self._lock:
+            self._db.close()
+
+
+_cache = None
+
+
+def metadata_cache():
+    """Cache partagé de l'application, ouvert au premier usage et fermé à la sortie."""
+    global _cache
+    if _cache is None:
+        _cache = MetadataCache(max_entries=int(load_params().get("metadata_cache_entries", 20000)))
+        atexit.register(_cache.close)
+    return _cache
+
+
+__all__ = ["MetadataCache", "metadata_cache", "file_identity", "CACHE_FILENAME"]
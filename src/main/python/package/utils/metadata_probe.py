@@ -0,0 +1,78 @@
+import collections
+import concurrent.futures
+import time
+
+from package.utils.clip_metadata import clip_metadata
+
+
+class MetadataProbePool:
+    """Lecture des métadonnées de clips en parallèle, bornée par périphérique source.
+
+    Chaque carte est limitée par sa latence d'accès : plusieurs lectures en vol par lecteur
+    recouvrent cette latence, et la limite par périphérique évite qu'un lecteur lent
+    monopolise les threads au détriment des autres.
+    """
+
+    def __init__(self, workers=8, per_device=4, probe=clip_metadata):
+        self.workers = max(1, workers)
+        self.per_device = max(1, per_device)
+        self.probe = probe
+
+    def _timed_probe(self, path):
+        started = time.perf_counter()
+        metadata = self.probe(path)
+        return metadata, time.perf_counter() - started
+
+    def probe_stream(self, items, should_stop=None):
+        """Pour chaque (chemin, taille, périphérique) de items, génère (chemin, taille, périphérique, métadonnées ou None, latence en s).
+
+        Les résultats arrivent dans l'ordre de fin des lectures ; items est consommé au fil de
+        l'eau, jamais plus de quelques lots d'avance sur les lectures en cours.
+        """
+        items = iter(items)
+        pending = collections.defaultdict(collections.deque)  # périphérique -> [(chemin, taille)]
+        pending_count = 0
+        in_flight = collections.Counter()
+        running = {}
+        exhausted = False
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.workers) as executor:
+            while True:
+                if should_stop and should_stop():
+                    for future in running:
+                        future.cancel()
+                    return
+                # Prélever de nouveaux clips tant que la file d'attente reste courte
+                while not exhausted and pending_count < self.workers * 4:
+                    try:
+                        path, size, device = next(items)
+                    except StopIteration:
+                        exhausted = True
+                        break
+                    pending[device].append((path, size))
+                    pending_count += 1
+                # Lancer ce qui peut l'être, sans dépasser la limite de chaque périphérique
+                for device, queue in pending.items():
+                    while queue and in_flight[device] < self.per_device and len(running) < self.workers:
+                        path, size = queue.popleft()
+                        pending_count -= 1
+                        in_flight[device] += 1
+                        running[executor.submit(self._timed_probe, path)] = (path, size, device)
+                if not running:
+                    if exhausted and not pending_count:
+                        return
+                    continue
+                done, _ = concurrent.futures.wait(running, timeout=0.1,
+                                                  return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in done:
+                    path, size, device = running.pop(future)
+                    in_flight[device] -= 1
+                    try:
+                        metadata, latency = future.result()
+                    except Exception as e:
+                        # Le clip reste listé, simplement sans métadonnées de tri
+                        print(f"[METADATA] {path} : {e}")
+                        metadata, latency = None, 0.0
+                    yield path, size, device, metadata, latency
+
+
+__all__ = ["MetadataProbePool"]
@@ -0,0 +1,154 @@
+import datetime
+import os
+import struct
+
+# Origine des dates QuickTime / ISO BMFF
+MP4_EPOCH = datetime.datetime(1904, 1, 1)
+
+# Boîtes de premier niveau attendues dans un MP4 / MOV ; toute autre valeur = pas un MP4
+TOP_LEVEL = {b"ftyp", b"moov", b"mdat", b"free", b"skip", b"wide", b"uuid", b"pnot", b"meta", b"styp", b"sidx"}
+
+# Clés GPMF de udta (GoPro) : modèle, numéro de série de la caméra
+GPMF_KEYS = {b"MINF": "camera_model", b"CASN": "camera_serial"}
+
+
+class Mp4ParseError(ValueError):
+    """Structure de boîtes illisible : l'appelant se rabat sur un parseur générique."""
+
+
+def iter_boxes(f, start, end):
+    """(type, offset des données, fin) de chaque boîte entre start et end, sans lire leur contenu.
+
+    Gère les tailles 64 bits (size == 1) et la dernière boîte qui court jusqu'à la fin (size == 0).
+    """
+    offset = start
+    while offset + 8 <= end:
+        f.seek(offset)
+        header = f.read(16)
+        if len(header) < 8:
+            return
+        size, kind = struct.unpack(">I4s", header[:8])
+        data = offset + 8
+        if size == 1:
+            if len(header) < 16:
+                raise Mp4ParseError("truncated 64-bit box header")
+            size = struct.unpack(">Q", header[8:16])[0]
+            data = offset + 16
+        elif size == 0:
+            size = end - offset
+        if size < data - offset or offset + size > end:
+            raise Mp4ParseError(f"invalid size for box {kind!r} at {offset}")
+        yield kind, data, offset + size
+        offset += size
+
+
+def find_box(f, start, end, *path):
+    """(offset des données, fin) de la boîte désignée par path (ex. b"moov", b"mvhd"), None si absente."""
+    for kind, data, box_end in iter_boxes(f, start, end):
+        if kind == path[0]:
+            return (data, box_end) if len(path) == 1 else find_box(f, data, box_end, *path[1:])
+    return None
+
+
+def _mp4_date(seconds):
+    # 0 : date non renseignée par la caméra
+    return MP4_EPOCH + datetime.timedelta(seconds=seconds) if seconds else None
+
+
+def read_mvhd(f, data):
+    """(date de création, timescale, durée en unités de timescale) de la boîte mvhd."""
+    f.seek(data)
+    version = f.read(4)[0]
+    if version == 1:
+        created, _, timescale, duration = struct.unpack(">QQIQ", f.read(28))
+    else:
+        created, _, timescale, duration = struct.unpack(">IIII", f.read(16))
+    return _mp4_date(created), timescale, duration
+
+
+def read_fps(f, moov, moov_end):
+    """Cadence de la première piste vidéo : timescale de mdhd / durée du premier échantillon (stts)."""
+    for kind, data, end in iter_boxes(f, moov, moov_end):
+        if kind != b"trak":
+            continue
+        mdia = find_box(f, data, end, b"mdia")
+        if mdia is None:
+            continue
+        hdlr = find_box(f, *mdia, b"hdlr")
+        if hdlr is None:
+            continue
+        f.seek(hdlr[0] + 8)  # version/flags puis pre_defined
+        if f.read(4) != b"vide":
+            continue
+        mdhd = find_box(f, *mdia, b"mdhd")
+        stts = find_box(f, *mdia, b"minf", b"stbl", b"stts")
+        if mdhd is None or stts is None:
+            return None
+        f.seek(mdhd[0])
+        version = f.read(4)[0]
+        f.seek(mdhd[0] + (20 if version == 1 else 12))
+        timescale = struct.unpack(">I", f.read(4))[0]
+        f.seek(stts[0] + 4)
+        entries = struct.unpack(">I", f.read(4))[0]
+        if not entries:
+            return None
+        _, delta = struct.unpack(">II", f.read(8))
+        return round(timescale / delta, 3) if delta else None
+    return None
+
+
+def read_gpmf(f, data, end):
+    """Quelques clés GPMF de udta (KLV : clé, type, taille, répétition, données alignées sur 4 octets)."""
+    f.seek(data)
+    payload = f.read(min(end - data, 64 * 1024))
+    values = {}
+    offset = 0
+    while offset + 8 <= len(payload):
+        key, kind, size, repeat = struct.unpack(">4sBBH", payload[offset:offset + 8])
+        length = size * repeat
+        value = payload[offset + 8:offset + 8 + length]
+        if kind == 0:
+            # Conteneur (DEVC, STRM...) : on descend dedans
+            offset += 8
+            continue
+        if key in GPMF_KEYS and kind == ord("c"):
+            values[GPMF_KEYS[key]] = value.rstrip(b"\0").decode("ascii", "replace").strip()
+        offset += 8 + (length + 3) // 4 * 4
+    return values
+
+
+def read_mp4_metadata(path):
+    """Date de création, durée (s) et fps d'un MP4 / MOV, plus modèle et série GoPro si présents.
+
+    Seules les boîtes utiles sont lues : mdat est sauté par seek, moov peut être en fin de
+    fichier. Lève Mp4ParseError si le fichier n'a pas la structure attendue.
+    """
+    size = os.path.getsize(path)
+    try:
+        with open(path, "rb") as f:
+            return _read_metadata(f, size)
+    except (struct.error, IndexError) as e:
+        raise Mp4ParseError(f"truncated box: {e}")
+
+
+def _read_metadata(f, size):
+    first = f.read(8)
+    if len(first) < 8 or first[4:8] not in TOP_LEVEL:
+        raise Mp4ParseError("not an ISO BMFF / QuickTime file")
+    moov = find_box(f, 0, size, b"moov")
+    if moov is None:
+        raise Mp4ParseError("no moov box")
+    mvhd = find_box(f, *moov, b"mvhd")
+    if mvhd is None:
+        raise Mp4ParseError("no mvhd box")
+    creation_date, timescale, duration = read_mvhd(f, mvhd[0])
+    metadata = {"creation_date": creation_date,
+                "duration": duration / timescale if timescale else None,
+                "fps": read_fps(f, *moov)}
+    gpmf = find_box(f, *moov, b"udta", b"GPMF")
+    if gpmf is not None:
+        metadata.update(read_gpmf(f, *gpmf))
+    return metadata
+
+
+__all__ = ["Mp4ParseError", "iter_boxes", "find_box", "read_mvhd", "read_fps", "read_gpmf", "read_mp4_metadata"]
@@ -0,0 +1,196 @@
+import datetime
+import struct
+
+# Préfixe SMPTE commun à toutes les clés KLV (UL)
+SMPTE_UL = b"\x06\x0e\x2b\x34"
+# Partition pack : 06 0E 2B 34 02 05 01 01 0D 01 02 01 01 <type> <statut> 00, type 02 = header
+PARTITION_PACK = b"\x06\x0e\x2b\x34\x02\x05\x01\x01\x0d\x01\x02\x01\x01"
+# Jeux de métadonnées structurelles (local sets) : 06 0E 2B 34 02 53 01 01 0D 01 01 01 01 <type sur 2 octets> 00
+LOCAL_SET = b"\x06\x0e\x2b\x34\x02\x53\x01\x01\x0d\x01\x01\x01\x01"
+
+# Types de jeux utiles (octets 13-14 de la clé)
+PREFACE = 0x012F
+IDENTIFICATION = 0x0130
+MATERIAL_PACKAGE = 0x0136
+TRACK = 0x013B
+SEQUENCE = 0x010F
+TIMECODE_COMPONENT = 0x0114
+
+# Tags locaux statiques (SMPTE 377M), identiques dans tous les fichiers
+INSTANCE_UID = 0x3C0A
+PACKAGE_UID = 0x4401
+PACKAGE_CREATION_DATE = 0x4405
+PACKAGE_TRACKS = 0x4403
+LAST_MODIFIED_DATE = 0x3B02
+MODIFICATION_DATE = 0x3C06
+TRACK_EDIT_RATE = 0x4B01
+TRACK_SEQUENCE = 0x4803
+COMPONENTS = 0x1001
+DURATION = 0x0202
+START_TIMECODE = 0x1501
+ROUNDED_TIMECODE_BASE = 0x1502
+DROP_FRAME = 0x1503
+
+# La partition d'en-tête (partition pack, primer, métadonnées) tient en quelques dizaines de Ko
+HEADER_READ_SIZE = 256 * 1024
+
+
+class MxfParseError(ValueError):
+    """En-tête MXF absent ou illisible dans la zone lue."""
+
+
+def read_ber_length(data, offset):
+    """(longueur, offset de la valeur) d'une longueur BER à data[offset]."""
+    first = data[offset]
+    if first < 0x80:
+        return first, offset + 1
+    count = first & 0x7F
+    if not 0 < count <= 8 or offset + 1 + count > len(data):
+        raise MxfParseError(f"invalid BER length at {offset}")
+    return int.from_bytes(data[offset + 1:offset + 1 + count], "big"), offset + 1 + count
+
+
+def iter_klv(data, offset=0):
+    """(clé, offset de la valeur, longueur) de chaque triplet KLV complet de data à partir d'offset."""
+    while offset + 17 <= len(data):
+        key = data[offset:offset + 16]
+        if key[:4] != SMPTE_UL:
+            # Plus de KLV valide : fin de la partition exploitable
+            return
+        length, value = read_ber_length(data, offset + 16)
+        if value + length > len(data):
+            # Triplet coupé par la fin de la zone lue (essence, index) : on s'arrête là
+            return
+        yield key, value, length
+        offset = value + length
+
+
+def iter_local_tags(data, offset, length):
+    """(tag, valeur) de chaque élément tag(2) / longueur(2) / valeur d'un local set."""
+    end = offset + length
+    while offset + 4 <= end:
+        tag, size = struct.unpack(">HH", data[offset:offset + 4])
+        yield tag, data[offset + 4:offset + 4 + size]
+        offset += 4 + size
+
+
+def _timestamp(value):
+    # Timestamp MXF : année(2) mois jour heure minute seconde ms/4 ; tout à 0 = non renseigné
+    if len(value) < 8:
+        return None
+    year, month, day, hour, minute, second, quarter_ms = struct.unpack(">HBBBBBB", value[:8])
+    try:
+        return datetime.datetime(year, month, day, hour, minute, second, quarter_ms * 4000)
+    except ValueError:
+        return None
+
+
+def _refs(value):
+    # Batch de références fortes : nombre(4), taille d'un élément(4), puis les UID
+    if len(value) < 8:
+        return []
+    count, size = struct.unpack(">II", value[:8])
+    return [value[8 + i * size:8 + (i + 1) * size] for i in range(count)]
+
+
+def format_timecode(frames, base, drop_frame=False):
+    """HH:MM:SS:FF (HH:MM:SS;FF en drop frame) d'un nombre d'images depuis minuit."""
+    if drop_frame and base in (30, 60):
+        # Compensation drop frame : 2 (ou 4) numéros sautés par minute sauf toutes les 10 minutes
+        drop = base // 15
+        per_10_min = base * 600 - drop * 9
+        per_min = base * 60 - drop
+        tens, rest = divmod(frames, per_10_min)
+        frames += drop * 9 * tens + (drop * ((rest - drop) // per_min) if rest > drop else 0)
+    seconds, ff = divmod(frames, base)
+    minutes, ss = divmod(seconds, 60)
+    hh, mm = divmod(minutes, 60)
+    return f"{hh % 24:02d}:{mm:02d}:{ss:02d}{';' if drop_frame else ':'}{ff:02d}"
+
+
+def parse_header(data):
+    """Jeux de métadonnées de la partition d'en-tête : {instance UID: (type, {tag: valeur})}."""
+    if not data.startswith(PARTITION_PACK) or data[13] != 0x02:
+        # Un run-in (< 64 Ko) peut précéder la clé du partition pack
+        start = data.find(PARTITION_PACK + b"\x02", 0, 65536 + 16)
+        if start < 0:
+            raise MxfParseError("no header partition pack")
+        data = data[start:]
+    sets = {}
+    for key, value, length in iter_klv(data):
+        if not key.startswith(LOCAL_SET):
+            continue
+        tags = dict(iter_local_tags(data, value, length))
+        uid = tags.get(INSTANCE_UID)
+        if uid:
+            sets[uid] = (key[13] << 8 | key[14], tags)
+    if not sets:
+        raise MxfParseError("no header metadata in the first bytes")
+    return sets
+
+
+def read_mxf_metadata(path, read_size=HEADER_READ_SIZE):
+    """Date de création, UID du material package, timecode de début, cadence et durée d'un MXF.
+
+    Seuls les read_size premiers octets sont lus : la partition d'en-tête précède l'essence.
+    Lève MxfParseError si les métadonnées structurelles n'y sont pas.
+    """
+    with open(path, "rb") as f:
+        data = f.read(read_size)
+    try:
+        return _read_metadata(parse_header(data))
+    except (struct.error, IndexError) as e:
+        raise MxfParseError(f"truncated header metadata: {e}")
+
+
+def _read_metadata(sets):
+    def of_type(kind):
+        return [tags for set_kind, tags in sets.values() if set_kind == kind]
+
+    metadata = {"creation_date": None, "material_package_uid": None, "start_timecode": None,
+                "fps": None, "duration": None}
+    material = next(iter(of_type(MATERIAL_PACKAGE)), None)
+    if material is not None:
+        if PACKAGE_UID in material:
+            metadata["material_package_uid"] = material[PACKAGE_UID].hex()
+        metadata["creation_date"] = _timestamp(material.get(PACKAGE_CREATION_DATE, b""))
+    if metadata["creation_date"] is None:
+        # Repli : date d'écriture de l'en-tête (preface, puis identification)
+        for kind, tag in ((PREFACE, LAST_MODIFIED_DATE), (IDENTIFICATION, MODIFICATION_DATE)):
+            dated = next((tags for tags in of_type(kind) if tag in tags), None)
+            if dated is not None and _timestamp(dated[tag]):
+                metadata["creation_date"] = _timestamp(dated[tag])
+                break
+
+    # Pistes du material package (ou toutes si le package manque) : la piste timecode donne
+    # le timecode de début et la durée, sa cadence d'édition est celle du clip
+    track_uids = _refs(material[PACKAGE_TRACKS]) if material is not None and PACKAGE_TRACKS in material else \
+        [uid for uid, (kind, _) in sets.items() if kind == TRACK]
+    for uid in track_uids:
+        kind, track = sets.get(uid, (None, {}))
+        if kind != TRACK or TRACK_EDIT_RATE not in track:
+            continue
+        numerator, denominator = struct.unpack(">ii", track[TRACK_EDIT_RATE][:8])
+        edit_rate = numerator / denominator if denominator else None
+        if metadata["fps"] is None and edit_rate:
+            metadata["fps"] = round(edit_rate, 3)
+        _, sequence = sets.get(track.get(TRACK_SEQUENCE), (None, {}))
+        for component_uid in _refs(sequence.get(COMPONENTS, b"")):
+            kind, component = sets.get(component_uid, (None, {}))
+            if kind != TIMECODE_COMPONENT or START_TIMECODE not in component:
+                continue
+            start = struct.unpack(">q", component[START_TIMECODE][:8])[0]
+            base = struct.unpack(">H", component.get(ROUNDED_TIMECODE_BASE, b"\0\0")[:2])[0] or round(edit_rate or 25)
+            drop_frame = bool(component.get(DROP_FRAME, b"\0")[0])
+            metadata["start_timecode"] = format_timecode(start, base, drop_frame)
+            metadata["fps"] = round(edit_rate, 3) if edit_rate else metadata["fps"]
+            duration = struct.unpack(">q", component[DURATION][:8])[0] if DURATION in component else -1
+            if duration > 0 and edit_rate:
+                # -1 : durée inconnue (fichier en cours d'écriture)
+                metadata["duration"] = duration / edit_rate
+            return metadata
+    return metadata
+
+
+__all__ = ["MxfParseError", "read_ber_length", "iter_klv", "iter_local_tags", "format_timecode", "parse_header",
+           "read_mxf_metadata", "HEADER_READ_SIZE"]
@@ -11,6 +11,7 @@ import os
 import json
 import requests
 from discordwebhook import Discord
+from package.utils.camera_profiles import PROFILES
 
 def get_params_path():
     return os.path.join(os.path.expanduser("~"), "Library", "Application Support", "LabrollUtility", "labrollUtility_params.json")
@@ -28,7 +29,32 @@ def ensure_params_file():
                 "export_json": True,
                 "export_log": True,
                 "rename_only": False,
-                "ignore_mxf": True,
+                "ignore_mxf": False,
+                "chunk_size_mb": 1,
+                "ring_size": 8,
+                "resumable_copies": True,
+                "verify_threads": 2,
+                "process_hashing": True,
+                "hash_processes": 0,
+                "hash_algorithms": ["xxh64"],
+                "export_hash_tree": False,
+                "managed_page_cache": False,
+                "cache_window_mb": 64,
+                "preallocate": True,
+                "durability": "file",
+                "fast_copy": True,
+                "inline_hash": True,
+                "range_parallel": "network",
+                "range_streams": 4,
+                "debug_write_latency_ms": 0,
+                "progress_refresh_hz": 15,
+                "confirm_job_plan": False,
+                "space_headroom_pct": 2,
+                "metadata_cache_entries": 20000,
+                "metadata_probe_threads": 8,
+                "metadata_probe_per_device": 4,
+                "camera_profile": "auto",
+                "device_streams": {"hdd": 1, "ssd": 2, "nvme": 4, "network": 2, "unknown": 2},
                 "camid": "",
                 "slack_active": False,
                 "slack_hook": "",
@@ -52,8 +78,12 @@ def save_params(new_data):
     ensure_params_file()
     data = load_params()
     data.update(new_data)
-    with open(get_params_path(), 'w') as f:
+    # Écriture dans un fichier temporaire puis remplacement : une lecture concurrente
+    # voit l'ancien ou le nouveau fichier, jamais un JSON à moitié écrit
+    tmp_path = get_params_path() + ".tmp"
+    with open(tmp_path, 'w') as f:
         json.dump(data, f, indent=4)
+    os.replace(tmp_path, get_params_path())
 
 
 def show(parent=None):
@@ -91,7 +121,7 @@ def show(parent=None):
     json_enabled = current_params.get("export_json", True)
     log_enabled = current_params.get("export_log", True)
     rename_only = current_params.get("rename_only", False)
-    ignore_mxf = current_params.get("ignore_mxf", True)
+    ignore_mxf = current_params.get("ignore_mxf", False)
 
     slack_locked = current_params.get("slack_locked", False)
     discord_locked = current_params.get("discord_locked", False)
@@ -121,8 +151,14 @@ def show(parent=None):
     json_checkbox.setChecked(json_enabled)
     json_checkbox.stateChanged.connect(lambda state: save_params({"export_json": bool(state)}))
 
+    tree_checkbox = QtWidgets.QCheckBox("Export chunk hash tree")
+    tree_checkbox.setToolTip("Écrit l’arbre des hash par chunk à côté du JSON, pour des contrôles ponctuels.")
+    tree_checkbox.setChecked(current_params.get("export_hash_tree", False))
+    tree_checkbox.stateChanged.connect(lambda state: save_params({"export_hash_tree": bool(state)}))
+
     layout.addWidget(mhl_checkbox)
     layout.addWidget(json_checkbox)
+    layout.addWidget(tree_checkbox)
 
     # Add Log export checkbox
     log_checkbox = QtWidgets.QCheckBox("Export Log")
@@ -130,6 +166,40 @@ def show(parent=None):
     log_checkbox.stateChanged.connect(lambda state: save_params({"export_log": bool(state)}))
     layout.addWidget(log_checkbox)
 
+    # Algorithmes de hash, tous calculés sur la même lecture de la source
+    from package.utils.hashing import ALGORITHMS, benchmark, normalize_algorithms
+    selected_algorithms = normalize_algorithms(current_params.get("hash_algorithms"))
+    hash_layout = QtWidgets.QHBoxLayout()
+    hash_checkboxes = {}
+
+    def save_algorithms():
+        selected = [name for name, box in hash_checkboxes.items() if box.isChecked()]
+        save_params({"hash_algorithms": normalize_algorithms(selected)})
+
+    for name in ALGORITHMS:
+        box = QtWidgets.QCheckBox(name)
+        box.setChecked(name in selected_algorithms)
+        box.stateChanged.connect(lambda state: save_algorithms())
+        hash_checkboxes[name] = box
+        hash_layout.addWidget(box)
+
+    def run_benchmark():
+        QtWidgets.QApplication.setOverrideCursor(QtCore.Qt.WaitCursor)
+        try:
+            results = benchmark()
+        finally:
+            QtWidgets.QApplication.restoreOverrideCursor()
+        QtWidgets.QMessageBox.information(
+            dialog, "Hash benchmark",
+            "\n".join(f"{name} : {speed:.0f} MB/s" for name, speed in results.items()))
+
+    benchmark_button = QtWidgets.QPushButton("Benchmark")
+    benchmark_button.setToolTip("Mesure le débit de chaque algorithme sur cette machine.")
+    benchmark_button.clicked.connect(run_benchmark)
+    hash_layout.addWidget(benchmark_button)
+    layout.addWidget(QtWidgets.QLabel("Hash"))
+    layout.addLayout(hash_layout)
+
     # Add Rename Only checkbox
     rename_checkbox = QtWidgets.QCheckBox("Rename only (no copy)")
     rename_checkbox.setToolTip("Désactive la copie de fichiers : seuls les noms seront modifiés dans leur emplacement d’origine.")
@@ -139,10 +209,65 @@ def show(parent=None):
         is_renaming = bool(state)
         mhl_checkbox.setEnabled(not is_renaming)
         json_checkbox.setEnabled(not is_renaming)
+        tree_checkbox.setEnabled(not is_renaming)
         #log_checkbox.setEnabled(not is_renaming)
 
         save_params({"rename_only": is_renaming})
 
+    cache_checkbox = QtWidgets.QCheckBox("Managed page cache")
+    cache_checkbox.setToolTip("Libère le cache au fil de la copie et force la vérification à relire le disque.")
+    cache_checkbox.setChecked(current_params.get("managed_page_cache", False))
+    cache_checkbox.stateChanged.connect(lambda state: save_params({"managed_page_cache": bool(state)}))
+    layout.addWidget(cache_checkbox)
+
+    preallocate_checkbox = QtWidgets.QCheckBox("Preallocate destination files")
+    preallocate_checkbox.setToolTip("Réserve la taille du clip avant la copie pour limiter la fragmentation.")
+    preallocate_checkbox.setChecked(current_params.get("preallocate", True))
+    preallocate_checkbox.stateChanged.connect(lambda state: save_params({"preallocate": bool(state)}))
+    layout.addWidget(preallocate_checkbox)
+
+    durability_combo = QtWidgets.QComboBox()
+    durability_combo.addItem("Durability : none", "none")
+    durability_combo.addItem("Durability : fsync each file before verify", "file")
+    durability_combo.addItem("Durability : fsync at end of job", "job")
+    durability_combo.setCurrentIndex(max(0, durability_combo.findData(current_params.get("durability", "file"))))
+    durability_combo.currentIndexChanged.connect(lambda index: save_params({"durability": durability_combo.itemData(index)}))
+    layout.addWidget(durability_combo)
+
+    fast_copy_checkbox = QtWidgets.QCheckBox("Kernel copy / clone on the same volume")
+    fast_copy_checkbox.setToolTip("clonefile / reflink ou copy_file_range quand la destination est sur le volume source.")
+    fast_copy_checkbox.setChecked(current_params.get("fast_copy", True))
+    fast_copy_checkbox.stateChanged.connect(lambda state: save_params({"fast_copy": bool(state)}))
+    layout.addWidget(fast_copy_checkbox)
+
+    inline_hash_checkbox = QtWidgets.QCheckBox("Hash during copy")
+    inline_hash_checkbox.setToolTip("Décoché : copie noyau vers toutes les destinations, puis une passe de hash séparée.")
+    inline_hash_checkbox.setChecked(current_params.get("inline_hash", True))
+    inline_hash_checkbox.stateChanged.connect(lambda state: save_params({"inline_hash": bool(state)}))
+    layout.addWidget(inline_hash_checkbox)
+
+    range_layout = QtWidgets.QHBoxLayout()
+    range_combo = QtWidgets.QComboBox()
+    range_combo.addItem("Range-parallel copy : off", "off")
+    range_combo.addItem("Range-parallel copy : network destinations", "network")
+    range_combo.addItem("Range-parallel copy : always", "always")
+    range_combo.setCurrentIndex(max(0, range_combo.findData(current_params.get("range_parallel", "network"))))
+    range_combo.currentIndexChanged.connect(lambda index: save_params({"range_parallel": range_combo.itemData(index)}))
+    range_streams = QtWidgets.QSpinBox()
+    range_streams.setRange(2, 32)
+    range_streams.setValue(current_params.get("range_streams", 4))
+    range_streams.setSuffix(" streams")
+    range_streams.valueChanged.connect(lambda value: save_params({"range_streams": value}))
+    range_layout.addWidget(range_combo)
+    range_layout.addWidget(range_streams)
+    layout.addLayout(range_layout)
+
+    plan_checkbox = QtWidgets.QCheckBox("Show job plan before copying")
+    plan_checkbox.setToolTip("Noms, tailles, place libre et durée prévue ; affiché de toute façon si la place manque.")
+    plan_checkbox.setChecked(current_params.get("confirm_job_plan", False))
+    plan_checkbox.stateChanged.connect(lambda state: save_params({"confirm_job_plan": bool(state)}))
+    layout.addWidget(plan_checkbox)
+
     rename_checkbox.stateChanged.connect(toggle_export_options)
     layout.addWidget(rename_checkbox)
 
@@ -152,6 +277,15 @@ def show(parent=None):
     mxf_checkbox.stateChanged.connect(lambda state: save_params({"ignore_mxf": bool(state)}))
     layout.addWidget(mxf_checkbox)
 
+    profile_combo = QtWidgets.QComboBox()
+    profile_combo.addItem("Camera naming : auto-detect", "auto")
+    for profile in PROFILES:
+        profile_combo.addItem(f"Camera naming : {profile.label}", profile.name)
+    profile_combo.setToolTip("Ordre des clips à date égale : numéro de clip et chapitre tirés du nom de fichier.")
+    profile_combo.setCurrentIndex(max(0, profile_combo.findData(current_params.get("camera_profile", "auto"))))
+    profile_combo.currentIndexChanged.connect(lambda index: save_params({"camera_profile": profile_combo.itemData(index)}))
+    layout.addWidget(profile_combo)
+
     # --- Add Slack and Discord settings UI ---
     slack_enabled = current_params.get("slack_active", False)
     slack_hook = current_params.get("slack_hook", "")
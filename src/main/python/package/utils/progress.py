@@ -0,0 +1,87 @@
+import threading
+import time
+
+
+class ProgressCounters:
+    """Compteurs d'octets partagés entre les workers de copie et l'interface.
+
+    Les workers incrémentent sous un verrou (quelques centaines de nanosecondes par chunk),
+    l'interface lit un instantané à fréquence fixe : le coût d'affichage dépend de la durée
+    du job et non plus du nombre de chunks copiés.
+    """
+
+    def __init__(self, destinations=0):
+        self._lock = threading.Lock()
+        self.reset(destinations)
+
+    def reset(self, destinations=0):
+        with self._lock:
+            self._source = 0
+            self._resumed = 0
+            self._destinations = [0] * destinations
+            # chemin source -> [octets lus, taille, [octets écrits par destination], octets repris]
+            self._files = {}
+            self._started = time.monotonic()
+
+    def start(self, path, total, offset=0, destinations=()):
+        """Annonce un fichier ; offset : octets déjà présents (reprise) sur les destinations données."""
+        with self._lock:
+            self._remove(path)
+            written = [0] * len(self._destinations)
+            for i in destinations:
+                if i < len(written):
+                    written[i] = offset
+                    self._destinations[i] += offset
+            self._files[path] = [offset, total, written, offset]
+            self._source += offset
+            self._resumed += offset
+
+    def add(self, path, n, destination=None):
+        """n octets lus sur la source (destination None) ou écrits sur la destination d'index donné."""
+        with self._lock:
+            entry = self._files.get(path)
+            if entry is None:
+                return
+            if destination is None:
+                entry[0] += n
+                self._source += n
+            elif destination < len(entry[2]):
+                entry[2][destination] += n
+                self._destinations[destination] += n
+
+    def discard(self, path):
+        """Retire la contribution d'un fichier interrompu : la reprise la ré-annoncera."""
+        with self._lock:
+            self._remove(path)
+
+    def finish(self, path):
+        """Le fichier reste compté dans les totaux mais ne figure plus parmi les fichiers en cours."""
+        with self._lock:
+            entry = self._files.get(path)
+            if entry is not None:
+                entry[1] = None
+
+    def _remove(self, path):
+        entry = self._files.pop(path, None)
+        if entry is None:
+            return
+        self._source -= entry[0]
+        self._resumed -= entry[3]
+        for i, written in enumerate(entry[2]):
+            self._destinations[i] -= written
+
+    def snapshot(self):
+        """{"source", "resumed", "destinations", "files": {chemin: (lus, taille)}, "elapsed"} à un instant donné.
+
+        "resumed" : part de "source" déjà présente sur les destinations (reprise), non recopiée.
+        """
+        with self._lock:
+            return {"source": self._source,
+                    "resumed": self._resumed,
+                    "destinations": list(self._destinations),
+                    "files": {path: (entry[0], entry[1]) for path, entry in self._files.items()
+                              if entry[1] is not None},
+                    "elapsed": time.monotonic() - self._started}
+
+
+__all__ = ["ProgressCounters"]
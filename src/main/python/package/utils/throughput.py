@@ -0,0 +1,92 @@
+import time
+
+from package.utils.devices import mount_point
+from package.utils.params import load_params, save_params
+
+
+class EwmaRate:
+    """Débit lissé (octets/s) d'un compteur cumulatif, échantillonné à intervalle irrégulier.
+
+    Le poids d'un échantillon dépend du temps écoulé (demi-vie en secondes) et non du nombre
+    d'échantillons : le lissage reste le même quelle que soit la fréquence de rafraîchissement.
+    """
+
+    def __init__(self, half_life=5.0, initial=None):
+        self.half_life = half_life
+        self.rate = initial
+        self._last = None
+
+    def update(self, total, now=None):
+        now = time.monotonic() if now is None else now
+        if self._last is not None:
+            last_total, last_time = self._last
+            dt = now - last_time
+            if dt <= 0:
+                return self.rate
+            instant = max(0, total - last_total) / dt
+            alpha = 1 - 0.5 ** (dt / self.half_life)
+            self.rate = instant if self.rate is None else self.rate + alpha * (instant - self.rate)
+        self._last = (total, now)
+        return self.rate
+
+    def pause(self):
+        """Phase inactive : l'intervalle suivant ne compte pas comme un débit nul."""
+        self._last = None
+
+
+def format_eta(seconds):
+    if seconds is None:
+        return "--"
+    seconds = int(round(seconds))
+    if seconds >= 3600:
+        return f"{seconds // 3600} h {seconds % 3600 // 60:02d} min"
+    if seconds >= 60:
+        return f"{seconds // 60} min {seconds % 60:02d} s"
+    return f"{seconds} s"
+
+
+def estimate_duration(copy_bytes, verify_bytes, copy_rate, verify_rate):
+    """Secondes pour copier puis vérifier : les deux phases se recouvrent, la plus lente l'emporte.
+
+    Sans débit de vérification connu, celui de la copie sert d'estimation. None si aucun débit.
+    """
+    verify_rate = verify_rate or copy_rate
+    etas = [remaining / rate if remaining > 0 else 0.0
+            for remaining, rate in ((copy_bytes, copy_rate), (verify_bytes, verify_rate)) if rate]
+    return max(etas) if etas else None
+
+
+def history_key(source, destinations):
+    """Clé d'historique : volume source (le lecteur de cartes) -> volumes de destination."""
+    return f"{mount_point(source)} -> {' + '.join(mount_point(folder) for folder in destinations)}"
+
+
+def history_rate(source, destinations, phase):
+    """Débit mesuré (octets/s) lors des jobs précédents entre ces volumes, None si inconnu.
+
+    À défaut du même couple source / destinations, le débit le plus bas connu pour ce
+    lecteur sert d'estimation prudente.
+    """
+    history = load_params().get("throughput_history", {})
+    entry = history.get(history_key(source, destinations), {})
+    if phase in entry:
+        return entry[phase] * 1024 ** 2
+    prefix = f"{mount_point(source)} -> "
+    rates = [value[phase] for key, value in history.items() if key.startswith(prefix) and phase in value]
+    return min(rates) * 1024 ** 2 if rates else None
+
+
+def record_rate(source, destinations, phase, rate, weight=0.5):
+    """Mémorise le débit d'un job (octets/s), lissé avec l'historique du même couple de volumes."""
+    if not rate:
+        return
+    history = load_params().get("throughput_history", {})
+    key = history_key(source, destinations)
+    entry = history.get(key, {})
+    mb_s = rate / 1024 ** 2
+    entry[phase] = round(mb_s if phase not in entry else entry[phase] + weight * (mb_s - entry[phase]), 1)
+    history[key] = entry
+    save_params({"throughput_history": history})
+
+
+__all__ = ["EwmaRate", "format_eta", "estimate_duration", "history_key", "history_rate", "record_rate"]